@@ -0,0 +1,83 @@
+"""
+CCL parsing time and peak memory of parsing documents one at a time: the whole tree with xpath lookups per token
+(the former `CclDoc.from_file`) and the streaming `CclDoc.from_file`.
+
+python -m benchmarks.bench_ccl_parse [KPWR_ROOT]
+
+Without KPWR_ROOT a synthetic corpus is measured.
+"""
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from lxml import etree
+
+from coref_ds.ccl.ccl_doc import CclDoc, CclSegment
+from coref_ds.ccl.corpus import find_ccl_documents
+
+from benchmarks.bench_mmax_parse import peak_rss_increase
+from tests.synthetic_ccl import write_ccl_document
+
+
+def first_text(token, path: str) -> str:
+    return str(token.xpath(path)[0]) if token.xpath(path) else ''
+
+
+def parse_tree(p: Path) -> list[CclSegment]:
+    """
+    The former `CclDoc.from_file`: the whole tree, six xpath lookups per token
+    """
+    segments = []
+    for sentence in etree.parse(p).xpath('//sentence'):
+        sent_tokens = list(sentence.xpath('tok'))
+        for ind, token in enumerate(sent_tokens):
+            segments.append(CclSegment(
+                orth=first_text(token, 'orth/text()'),
+                pos=first_text(token, 'lex/ctag/text()'),
+                lemma=first_text(token, 'lex/base/text()'),
+                has_nps=False,
+                last_in_sent=ind == len(sent_tokens) - 1,
+                index=len(segments),
+            ))
+    return segments
+
+
+def parse_stream(p: Path) -> list[CclSegment]:
+    return CclDoc.from_file(p).segments
+
+
+def bench_ccl_parse(paths: list[Path]):
+    results = {'n_segments': sum(len(parse_stream(p)) for p in paths)}
+    for name, parse in (('tree', parse_tree), ('stream', parse_stream)):
+        seconds = float('inf')
+        for _ in range(3):
+            start = time.perf_counter()
+            for p in paths:
+                parse(p)
+            seconds = min(seconds, time.perf_counter() - start)
+
+        with ProcessPoolExecutor(max_workers=1) as executor:  # a fresh process, lxml trees are not seen by tracemalloc
+            peak = executor.submit(peak_rss_increase, parse, paths).result()
+        results[name] = {'seconds': seconds, 'peak': peak}
+    return results
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        result = bench_ccl_parse(find_ccl_documents(Path(sys.argv[1])))
+    else:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            result = bench_ccl_parse([
+                write_ccl_document(Path(tmp_dir) / f'{doc_ind:08}.xml', n_sentences=100, n_chunks=20)
+                for doc_ind in range(5)
+            ])
+
+    print(f"{result['n_segments']} segments")
+    for name in ('tree', 'stream'):
+        r = result[name]
+        print(
+            f"{name:>8} {r['seconds']:7.3f} s {result['n_segments'] / r['seconds']:10.0f} segments/s "
+            f"peak {r['peak'] / 1024 ** 2:7.2f} MiB"
+        )
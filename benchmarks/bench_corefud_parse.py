@@ -0,0 +1,42 @@
+"""
+CorefUD text assembly time of the udapi and the direct CoNLL-U (`conllu_reader`) backends
+of `CorefUDDoc.iter_texts` on a synthetic multi-document file.
+
+python -m benchmarks.bench_corefud_parse
+"""
+import tempfile
+import time
+from pathlib import Path
+
+from coref_ds.corefud.corefud_doc import CorefUDDoc
+
+from tests.synthetic_corefud import write_corefud_file
+
+
+def bench_corefud_parse(n_docs: int = 50, n_sentences: int = 50, repeat: int = 3):
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        doc_path = write_corefud_file(
+            Path(tmp_dir) / 'docs.conllu', [f'doc{ind}' for ind in range(n_docs)], n_sentences=n_sentences
+        )
+        for backend in ('udapi', 'conllu'):
+            best = float('inf')
+            for _ in range(repeat):
+                start = time.perf_counter()
+                n_segments = sum(len(text.segments) for text in CorefUDDoc.iter_texts(doc_path, backend=backend))
+                best = min(best, time.perf_counter() - start)
+            results.append({
+                'backend': backend,
+                'n_segments': n_segments,
+                'seconds': best,
+                'us_per_segment': best / n_segments * 1e6,
+            })
+    return results
+
+
+if __name__ == '__main__':
+    for result in bench_corefud_parse():
+        print(
+            f"{result['backend']:>8} {result['n_segments']:>8} segments "
+            f"{result['seconds']:8.3f} s {result['us_per_segment']:8.2f} us/segment"
+        )
@@ -0,0 +1,70 @@
+"""
+CorefUD serialization time (`corefud_writer.texts_to_corefud`) of a long synthetic text
+with `depth` nested mentions starting at the first token of every sentence.
+
+python -m benchmarks.bench_corefud_write
+"""
+import tempfile
+import time
+from pathlib import Path
+
+from coref_ds.corefud import corefud_writer
+from coref_ds.tei.tei_doc import TEIDocument
+from coref_ds.text import Mention
+
+from tests.synthetic_tei import write_tei_document
+
+
+def add_nested_mentions(text, depth: int):
+    clusters = [list(cluster) for cluster in text.clusters]
+    nested_clusters = [[] for _ in range(depth)]
+    for seg in text.segments_meta:
+        if seg.index != 0 and not text.segments_meta[seg.index - 1].last_in_sent:
+            continue
+        for level in range(depth):
+            segments = text.segments_meta[seg.index: seg.index + level + 2]
+            if any(s.last_in_sent for s in segments):
+                break
+            text.mentions.append(Mention(
+                id=f'mention_nested_{seg.index}_{level}',
+                text=' '.join(s.orth for s in segments),
+                lemmatized_text=' '.join(s.lemma for s in segments),
+                segments=segments,
+                span_start=segments[0].index,
+                span_end=segments[-1].index,
+                head_orth=segments[0].orth,
+                head=segments[0].index,
+            ))
+            nested_clusters[level].append((segments[0].index, segments[-1].index))
+    text.clusters = clusters + nested_clusters
+    return text
+
+
+def bench_corefud_write(n_samples: int = 10, depth: int = 5, repeat: int = 3):
+    text_id = next(iter(corefud_writer.pcc_structure_reversed))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        doc_dir = write_tei_document(
+            Path(tmp_dir) / text_id, n_samples=n_samples, n_paragraphs=10, n_sentences=10, mentions_per_sentence=3
+        )
+        text = add_nested_mentions(TEIDocument(doc_dir).text, depth)
+        text.text_id = text_id
+
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        corefud_writer.texts_to_corefud([text])
+        best = min(best, time.perf_counter() - start)
+    return {
+        'n_segments': len(text.segments),
+        'n_mentions': len(text.mentions),
+        'seconds': best,
+        'us_per_segment': best / len(text.segments) * 1e6,
+    }
+
+
+if __name__ == '__main__':
+    result = bench_corefud_write()
+    print(
+        f"{result['n_segments']:>8} segments {result['n_mentions']:>7} mentions "
+        f"{result['seconds']:8.3f} s {result['us_per_segment']:8.2f} us/segment"
+    )
@@ -0,0 +1,61 @@
+"""
+`CorefUDDoc.map_clusters` and `to_file` time, per text and bulk, for synthetic texts written as CorefUD
+and mapped back onto the parsed file. Writing includes storing coreference in MISC (udapi writer).
+
+python -m benchmarks.bench_map_clusters [N_TEXTS]
+"""
+import copy
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from coref_ds.corefud import corefud_writer
+from coref_ds.corefud.corefud_doc import CorefUDDoc
+from coref_ds.corefud.utils import corefud_name_mapper
+from coref_ds.tei.tei_doc import TEIDocument
+
+from benchmarks.bench_corefud_write import add_nested_mentions
+from tests.synthetic_tei import write_tei_document
+
+
+def bench_map_clusters(n_texts: int = 20, depth: int = 3):
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        texts = []
+        for text_id in list(corefud_writer.pcc_structure_reversed)[:n_texts]:
+            doc_dir = write_tei_document(
+                Path(tmp_dir) / text_id, n_samples=2, n_paragraphs=5, n_sentences=10, mentions_per_sentence=3
+            )
+            text = add_nested_mentions(TEIDocument(doc_dir).text, depth)
+            text.text_id = text_id
+            text.indices_to_mentions = {(m.span_start, m.span_end): m for m in text.mentions}
+            texts.append(text)
+        p = Path(tmp_dir) / 'texts.conllu'
+        corefud_writer.write_corefud(copy.deepcopy(texts), p)
+
+        for bulk in (False, True):
+            doc = CorefUDDoc(p)
+            doc.udapi_docs
+            start = time.perf_counter()
+            doc.map_clusters(texts, docname_mapper=corefud_name_mapper, bulk=bulk)
+            mapped = time.perf_counter()
+            doc.to_file(Path(tmp_dir) / 'mapped.conllu')
+            results['bulk' if bulk else 'per_text'] = (mapped - start, time.perf_counter() - mapped)
+
+    results['n_segments'] = sum(len(text.segments) for text in texts)
+    results['n_mentions'] = sum(len(text.mentions) for text in texts)
+    return results
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.ERROR)  # udapi warns about every token without a dependency head
+    result = bench_map_clusters(*map(int, sys.argv[1:2]))
+    print(f"{result['n_segments']} segments {result['n_mentions']} mentions")
+    for name in ('per_text', 'bulk'):
+        map_time, write_time = result[name]
+        print(
+            f"{name:>10} map {map_time:7.3f} s {result['per_text'][0] / map_time:5.1f}x"
+            f"  map+write {map_time + write_time:7.3f} s {sum(result['per_text']) / (map_time + write_time):5.1f}x"
+        )
@@ -0,0 +1,104 @@
+"""
+Size of the parsed markables and markables/s of reading them from XML attributes and writing them with `to_xml`:
+the former dataclass with every attribute stored (dense) and the sparse `Markable`.
+
+python -m benchmarks.bench_markables [MMAX_ROOT]
+
+Without MMAX_ROOT (e.g. PCC-1.5-MMAX) a synthetic corpus is measured.
+"""
+import sys
+import tempfile
+import time
+from dataclasses import make_dataclass
+from pathlib import Path
+
+from coref_ds.mmax.attributes import MARKABLE_ATTRIBUTES, MARKABLE_XML_TEMPLATE
+from coref_ds.mmax.markable import Markable, gen_mentions_structure
+from coref_ds.mmax.mmax_doc import MARKABLE_TAG
+from coref_ds.utils import add_element, iterparse_elements
+
+from benchmarks.bench_segments_memory import deep_sizeof
+from tests.synthetic_mmax import write_mmax_document
+
+# the former `Markable` layout: one field per attribute
+DenseMarkable = make_dataclass(
+    'DenseMarkable',
+    [(k, str, v) for k, v in MARKABLE_ATTRIBUTES.items()] + [('span_start', int, None), ('span_end', int, None)],
+)
+
+
+def dense_from_attributes(attributes) -> DenseMarkable:
+    return DenseMarkable(**{k: attributes.get(k) or v for k, v in MARKABLE_ATTRIBUTES.items()})
+
+
+def dense_to_xml(markable: DenseMarkable, mentions_tree):
+    """
+    The former `Markable.to_xml`, a new dict of all attributes per markable.
+    """
+    add_element(mentions_tree, 'markable', attributes={
+        **MARKABLE_XML_TEMPLATE,
+        'id': markable.id,
+        'span': markable.span,
+        'mention_group': markable.mention_group,
+        'mention_head': markable.mention_head if markable.mention_head else '',
+    })
+
+
+def read_attributes(paths: list[Path]) -> list[dict]:
+    attributes = []
+    for p in paths:
+        mentions_path = p.parent / f'{p.stem}_mentions.xml'
+        attributes.extend(dict(markable.attrib) for markable in iterparse_elements(mentions_path, MARKABLE_TAG))
+    return attributes
+
+
+def best_time(fn, repeat: int = 3) -> tuple[float, object]:
+    seconds, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        seconds = min(seconds, time.perf_counter() - start)
+    return seconds, result
+
+
+def bench_markables(paths: list[Path]):
+    attributes = read_attributes(paths)
+    results = {'n_mentions': len(attributes)}
+    for name, from_attributes, to_xml in (
+            ('dense', dense_from_attributes, dense_to_xml),
+            ('sparse', Markable.from_attributes, Markable.to_xml),
+    ):
+        read_seconds, markables = best_time(lambda: [from_attributes(a) for a in attributes])
+
+        def write():
+            tree = gen_mentions_structure().getroot()
+            for markable in markables:
+                to_xml(markable, tree)
+            return tree
+
+        write_seconds, _ = best_time(write)
+        results[name] = {
+            'read': read_seconds,
+            'write': write_seconds,
+            'size': deep_sizeof(markables, {}),
+        }
+    return results
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        result = bench_markables(sorted(Path(sys.argv[1]).glob('**/*.mmax')))
+    else:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            result = bench_markables([
+                write_mmax_document(Path(tmp_dir), f'doc{doc_ind}', n_sentences=2000) for doc_ind in range(5)
+            ])
+
+    n = result['n_mentions']
+    print(f'{n} markables')
+    for name in ('dense', 'sparse'):
+        r = result[name]
+        print(
+            f"{name:>7} {r['size'] / n:7.1f} B/markable "
+            f"read {n / r['read']:10.0f} markables/s write {n / r['write']:10.0f} markables/s"
+        )
@@ -0,0 +1,89 @@
+"""
+MMAX parsing time, peak memory of parsing documents one at a time and size of the parsed markables: whole trees with all
+markable attributes copied (the former `Markable.from_xml`), whole trees (`MmaxDoc.load_files` and `parse_files`)
+and the streaming loader (`MmaxDoc.parse_doc`).
+
+python -m benchmarks.bench_mmax_parse [MMAX_ROOT]
+
+Without MMAX_ROOT (e.g. PCC-1.5-MMAX) a synthetic corpus is measured.
+"""
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from coref_ds.mmax.mmax_doc import NSMAP, MmaxDoc
+
+from benchmarks.bench_markables import dense_from_attributes
+from benchmarks.bench_segments_memory import deep_sizeof
+from tests.synthetic_mmax import write_mmax_document
+
+
+def parse_trees(p: Path):
+    return MmaxDoc.parse_files(MmaxDoc.load_files(p))
+
+
+def parse_trees_copied(p: Path):
+    """
+    Whole trees with every attribute copied from the XML, as `Markable.from_xml` did before
+    """
+    mmax_files = MmaxDoc.load_files(p)
+    mentions = [
+        dense_from_attributes(markable.attrib)
+        for markable in mmax_files.mentions.xpath('xlmns:markable', namespaces=NSMAP)
+    ]
+    return MmaxDoc.parse_words(mmax_files.words), mentions
+
+
+def parse_stream(p: Path):
+    doc = MmaxDoc.from_file(p)
+    doc.parse_doc()
+    return doc.words, doc.mentions
+
+
+def peak_rss_increase(parse, paths: list[Path]) -> int:
+    """
+    Increase of the peak resident memory of the process while parsing documents one at a time, in bytes.
+    """
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    for p in paths:
+        parse(p)
+    return (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before) * 1024
+
+
+def bench_mmax_parse(paths: list[Path]):
+    results = {}
+    for name, parse in (('copied', parse_trees_copied), ('trees', parse_trees), ('stream', parse_stream)):
+        seconds = float('inf')
+        for _ in range(3):
+            start = time.perf_counter()
+            docs = [parse(p) for p in paths]
+            seconds = min(seconds, time.perf_counter() - start)
+        mentions_size = deep_sizeof([mentions for _, mentions in docs], {})
+        del docs
+
+        with ProcessPoolExecutor(max_workers=1) as executor:  # a fresh process, lxml trees are not seen by tracemalloc
+            peak = executor.submit(peak_rss_increase, parse, paths).result()
+        results[name] = {'seconds': seconds, 'peak': peak, 'mentions_size': mentions_size}
+    results['n_mentions'] = sum(len(parse_stream(p)[1]) for p in paths)
+    return results
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        result = bench_mmax_parse(sorted(Path(sys.argv[1]).glob('**/*.mmax')))
+    else:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            result = bench_mmax_parse([
+                write_mmax_document(Path(tmp_dir), f'doc{doc_ind}', n_sentences=2000) for doc_ind in range(5)
+            ])
+
+    print(f"{result['n_mentions']} markables")
+    for name in ('copied', 'trees', 'stream'):
+        r = result[name]
+        print(
+            f"{name:>8} {r['seconds']:7.3f} s peak {r['peak'] / 1024 ** 2:7.2f} MiB "
+            f"markables {r['mentions_size'] / result['n_mentions']:7.1f} B/markable"
+        )
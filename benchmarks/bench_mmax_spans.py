@@ -0,0 +1,66 @@
+"""
+Markable spans/s of the former per-markable string splitting of `Markable.get_span`, of `spans.parse_span`
+per markable and of `spans.parse_spans` over all markables of a document, and the number of discontinuous spans.
+
+python -m benchmarks.bench_mmax_spans [MMAX_ROOT]
+
+Without MMAX_ROOT (e.g. PCC-1.5-MMAX) a synthetic corpus with discontinuous spans is measured.
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from coref_ds.mmax.mmax_doc import MmaxDoc
+from coref_ds.mmax.spans import parse_span, parse_spans
+
+from tests.synthetic_mmax import write_mmax_document
+
+
+def split_span(span: str):
+    """
+    The former `Markable.get_span`, discontinuous spans are read as the first start and the last end.
+    """
+    start, *end = span.split('..')
+    end = end[0] if end else start
+    try:
+        start, end = (int(el.split('_')[-1]) for el in (start, end))
+    except ValueError:
+        return None
+    return start, end
+
+
+def best_time(fn, repeat: int = 5) -> float:
+    seconds = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        seconds = min(seconds, time.perf_counter() - start)
+    return seconds
+
+
+def bench_mmax_spans(paths: list[Path]):
+    docs_spans = [[m.span for m in MmaxDoc.from_file(p).mentions] for p in paths]
+    n_spans = sum(len(spans) for spans in docs_spans)
+    return {
+        'n_spans': n_spans,
+        'n_discontinuous': sum(len(parse_span(span) or ()) > 1 for spans in docs_spans for span in spans),
+        'split': best_time(lambda: [[split_span(span) for span in spans] for spans in docs_spans]),
+        'parse_span': best_time(lambda: [[parse_span(span) for span in spans] for spans in docs_spans]),
+        'parse_spans': best_time(lambda: [parse_spans(spans) for spans in docs_spans]),
+    }
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        result = bench_mmax_spans(sorted(Path(sys.argv[1]).glob('**/*.mmax')))
+    else:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            result = bench_mmax_spans([
+                write_mmax_document(Path(tmp_dir), f'doc{doc_ind}', n_sentences=2000, discontinuous=True)
+                for doc_ind in range(5)
+            ])
+
+    print(f"{result['n_spans']} spans, {result['n_discontinuous']} discontinuous")
+    for name in ('split', 'parse_span', 'parse_spans'):
+        print(f"{name:>12} {result['n_spans'] / result[name]:10.0f} spans/s")
@@ -0,0 +1,78 @@
+"""
+Memory taken by `Text.segments_meta` stored as `Segment` dataclasses, `SlotsSegment`s and a `SegmentTable`.
+
+python -m benchmarks.bench_segments_memory [PCC_ROOT]
+
+Without PCC_ROOT a synthetic corpus is measured.
+"""
+import sys
+import tempfile
+from array import array
+from dataclasses import asdict
+from pathlib import Path
+
+from coref_ds.segment_table import Categories, SegmentTable
+from coref_ds.tei.corpus import load_tei_corpus
+from coref_ds.text import SlotsSegment
+
+from tests.synthetic_tei import write_tei_document
+
+
+def deep_sizeof(obj, seen: dict) -> int:
+    """
+    seen: objects already counted, kept alive so that their ids are not reused
+    """
+    if id(obj) in seen:
+        return 0
+    seen[id(obj)] = obj
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (str, bytes, int, float, bool, array)) or obj is None:
+        return size
+    if isinstance(obj, dict):
+        return size + sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set)):
+        return size + sum(deep_sizeof(el, seen) for el in obj)
+    if hasattr(obj, '__dict__'):
+        size += deep_sizeof(vars(obj), seen)
+    for slot in getattr(type(obj), '__slots__', ()):
+        size += deep_sizeof(getattr(obj, slot, None), seen)
+    return size
+
+
+def bench_segments_memory(texts):
+    dataclass_size, slots_size, table_size = 0, 0, 0
+    dataclass_seen, slots_seen, table_seen = {}, {}, {}
+    categories = Categories()
+    n_segments = 0
+    for text in texts:
+        segments = text.segments_meta
+        n_segments += len(segments)
+        dataclass_size += deep_sizeof(segments, dataclass_seen)
+        slots_size += deep_sizeof([SlotsSegment(**asdict(segment)) for segment in segments], slots_seen)
+        table = SegmentTable.from_segments(segments, categories=categories)
+        table_size += deep_sizeof(table.columns, table_seen)
+    table_size += deep_sizeof(categories, table_seen)
+
+    return {
+        'n_segments': n_segments,
+        'dataclass': dataclass_size,
+        'slots': slots_size,
+        'table': table_size,
+    }
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        result = bench_segments_memory(load_tei_corpus(Path(sys.argv[1])))
+    else:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for doc_ind in range(20):
+                write_tei_document(Path(tmp_dir) / str(doc_ind), n_samples=5, n_paragraphs=5, n_sentences=10)
+            result = bench_segments_memory(load_tei_corpus(Path(tmp_dir), workers=1))
+
+    print(f"{result['n_segments']} segments")
+    for name in ('dataclass', 'slots', 'table'):
+        print(
+            f"{name:>10} {result[name] / 1024 ** 2:8.1f} MiB {result[name] / result['n_segments']:7.1f} B/segment "
+            f"{result['dataclass'] / result[name]:5.1f}x"
+        )
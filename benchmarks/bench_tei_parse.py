@@ -0,0 +1,42 @@
+"""
+TEI text assembly (`TEIDocument.text`) time for growing synthetic documents.
+Time per token should stay roughly constant, i.e. parsing scales linearly with the document length.
+
+python -m benchmarks.bench_tei_parse
+"""
+import tempfile
+import time
+from pathlib import Path
+
+from coref_ds.tei.tei_doc import TEIDocument
+
+from tests.synthetic_tei import write_tei_document
+
+
+def bench_tei_parse(n_samples_list=(1, 2, 4, 8, 16), repeat: int = 3):
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for n_samples in n_samples_list:
+            doc_dir = write_tei_document(
+                Path(tmp_dir) / f'doc_{n_samples}', n_samples=n_samples, n_paragraphs=10, n_sentences=10
+            )
+            best = float('inf')
+            for _ in range(repeat):
+                start = time.perf_counter()
+                text = TEIDocument(doc_dir).text
+                best = min(best, time.perf_counter() - start)
+            results.append({
+                'n_segments': len(text.segments),
+                'n_mentions': len(text.mentions),
+                'seconds': best,
+                'us_per_segment': best / len(text.segments) * 1e6,
+            })
+    return results
+
+
+if __name__ == '__main__':
+    for result in bench_tei_parse():
+        print(
+            f"{result['n_segments']:>8} segments {result['n_mentions']:>7} mentions "
+            f"{result['seconds']:8.3f} s {result['us_per_segment']:8.2f} us/segment"
+        )
@@ -1,18 +1,29 @@
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Sequence
+import logging
+import os
+
 import spacy_alignments
 
+from coref_ds.cache import AlignmentCache, get_default_alignment_cache
+
+logger = logging.getLogger(__name__)
+
+ZERO_ANAPHORA = 'Ø'
+
 
 def align_mention(mention_inds, subtoken2token_indices, annotated_tokens=None):
     start, end = mention_inds
 
-    if annotated_tokens and 'Ø' in annotated_tokens[start:(end+1)]: # zero anaphora
+    if annotated_tokens and ZERO_ANAPHORA in annotated_tokens[start:(end+1)]: # zero anaphora
         no_zero_inds = []
         for ind, token in zip(range(start,(end+1)), annotated_tokens[start:(end+1)]):
-            if token != 'Ø':
+            if token != ZERO_ANAPHORA:
                 no_zero_inds.append(ind)
-        print(annotated_tokens[start:(end+1)])
         if no_zero_inds:
             start, end = no_zero_inds[0], no_zero_inds[-1]
-        print(annotated_tokens[start:(end+1)])
 
     if subtoken2token_indices[start] and subtoken2token_indices[end]:
         start, end = (
@@ -22,7 +33,7 @@ def align_mention(mention_inds, subtoken2token_indices, annotated_tokens=None):
         return start, end + 1
     else:
         return None
-    
+
 
 def align_token(token_ind: int, alignment: list):
     if alignment[token_ind]:
@@ -40,36 +51,240 @@ def align_heads(head_inds: dict, indices_mapping: dict, alignment: list):
     return aligned_heads
 
 
-def get_alignment(annotated_tokens, original_tokens, verbose=False):
-    a2b, b2a = spacy_alignments.get_alignments(annotated_tokens, original_tokens)
+def get_alignment(annotated_tokens, original_tokens, verbose=False, cache: AlignmentCache = None):
+    """
+    cache: `get_default_alignment_cache()` by default, the alignment is computed every time if there is none
+    """
+    if cache is None:
+        cache = get_default_alignment_cache()
+    if cache is None:
+        a2b, b2a = spacy_alignments.get_alignments(annotated_tokens, original_tokens)
+    else:
+        a2b, b2a = cache.get_or_align(annotated_tokens, original_tokens, spacy_alignments.get_alignments)
     if verbose:
         for ind, token in enumerate(annotated_tokens):
             print(token, a2b[ind], [original_tokens[el] for el in a2b[ind]])
     return a2b, b2a
 
 
-def align(original_tokens, annotated_tokens, mentions_inds, alignment=None):
-    if alignment is None:
-        alignment, b2a = get_alignment(annotated_tokens, original_tokens)
+class OffsetAlignment:
+    """
+    Alignment of annotated tokens to original tokens as offset arrays, so that spans are mapped with a few lookups:
+    first[i]: first original token aligned to annotated token i, -1 if none
+    next_token[i], prev_token[i]: nearest annotated token at or after / at or before i which is not a zero anaphora
+        (`Ø`), len(annotated) / -1 if none; spans are shrunk to them like in `align_mention`
+    """
+    def __init__(self, a2b: list[list[int]], annotated_tokens: Sequence[str] = None):
+        self.a2b = a2b
+        n = len(a2b)
+        self.first = array('q', (targets[0] if targets else -1 for targets in a2b))
+        if annotated_tokens:
+            self.next_token, self.prev_token = array('q', range(n)), array('q', range(n))
+            next_token = n
+            for ind in range(n - 1, -1, -1):
+                if annotated_tokens[ind] != ZERO_ANAPHORA:
+                    next_token = ind
+                self.next_token[ind] = next_token
+            prev_token = -1
+            for ind in range(n):
+                if annotated_tokens[ind] != ZERO_ANAPHORA:
+                    prev_token = ind
+                self.prev_token[ind] = prev_token
+        else:
+            self.next_token, self.prev_token = None, None
+
+    @classmethod
+    def from_tokens(
+            cls, annotated_tokens: Sequence[str], original_tokens: Sequence[str], cache: AlignmentCache = None
+    ) -> 'OffsetAlignment':
+        a2b, b2a = get_alignment(annotated_tokens, original_tokens, cache=cache)
+        return cls(a2b, annotated_tokens)
+
+    def __len__(self) -> int:
+        return len(self.first)
+
+    def map_spans(self, spans: Sequence[tuple[int, int]]) -> list[tuple[int, int] | None]:
+        """
+        Same as `align_mention` for every span: inclusive (start, end) spans of annotated tokens to (start, end + 1)
+        of original tokens, None for spans which cannot be aligned (or are out of range).
+        """
+        first, n = self.first, len(self.first)
+        if self.next_token is not None:
+            next_token, prev_token = self.next_token, self.prev_token
+            spans = [
+                (next_token[start], prev_token[end]) if 0 <= start <= end < n and next_token[start] <= end
+                else (start, end)
+                for start, end in spans
+            ]
+        return [
+            (first[start], first[end] + 1) if 0 <= start < n and 0 <= end < n and first[start] >= 0 and first[end] >= 0
+            else None
+            for start, end in spans
+        ]
+
+    def map_tokens(self, token_inds: Sequence[int | None]) -> list[int | None]:
+        first, n = self.first, len(self.first)
+        return [
+            first[ind] if ind is not None and 0 <= ind < n and first[ind] >= 0 else None
+            for ind in token_inds
+        ]
+
+
+@dataclass
+class Misalignment:
+    doc: int  # position of the document in the batch
+    span: tuple[int, int]
+    tokens: list[str]
+    alignment: list[list[int]]  # original tokens aligned to every annotated token of the span
+
+
+@dataclass
+class AlignmentReport:
+    n_documents: int = 0
+    n_mentions: int = 0
+    misalignments: list[Misalignment] = field(default_factory=list)
+
+    def summary(self) -> str:
+        docs = len({m.doc for m in self.misalignments})
+        return (
+            f'{len(self.misalignments)}/{self.n_mentions} mentions in {docs}/{self.n_documents} documents '
+            f'could not be aligned'
+        )
+
+
+@dataclass
+class AlignedDocument:
+    clusters: list[list[tuple[int, int]]]
+    mapping: dict  # annotated span -> original span or None
+    heads: dict  # original span -> original head token or None
+    n_mentions: int = 0
+
+
+def record_misalignments(
+        document: AlignedDocument, misalignments: list[Misalignment], doc_ind: int, report: AlignmentReport = None
+):
+    for misalignment in misalignments:
+        misalignment.doc = doc_ind
+        if report is None:
+            logger.debug(f'Could not align {misalignment}')
+    if report is not None:
+        report.n_documents += 1
+        report.n_mentions += document.n_mentions
+        report.misalignments.extend(misalignments)
 
-    aligned_mention_inds = []
-    mapping = {}
+
+def as_clusters(mentions_inds) -> list:
+    # a single cluster of spans is accepted as well
     if mentions_inds and not isinstance(mentions_inds[0], list):
-        mentions_inds = [mentions_inds]
+        return [mentions_inds]
+    return mentions_inds
+
 
-    for cluster in mentions_inds:
+def align_document(
+        annotated_tokens: Sequence[str],
+        original_tokens: Sequence[str],
+        clusters,
+        heads: dict = None,
+        alignment: OffsetAlignment = None,
+        cache: AlignmentCache = None,
+) -> tuple[AlignedDocument, list[Misalignment]]:
+    """
+    Maps all mention spans of clusters (and heads: span -> head token) of annotated tokens onto original tokens.
+    Returns misalignments with doc set to 0.
+    cache: see `get_alignment`, used when alignment is not given
+    """
+    if alignment is None:
+        alignment = OffsetAlignment.from_tokens(annotated_tokens, original_tokens, cache=cache)
+    clusters = as_clusters(clusters)
+
+    spans = [span for cluster in clusters for span in cluster]
+    aligned_spans = iter(alignment.map_spans(spans))
+    aligned_clusters, mapping, misalignments = [], {}, []
+    for cluster in clusters:
         aligned_cluster = []
-        for mention_inds in cluster:
-            aligned = align_mention(mention_inds, alignment, annotated_tokens)
-            mapping[mention_inds] = aligned
+        for span in cluster:
+            aligned = next(aligned_spans)
+            mapping[span] = aligned
             if aligned:
                 aligned_cluster.append(aligned)
-            else: 
-                print(
-                    'Could not align',
-                    annotated_tokens[mention_inds[0]:(mention_inds[1]+1)],
-                    alignment[mention_inds[0]:(mention_inds[1]+1)],
-                )
-        aligned_mention_inds.append(aligned_cluster)
-
-    return aligned_mention_inds, mapping
\ No newline at end of file
+            else:
+                misalignments.append(Misalignment(
+                    doc=0,
+                    span=span,
+                    tokens=list(annotated_tokens[span[0]:(span[1]+1)]),
+                    alignment=alignment.a2b[span[0]:(span[1]+1)],
+                ))
+        aligned_clusters.append(aligned_cluster)
+
+    aligned_heads = {}
+    if heads:
+        head_spans = [span for span in heads if mapping[span]]
+        for span, head in zip(head_spans, alignment.map_tokens([heads[span] for span in head_spans])):
+            aligned_heads[mapping[span]] = head
+
+    return AlignedDocument(aligned_clusters, mapping, aligned_heads, n_mentions=len(spans)), misalignments
+
+
+def _align_document(args):
+    annotated_tokens, original_tokens, clusters, heads, cache = args
+    return align_document(annotated_tokens, original_tokens, clusters, heads, cache=cache)
+
+
+def align_documents(
+        annotated: Sequence[Sequence[str]],
+        original: Sequence[Sequence[str]],
+        clusters: Sequence,
+        heads: Sequence[dict] = None,
+        workers: int = 0,
+        report: AlignmentReport = None,
+        cache: AlignmentCache = None,
+) -> list[AlignedDocument]:
+    """
+    Aligns a batch of documents, given as parallel sequences of annotated tokens, original tokens, clusters
+    and optionally heads (see `align_document`).
+
+    workers: number of processes, 0 or 1 aligns in the current process, None uses `os.cpu_count()`
+    report: collects the misaligned mentions, which are logged at debug level otherwise
+    cache: see `get_alignment`, the default one is passed to the workers as well
+    """
+    if heads is None:
+        heads = [None] * len(annotated)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if cache is None:
+        cache = get_default_alignment_cache()
+    jobs = [(*job, cache) for job in zip(annotated, original, clusters, heads)]
+
+    if workers <= 1:
+        results = [_align_document(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_align_document, jobs, chunksize=max(1, len(jobs) // (4 * workers))))
+
+    for doc_ind, (document, misalignments) in enumerate(results):
+        record_misalignments(document, misalignments, doc_ind, report)
+    return [document for document, _ in results]
+
+
+def align(
+        original_tokens,
+        annotated_tokens,
+        mentions_inds,
+        alignment=None,
+        report: AlignmentReport = None,
+        cache: AlignmentCache = None,
+):
+    """
+    alignment: a2b from `get_alignment` or an `OffsetAlignment`
+    report: collects the misaligned mentions, which are logged at debug level otherwise
+    cache: see `get_alignment`, used when alignment is not given
+    """
+    if alignment is None:
+        alignment = OffsetAlignment.from_tokens(annotated_tokens, original_tokens, cache=cache)
+    elif not isinstance(alignment, OffsetAlignment):
+        alignment = OffsetAlignment(alignment, annotated_tokens)
+
+    document, misalignments = align_document(annotated_tokens, original_tokens, mentions_inds, alignment=alignment)
+    record_misalignments(document, misalignments, 0, report)
+
+    return document.clusters, document.mapping
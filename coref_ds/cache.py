@@ -0,0 +1,339 @@
+"""
+Persistent on-disk caches of parsed `Text` objects and of token alignments.
+
+Text entries are keyed on the parser, `PARSER_VERSION` and the source files (path, mtime and size, or content hash),
+so they are invalidated whenever a source file or the parsing code changes.
+A `Text` is stored pickled and zlib-compressed; only load caches you have written yourself.
+Alignment entries are keyed on hashes of both token sequences and store `a2b`/`b2a` as zlib-compressed arrays.
+
+The caches are disabled unless `set_default_cache`/`set_default_alignment_cache` is called
+or `COREF_DS_CACHE_DIR` is set. Both caches may share a directory, `COREF_DS_CACHE_MAX_SIZE` then limits them together.
+
+python -m coref_ds.cache warm --format tei PCC-1.5-TEI-split/
+python -m coref_ds.cache clear
+"""
+from array import array
+from pathlib import Path
+from typing import Callable, Iterable, Sequence
+import argparse
+import hashlib
+import logging
+import os
+import pickle
+import struct
+import tempfile
+import zlib
+
+from coref_ds.text import Text
+
+logger = logging.getLogger(__name__)
+
+PARSER_VERSION = '4'  # bump whenever a parser output changes
+ALIGNMENT_VERSION = '1'  # bump whenever the alignment or its storage changes
+CACHE_DIR_ENV = 'COREF_DS_CACHE_DIR'
+CACHE_MAX_SIZE_ENV = 'COREF_DS_CACHE_MAX_SIZE'
+DEFAULT_MAX_SIZE = 2 * 1024 ** 3
+EVICT_TO = 0.9  # fraction of max_size left after an eviction
+ENTRY_SUFFIX = '.text.zz'
+ALIGNMENT_SUFFIX = '.align.zz'
+CACHE_SUFFIXES = (ENTRY_SUFFIX, ALIGNMENT_SUFFIX)
+
+
+# bytes of the entries of every cache directory, shared by all caches of the process using the directory
+_dir_sizes: dict[Path, int] = {}
+
+
+class DiskCache:
+    """
+    Entries are files named `<key><entry_suffix>` in cache_dir, so caches of different kinds can share a directory.
+    max_size applies to the entries of all caches (`CACHE_SUFFIXES`) in the directory together. Their size is counted
+    once and then kept up to date by the writes, the directory is scanned again only when it goes over max_size.
+    """
+    entry_suffix = None
+
+    def __init__(self, cache_dir: Path, max_size: int = DEFAULT_MAX_SIZE):
+        """
+        max_size: in bytes, least recently used entries of all caches in cache_dir are evicted above it
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_size = max_size
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.cache_dir = self.cache_dir.resolve()
+
+    def entry_path(self, key: str) -> Path:
+        return self.cache_dir / f'{key}{self.entry_suffix}'
+
+    def read_entry(self, key: str) -> bytes | None:
+        p = self.entry_path(key)
+        try:
+            with open(p, 'rb') as f:
+                data = zlib.decompress(f.read())
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f'Removing unreadable cache entry {p}: {e!r}')
+            p.unlink(missing_ok=True)
+            _dir_sizes.pop(self.cache_dir, None)
+            return None
+        os.utime(p)  # recently used
+        return data
+
+    def write_entry(self, key: str, data: bytes):
+        data = zlib.compress(data)
+        p = self.entry_path(key)
+        size = self.dir_size
+        try:
+            size -= p.stat().st_size  # replaced
+        except FileNotFoundError:
+            pass
+        with tempfile.NamedTemporaryFile(dir=self.cache_dir, delete=False) as f:
+            f.write(data)
+        os.replace(f.name, p)
+        _dir_sizes[self.cache_dir] = size + len(data)
+        if _dir_sizes[self.cache_dir] > self.max_size:
+            self.evict()
+
+    def entries(self) -> list[os.DirEntry]:
+        return [entry for entry in os.scandir(self.cache_dir) if entry.name.endswith(self.entry_suffix)]
+
+    def dir_entries(self) -> list[os.DirEntry]:
+        """
+        Entries of all caches in cache_dir.
+        """
+        return [entry for entry in os.scandir(self.cache_dir) if entry.name.endswith(CACHE_SUFFIXES)]
+
+    @property
+    def size(self) -> int:
+        return sum(entry.stat().st_size for entry in self.entries())
+
+    @property
+    def dir_size(self) -> int:
+        """
+        Bytes of the entries of all caches in cache_dir, without the writes of other processes since the last scan.
+        """
+        if self.cache_dir not in _dir_sizes:
+            _dir_sizes[self.cache_dir] = sum(entry.stat().st_size for entry in self.dir_entries())
+        return _dir_sizes[self.cache_dir]
+
+    def evict(self, max_size: int = None):
+        """
+        Removes the least recently used entries of all caches in cache_dir until they take at most
+        `EVICT_TO` * max_size bytes, so that writes after an eviction do not evict again right away.
+        """
+        max_size = self.max_size if max_size is None else max_size
+        entries = sorted(((entry.stat(), entry) for entry in self.dir_entries()), key=lambda e: e[0].st_mtime)
+        size = sum(stat.st_size for stat, _ in entries)
+        for stat, entry in entries:
+            if size <= max_size * EVICT_TO:
+                break
+            size -= stat.st_size
+            os.remove(entry.path)
+        _dir_sizes[self.cache_dir] = size
+
+    def clear(self):
+        """
+        Removes the entries of this cache, the other caches in cache_dir are kept.
+        """
+        for entry in self.entries():
+            os.remove(entry.path)
+        _dir_sizes.pop(self.cache_dir, None)
+
+
+class TextCache(DiskCache):
+    entry_suffix = ENTRY_SUFFIX
+
+    def __init__(self, cache_dir: Path, max_size: int = DEFAULT_MAX_SIZE, hash_content: bool = False):
+        """
+        max_size: in bytes, least recently used entries of all caches in cache_dir are evicted above it
+        hash_content: key on the source files content instead of their mtime and size
+        """
+        super().__init__(cache_dir, max_size)
+        self.hash_content = hash_content
+
+    def file_signature(self, p: Path) -> str:
+        p = Path(p).resolve()
+        if self.hash_content:
+            digest = hashlib.sha256()
+            with open(p, 'rb') as f:
+                for chunk in iter(lambda: f.read(1024 ** 2), b''):
+                    digest.update(chunk)
+            return f'{p}:{digest.hexdigest()}'
+        stat = p.stat()
+        return f'{p}:{stat.st_mtime_ns}:{stat.st_size}'
+
+    def key(self, parser: str, sources: Iterable[Path]) -> str:
+        signature = [parser, PARSER_VERSION] + [self.file_signature(p) for p in sources]
+        return hashlib.sha256('\n'.join(signature).encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Text | None:
+        data = self.read_entry(key)
+        return None if data is None else pickle.loads(data)
+
+    def put(self, key: str, text: Text):
+        self.write_entry(key, pickle.dumps(text, protocol=pickle.HIGHEST_PROTOCOL))
+
+    def get_or_parse(self, parser: str, sources: Iterable[Path], parse: Callable[[], Text]) -> Text:
+        key = self.key(parser, sources)
+        text = self.get(key)
+        if text is None:
+            text = parse()
+            self.put(key, text)
+        return text
+
+
+def hash_tokens(tokens: Sequence[str]) -> str:
+    digest = hashlib.sha256()
+    for token in tokens:
+        data = token.encode('utf-8')
+        digest.update(struct.pack('<I', len(data)))  # unambiguous for any token contents
+        digest.update(data)
+    return digest.hexdigest()
+
+
+def pack_alignment(alignment: list[list[int]]) -> tuple[array, array]:
+    """
+    Alignment lists as offsets and concatenated indices: alignment[i] == indices[offsets[i]:offsets[i + 1]].
+    """
+    offsets, indices = array('I', [0]), array('I')
+    for targets in alignment:
+        indices.extend(targets)
+        offsets.append(len(indices))
+    return offsets, indices
+
+
+def unpack_alignment(offsets: array, indices: array) -> list[list[int]]:
+    indices = indices.tolist()
+    return [indices[start:end] for start, end in zip(offsets, offsets[1:])]
+
+
+class AlignmentCache(DiskCache):
+    """
+    `spacy_alignments.get_alignments(a, b)` results, keyed on hashes of both token sequences.
+    """
+    entry_suffix = ALIGNMENT_SUFFIX
+
+    def key(self, a: Sequence[str], b: Sequence[str]) -> str:
+        signature = [ALIGNMENT_VERSION, hash_tokens(a), hash_tokens(b)]
+        return hashlib.sha256('\n'.join(signature).encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> tuple[list[list[int]], list[list[int]]] | None:
+        data = self.read_entry(key)
+        if data is None:
+            return None
+        lengths = struct.unpack_from('<4Q', data)
+        arrays, pos = [], struct.calcsize('<4Q')
+        for length in lengths:
+            arr = array('I')
+            arr.frombytes(data[pos:pos + length * arr.itemsize])
+            arrays.append(arr)
+            pos += length * arr.itemsize
+        return unpack_alignment(*arrays[:2]), unpack_alignment(*arrays[2:])
+
+    def put(self, key: str, a2b: list[list[int]], b2a: list[list[int]]):
+        arrays = pack_alignment(a2b) + pack_alignment(b2a)  # in the machine byte order
+        self.write_entry(key, struct.pack('<4Q', *map(len, arrays)) + b''.join(arr.tobytes() for arr in arrays))
+
+    def get_or_align(
+            self, a: Sequence[str], b: Sequence[str], get_alignments: Callable
+    ) -> tuple[list[list[int]], list[list[int]]]:
+        key = self.key(a, b)
+        alignment = self.get(key)
+        if alignment is None:
+            alignment = get_alignments(a, b)
+            self.put(key, *alignment)
+        return alignment
+
+
+_default_cache = None
+
+
+def set_default_cache(cache: TextCache | None):
+    global _default_cache
+    _default_cache = cache
+
+
+def get_default_cache() -> TextCache | None:
+    global _default_cache
+    if _default_cache is None and os.environ.get(CACHE_DIR_ENV):
+        _default_cache = TextCache(
+            os.environ[CACHE_DIR_ENV], int(os.environ.get(CACHE_MAX_SIZE_ENV, DEFAULT_MAX_SIZE))
+        )
+    return _default_cache
+
+
+_default_alignment_cache = None
+
+
+def set_default_alignment_cache(cache: AlignmentCache | None):
+    global _default_alignment_cache
+    _default_alignment_cache = cache
+
+
+def get_default_alignment_cache() -> AlignmentCache | None:
+    global _default_alignment_cache
+    if _default_alignment_cache is None and os.environ.get(CACHE_DIR_ENV):
+        _default_alignment_cache = AlignmentCache(
+            os.environ[CACHE_DIR_ENV], int(os.environ.get(CACHE_MAX_SIZE_ENV, DEFAULT_MAX_SIZE))
+        )
+    return _default_alignment_cache
+
+
+def find_sources(root: Path, doc_format: str) -> list[Path]:
+    if doc_format == 'tei':
+        from coref_ds.tei.corpus import find_tei_documents
+        return find_tei_documents(root)
+    elif doc_format == 'corefud':
+        return sorted(Path(root).glob('**/*.conllu'))
+    elif doc_format == 'mmax':
+        return sorted(Path(root).glob('**/*.mmax'))
+    else:
+        raise ValueError(f'Unknown format {doc_format}')
+
+
+def load_text(p: Path, doc_format: str) -> Text:
+    if doc_format == 'tei':
+        from coref_ds.tei.tei_doc import TEIDocument
+        return TEIDocument(p).text
+    elif doc_format == 'corefud':
+        from coref_ds.corefud.corefud_doc import CorefUDDoc
+        return CorefUDDoc(p).text
+    elif doc_format == 'mmax':
+        from coref_ds.mmax.mmax_doc import MmaxDoc
+        return MmaxDoc.from_file(p).text
+    else:
+        raise ValueError(f'Unknown format {doc_format}')
+
+
+def warm(cache: TextCache, root: Path, doc_format: str):
+    set_default_cache(cache)
+    for p in find_sources(root, doc_format):
+        try:
+            load_text(p, doc_format)
+        except Exception as e:
+            logger.error(f'Error while loading {p}: {e!r}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Manage the cache of parsed texts.')
+    parser.add_argument('--cache-dir', default=os.environ.get(CACHE_DIR_ENV, Path.home() / '.cache' / 'coref_ds'))
+    parser.add_argument('--max-size', type=int, default=int(os.environ.get(CACHE_MAX_SIZE_ENV, DEFAULT_MAX_SIZE)))
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    warm_parser = subparsers.add_parser('warm', help='parse all documents under root into the cache')
+    warm_parser.add_argument('root', type=Path)
+    warm_parser.add_argument('--format', choices=('tei', 'corefud', 'mmax'), default='tei')
+    subparsers.add_parser('clear', help='remove all cache entries')
+    subparsers.add_parser('info', help='print the number and size of cache entries')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    from coref_ds import cache  # the module used by the document classes, not __main__
+    text_cache = cache.TextCache(args.cache_dir, args.max_size)
+    alignment_cache = cache.AlignmentCache(args.cache_dir, args.max_size)
+    if args.command == 'warm':
+        cache.warm(text_cache, args.root, args.format)
+    elif args.command == 'clear':
+        text_cache.clear()
+        alignment_cache.clear()
+    print(f'{len(text_cache.entries())} text entries, {text_cache.size} bytes in {text_cache.cache_dir}')
+    print(f'{len(alignment_cache.entries())} alignment entries, {alignment_cache.size} bytes')
+    print(f'{text_cache.dir_size} of {text_cache.max_size} bytes used')
@@ -1,10 +1,13 @@
 from pathlib import Path
+from typing import Iterator
 import logging
 
 from lxml import etree as ET
 
 from coref_ds.text import Text, Segment
+from coref_ds.utils import iterparse_elements
 
+logger = logging.getLogger(__name__)
 
 
 class CclSegment(Segment):
@@ -14,24 +17,44 @@ class CclSegment(Segment):
             pos: str,
             lemma: str,
             has_nps: bool,
-            last_in_sent: bool
+            last_in_sent: bool,
+            index: int | None = None,
         ):
             super().__init__(
-                orth,
-                lemma,
-                has_nps,
-                last_in_sent,
+                orth=orth,
+                lemma=lemma,
+                has_nps=has_nps,
+                index=index,
+                last_in_sent=last_in_sent,
                 pos=pos,
             )
 
     @classmethod
-    def from_xml(cls, xml_token: ET._Element, last_in_sent: bool):
+    def from_xml(cls, xml_token: ET._Element, last_in_sent: bool, index: int | None = None):
+        """
+        orth, ctag and base are the first non-empty ones of the token (ctag and base of any of its lex elements),
+        read with a single pass over its children.
+        """
+        orth, pos, lemma = None, None, None
+        for child in xml_token:
+            if child.tag == 'orth':
+                if orth is None:
+                    orth = child.text
+            elif child.tag == 'lex':
+                for el in child:
+                    if el.tag == 'ctag':
+                        if pos is None:
+                            pos = el.text
+                    elif el.tag == 'base':
+                        if lemma is None:
+                            lemma = el.text
         return cls(
-                    orth=str(xml_token.xpath('orth/text()')[0]) if xml_token.xpath('orth/text()') else '',
-                    pos=str(xml_token.xpath('lex/ctag/text()')[0]) if xml_token.xpath('lex/ctag/text()') else '',
-                    lemma=str(xml_token.xpath('lex/base/text()')[0]) if xml_token.xpath('lex/base/text()') else '',
+                    orth=orth or '',
+                    pos=pos or '',
+                    lemma=lemma or '',
                     has_nps=False,
                     last_in_sent=last_in_sent,
+                    index=index,
         )
 
     def __str__(self):
@@ -46,27 +69,47 @@ class CclDoc:
 
     @classmethod
     def from_file(cls, p: Path):
-        xml = ET.parse(p)
-        print(xml)
-        segments, clusters = cls._parse_ccl(xml, p)
-        return cls(p.stem, segments, clusters)
+        """
+        The file is read in one pass, sentences are dropped from memory once their tokens are read.
+        """
+        return cls(p.stem, list(cls.iter_segments(p)), [])
+
+    @staticmethod
+    def iter_segments(p: Path) -> Iterator[CclSegment]:
+        """
+        Segments of the sentences of a CCL file, parsed in one pass without building the whole tree.
+        """
+        index = 0
+        for sentence in iterparse_elements(p, 'sentence'):
+            for segment in CclDoc._parse_sentence(sentence, p, index):
+                index += 1
+                yield segment
+
+    @staticmethod
+    def _parse_sentence(sentence: ET._Element, doc_path: Path, first_index: int = 0) -> Iterator[CclSegment]:
+        """
+        first_index: index of the first segment of the sentence in the text, segments which fail to parse
+            are skipped and not counted
+        """
+        sent_tokens = [el for el in sentence if el.tag == 'tok']
+        index = first_index
+        for ind, token in enumerate(sent_tokens):
+            try:
+                segment = CclSegment.from_xml(token, ind == len(sent_tokens) - 1, index)
+            except Exception as e:
+                logger.error(f'Error while parsing segment {token} in {doc_path}')
+                logger.exception(e)
+                continue
+            index += 1
+            yield segment
 
     @staticmethod
     def _parse_ccl(xml, doc_path: Path):
         segments = []
         clusters = []  # assume it's empty @TODO: implement
         for sentence in xml.xpath('//sentence'):
-            sent_tokens = list(sentence.xpath('tok'))
+            segments.extend(CclDoc._parse_sentence(sentence, doc_path, len(segments)))
 
-            for ind, segment in enumerate(sent_tokens):
-                try:
-                    last_in_sent = True if ind == len(sent_tokens) - 1 else False
-                    segment = CclSegment.from_xml(segment, last_in_sent)
-                    segments.append(segment)
-                except Exception as e:
-                    logging.error(f'Error while parsing segment {segment} in {doc_path}')
-                    logging.exception(e)
-            
         return segments, clusters
 
     @property
@@ -0,0 +1,50 @@
+import logging
+from pathlib import Path
+from typing import Callable, Iterator
+
+from coref_ds.ccl.ccl_doc import CclDoc
+from coref_ds.text import Text
+from coref_ds.utils import map_documents
+
+logger = logging.getLogger(__name__)
+
+RELATIONS_SUFFIX = '.rel.xml'
+
+
+def find_ccl_documents(root: Path, pattern: str = '*.xml') -> list[Path]:
+    """
+    CCL files matching pattern under root (e.g. a KPWr directory), sorted by path; relations files are left out.
+    """
+    return sorted(p for p in Path(root).rglob(pattern) if not p.name.endswith(RELATIONS_SUFFIX))
+
+
+def load_ccl_text(doc_path: Path) -> Text:
+    return CclDoc.from_file(doc_path).text
+
+
+def log_error(doc_path: Path, error: Exception):
+    logger.error(f'Error while loading {doc_path}: {error!r}')
+
+
+def load_ccl_corpus(
+        root: Path,
+        pattern: str = '*.xml',
+        workers: int | None = None,
+        max_in_flight: int | None = None,
+        on_error: Callable[[Path, Exception], None] = log_error,
+        doc_paths: list[Path] = None,
+) -> Iterator[Text]:
+    """
+    Parses all CCL files under root in a process pool and yields their `Text`s in `find_ccl_documents` order.
+
+    workers: number of processes, `os.cpu_count()` by default; 0 or 1 parses in the current process
+    max_in_flight: documents submitted to the pool and not yet yielded, 4 * workers by default
+    on_error: called with the document path and the exception for documents which failed to load,
+        these documents are skipped
+    doc_paths: explicit CCL files to load instead of searching root
+    """
+    if doc_paths is None:
+        doc_paths = find_ccl_documents(root, pattern)
+    yield from map_documents(
+        load_ccl_text, ((doc_path,) for doc_path in doc_paths), lambda a: a[0], workers, max_in_flight, on_error,
+    )
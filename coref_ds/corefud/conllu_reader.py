@@ -0,0 +1,332 @@
+"""
+Direct CoNLL-U reader building `Text`s without udapi trees.
+
+Reads `Entity=` MISC annotations the way `udapi.core.coref.load_coref_from_misc` does
+(including discontinuous `e1[1/2]` mentions), so texts are equal to `CorefUDDoc.doc_to_text` output.
+Bridge and SplitAnte annotations are ignored, legacy GRP-style `global.Entity` is not supported.
+"""
+from collections import defaultdict
+from itertools import chain
+from pathlib import Path
+import logging
+import re
+
+from coref_ds.corefud.utils import NPS_INTERPS, NodeSegment
+from coref_ds.text import Mention, Text
+
+logger = logging.getLogger(__name__)
+
+RE_SENT_ID = re.compile(r'^# sent_id\s*=?\s*(\S+)')
+RE_NEWDOC = re.compile(r'^# newdoc(?:\s+id\s*=\s*(.+))?$')
+RE_GLOBAL_ENTITY = re.compile(r'^# global.Entity\s*=\s*(\S+)')
+RE_ENTITY_CHUNKS = re.compile(r'(\([^()]+\)?|[^()]+\))')
+RE_DISCONTINUOUS = re.compile(r'^([^[]+)\[(\d+)/(\d+)\]')
+DEFAULT_GLOBAL_ENTITY = 'eid-etype-head-other'
+
+
+class ConlluNode:
+    """
+    Word or empty node of a sentence, index is its position in the text (None for empty nodes).
+    """
+    __slots__ = ('sentence', 'ord', 'form', 'lemma', 'upos', 'deprel', 'head', 'misc', 'index')
+
+    def __init__(self, sentence, ord, form, lemma, upos, deprel, head, misc):
+        self.sentence = sentence
+        self.ord = ord
+        self.form = form
+        self.lemma = lemma
+        self.upos = upos
+        self.deprel = deprel
+        self.head = head
+        self.misc = misc
+        self.index = None
+
+    def get_misc(self, name: str) -> str:
+        if self.misc == '_' or name not in self.misc:
+            return ''
+        for item in self.misc.split('|'):
+            key, _, value = item.partition('=')
+            if key == name:
+                return value
+        return ''
+
+    def address(self) -> str:
+        return f'{self.sentence.sent_id}#{self.ord}'
+
+    def sort_key(self) -> tuple:
+        return self.sentence.number, self.ord
+
+
+class ConlluSentence:
+    __slots__ = ('number', 'sent_id', 'words', 'nodes')
+
+    def __init__(self, number: int):
+        self.number = number
+        self.sent_id = str(number)
+        self.words = []
+        self.nodes = []  # words and empty nodes in word order
+
+
+class ConlluMention:
+    __slots__ = ('eid', 'words', 'head')
+
+    def __init__(self, eid: str, node: ConlluNode):
+        self.eid = eid
+        self.words = [node]
+        self.head = node
+
+    def sort_key(self) -> tuple:
+        """
+        `udapi.core.coref.CorefMention` order: by first word, longer first, by last word, by entity id.
+        """
+        return self.words[0].sort_key(), -len(self.words), self.words[-1].sort_key(), self.eid
+
+
+def parse_sentence(lines: list[str], number: int, default_sent_id: str = None) -> ConlluSentence:
+    """
+    default_sent_id: used without a sent_id comment instead of number (see `iter_documents`)
+    """
+    sentence = ConlluSentence(number)
+    if default_sent_id is not None:
+        sentence.sent_id = default_sent_id
+    for line in lines:
+        if line[0] == '#':
+            sent_id_match = RE_SENT_ID.match(line)
+            if sent_id_match is not None:
+                sentence.sent_id = sent_id_match.group(1)
+            continue
+        fields = line.split('\t')
+        if len(fields) != 10:
+            raise RuntimeError(f'Wrong number of columns in {line!r}')
+        if '-' in fields[0]:  # multi-word token
+            continue
+        if '.' in fields[0]:
+            sentence.nodes.append(ConlluNode(
+                sentence, float(fields[0]), fields[1], fields[2], fields[3], fields[7], None, fields[9]
+            ))
+            continue
+        node = ConlluNode(
+            sentence, int(fields[0]), fields[1], fields[2],
+            None if fields[3] == '_' else fields[3],
+            None if fields[7] == '_' else fields[7],
+            None if fields[6] == '_' else int(fields[6]), fields[9],
+        )
+        sentence.words.append(node)
+        sentence.nodes.append(node)
+
+    if len(sentence.words) == 1 and sentence.words[0].misc == 'Empty=Yes':
+        sentence.nodes.remove(sentence.words[0])
+        sentence.words = []
+    sentence.nodes.sort(key=lambda node: node.ord)
+    return sentence
+
+
+def iter_documents(lines):
+    """
+    Yields (docname, global.Entity, sentences) for every `# newdoc` block of CoNLL-U lines.
+
+    Sentences without a sent_id comment are numbered as by udapi reading the file with `split_docs=True`:
+    with the last sent_id of the document, or with their position in the document before any sent_id.
+    udapi starts every document but the first of a file from a buffered sentence, whose sent_id is not
+    reused for the following sentences.
+    """
+    docname, global_entity, doc_global_entity, sentences = None, None, None, []
+    last_sent_id = None
+    sentence_lines = []
+    for line in chain(lines, ['']):
+        line = line.rstrip()
+        if line:
+            sentence_lines.append(line)
+            continue
+        if all(sentence_line[0] == '#' for sentence_line in sentence_lines):  # no nodes
+            sentence_lines = []
+            continue
+
+        comments = [sentence_line for sentence_line in sentence_lines if sentence_line[0] == '#']
+        newdoc_match = next(filter(None, map(RE_NEWDOC.match, comments)), None)
+        buffered = newdoc_match is not None and bool(sentences)
+        if newdoc_match is not None:
+            if sentences:
+                yield docname, doc_global_entity, sentences
+            docname, sentences, last_sent_id = newdoc_match.group(1), [], None
+        entity_match = next(filter(None, map(RE_GLOBAL_ENTITY.match, comments)), None)
+        if entity_match is not None:
+            global_entity = entity_match.group(1)
+        if not sentences:
+            doc_global_entity = global_entity
+        sentences.append(parse_sentence(sentence_lines, len(sentences) + 1, last_sent_id))
+        if not buffered and any(RE_SENT_ID.match(comment) for comment in comments):
+            last_sent_id = sentences[-1].sent_id
+        sentence_lines = []
+
+    if sentences:
+        yield docname, doc_global_entity, sentences
+
+
+def read_entities(sentences: list[ConlluSentence], global_entity: str = None) -> list[list[ConlluMention]]:
+    """
+    Mentions of entities in `Entity=` MISC attributes, entities and their mentions in udapi order.
+    """
+    fields = (global_entity or DEFAULT_GLOBAL_ENTITY).split('-')
+    if 'GRP' in fields:
+        raise ValueError(f'Unsupported global.Entity = {global_entity}, use the udapi reader')
+    if 'eid' not in fields:
+        raise ValueError(f'No eid in global.Entity = {global_entity}')
+
+    entities = {}
+    unfinished_mentions = defaultdict(list)
+    discontinuous_mentions = defaultdict(list)
+    for sentence in sentences:
+        for node in sentence.nodes:
+            misc_entity = node.get_misc('Entity')
+            if not misc_entity:
+                continue
+            if global_entity is None:
+                raise ValueError('No global.Entity header found, but Entity= annotations are present')
+
+            for chunk in filter(None, RE_ENTITY_CHUNKS.split(misc_entity)):
+                opening, closing = chunk[0] == '(', chunk[-1] == ')'
+                chunk = chunk.strip('()')
+                if not opening and not closing:
+                    logger.warning(f'Entity {chunk} at {node.address()} has no opening nor closing bracket.')
+                elif not opening:
+                    eid, subspan_ind, total_subspans = chunk, None, None
+                    if chunk not in unfinished_mentions:
+                        discontinuous_match = RE_DISCONTINUOUS.match(chunk)
+                        if not discontinuous_match:
+                            raise ValueError(f'Mention {chunk} closed at {node.address()}, but not opened.')
+                        eid, subspan_ind, total_subspans = discontinuous_match.group(1, 2, 3)
+                    if not unfinished_mentions[eid]:
+                        raise ValueError(f'Mention {chunk} closed at {node.address()}, but not opened.')
+                    mention, head_ind = unfinished_mentions[eid].pop()
+                    last_word = mention.words[-1]
+                    if last_word.sentence is not sentence:
+                        raise ValueError(f'Cross-sentence mentions not supported yet: {chunk} at {node.address()}')
+                    mention.words.extend(w for w in sentence.nodes if last_word.ord < w.ord <= node.ord)
+                    if head_ind and (subspan_ind is None or subspan_ind == total_subspans):
+                        if head_ind > len(mention.words):
+                            raise ValueError(f'Invalid head index {head_ind} for {eid} closed at {node.address()}')
+                        mention.head = mention.words[head_ind - 1]
+                    if subspan_ind and subspan_ind == total_subspans:
+                        if discontinuous_mentions[eid].pop() is not mention:
+                            raise ValueError(f'Closing mention {eid} at {node.address()} with unfinished nested mentions')
+                else:
+                    eid, head_ind = None, None
+                    for name, value in zip(fields, chunk.split('-')):
+                        if name == 'eid':
+                            eid = value
+                        elif name == 'head':
+                            try:
+                                head_ind = int(value)
+                            except ValueError as e:
+                                raise ValueError(f'Non-integer {value} as head index in {chunk} at {node.address()}') from e
+                    if eid is None:
+                        raise ValueError(f'No eid in {chunk}')
+                    subspan_ind, total_subspans = None, '0'
+                    if eid[-1] == ']':
+                        discontinuous_match = RE_DISCONTINUOUS.match(eid)
+                        if not discontinuous_match:
+                            raise ValueError(f'eid={eid} ending with ], but not valid discontinuous mention ID')
+                        eid, subspan_ind, total_subspans = discontinuous_match.group(1, 2, 3)
+
+                    entity = entities.setdefault(eid, [])
+                    if subspan_ind and subspan_ind != '1':
+                        opened = [pair[0] for pair in unfinished_mentions[eid]]
+                        mention = next(
+                            (m for m in discontinuous_mentions[eid] if all(m is not o for o in opened)), None
+                        )
+                        if mention is None:
+                            raise ValueError(f'Non-first subspan of {eid} at {node.address()} without a first one.')
+                        mention.words.append(node)
+                        if closing and subspan_ind == total_subspans:
+                            if discontinuous_mentions[eid].pop() is not mention:
+                                raise ValueError(f'Closing mention {eid} at {node.address()} with unfinished nested mentions')
+                            if head_ind:
+                                mention.head = mention.words[head_ind - 1]
+                    else:
+                        mention = ConlluMention(eid, node)
+                        entity.append(mention)
+                        if subspan_ind:
+                            discontinuous_mentions[eid].append(mention)
+
+                    if not closing:
+                        unfinished_mentions[eid].append((mention, head_ind))
+
+    for eid, mentions in unfinished_mentions.items():
+        for mention, _ in mentions:
+            logger.warning(f'Mention {eid} opened at {mention.head.address()}, but not closed. Deleting.')
+            entities[eid].remove(mention)
+            if not entities[eid]:
+                del entities[eid]
+
+    for mentions in entities.values():
+        mentions.sort(key=ConlluMention.sort_key)
+    return sorted(entities.values(), key=lambda mentions: mentions[0].sort_key())
+
+
+def sentences_to_text(text_id: str, sentences: list[ConlluSentence], global_entity: str = None) -> Text:
+    segments_meta = []
+    for sentence in sentences:
+        prev_word = None
+        for word in sentence.words:
+            word.index = len(segments_meta)
+            has_nps = word.form in NPS_INTERPS or (prev_word is not None and prev_word.get_misc('SpaceAfter') == 'No')
+            segments_meta.append(NodeSegment(
+                orth=word.form,
+                lemma=word.lemma,
+                has_nps=has_nps,
+                pos=word.upos,
+                id=(sentence.sent_id, word.ord),
+                deprel=word.deprel,
+                # udapi attaches words with HEAD '_' to the root
+                dep_head=0 if word.deprel == 'root' or word.head is None else word.head,
+                index=word.index,
+                last_in_sent=word is sentence.words[-1],
+            ))
+            prev_word = word
+
+    mentions = []
+    clusters = []
+    for entity in read_entities(sentences, global_entity):
+        cluster = []
+        for men_ind, men in enumerate(entity):
+            start_ind, end_ind = men.words[0].index, men.words[-1].index
+            if start_ind is None or end_ind is None:
+                continue
+            cluster.append((start_ind, end_ind))
+            mentions.append(
+                Mention(
+                    id=f'{men.eid}_{men_ind}',
+                    text=' '.join([w.form for w in men.words]),
+                    lemmatized_text=' '.join([w.lemma for w in men.words]),
+                    segments=segments_meta[start_ind:(end_ind + 1)],
+                    span_start=start_ind,
+                    span_end=end_ind,
+                    head=men.head.index,
+                    head_orth=men.head.form,
+                    cluster_id=men.eid,
+                )
+            )
+        if cluster:
+            clusters.append(cluster)
+
+    return Text(
+        text_id=text_id,
+        segments=[segment.orth for segment in segments_meta],
+        segments_meta=segments_meta,
+        clusters=tuple(clusters),
+        mentions=mentions,
+    )
+
+
+def iter_texts(p: Path):
+    """
+    Yields a `Text` for every document of a .conllu file, one document in memory at a time.
+    """
+    p = Path(p)
+    with open(p) as f:
+        for docname, global_entity, sentences in iter_documents(f):
+            if not any(sentence.nodes for sentence in sentences):
+                continue
+            text_id = Path(docname or p.name).stem.split('_')[0]
+            yield sentences_to_text(text_id, sentences, global_entity)
@@ -0,0 +1,166 @@
+"""
+Conversion of a split TEI corpus (e.g. PCC-1.5-TEI-split with train/, dev/ and test/) into CorefUD files.
+Documents are parsed and rendered in a process pool, the output keeps `find_tei_documents` order.
+
+python -m coref_ds.corefud.convert_tei TEI_ROOT OUTPUT_DIR [--workers N] [--report report.tsv]
+
+Run it from the repository root, `corefud_writer` reads `pcc_structure_reversed.json` from there.
+"""
+import argparse
+import csv
+import logging
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterable
+
+from coref_ds.corefud.corefud_writer import document_to_corefud
+from coref_ds.tei.corpus import find_tei_documents, load_tei_text
+from coref_ds.utils import map_documents
+
+logger = logging.getLogger(__name__)
+
+SPLITS = ('train', 'dev', 'test')
+OUTPUT_NAME = 'pl_pcc-corefud-{split}.conllu'
+
+
+@dataclass
+class DocumentResult:
+    doc_path: Path
+    split: str
+    conllu: str | None = None
+    parse_time: float = 0.
+    render_time: float = 0.
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def convert_document(doc_path: Path, split: str, layers_mapping: dict = None) -> DocumentResult:
+    """
+    Parses a TEI document and renders it as a CorefUD document, errors are caught and reported in the result
+    (exceptions of the parsers are not always picklable).
+    """
+    result = DocumentResult(doc_path, split)
+    start = time.perf_counter()
+    try:
+        text = load_tei_text(doc_path, layers_mapping)
+        result.parse_time = time.perf_counter() - start
+        start = time.perf_counter()
+        result.conllu = document_to_corefud(text)
+        result.render_time = time.perf_counter() - start
+    except Exception as e:
+        result.error = repr(e)
+    return result
+
+
+def log_result(result: DocumentResult):
+    if result.ok:
+        logger.info(
+            f'{result.split}/{result.doc_path.name}: parsed in {result.parse_time:.3f}s, '
+            f'rendered in {result.render_time:.3f}s'
+        )
+    else:
+        logger.error(f'Error while converting {result.doc_path}: {result.error}')
+
+
+def convert_tei_corpus(
+        root: Path,
+        output_dir: Path,
+        splits: Iterable[str] = SPLITS,
+        workers: int | None = None,
+        layers_mapping: dict = None,
+        on_result: Callable[[DocumentResult], None] = log_result,
+        output_name: str = OUTPUT_NAME,
+) -> list[DocumentResult]:
+    """
+    Converts the documents of root/<split> into output_dir/<output_name> for every split.
+    Failed documents are left out of the output files.
+
+    workers: number of processes, `os.cpu_count()` by default; 0 or 1 converts in the current process
+    on_result: called with the result of every document, in output order
+    returns: results of all documents without their CoNLL-U, e.g. for `write_report`
+    """
+    root, output_dir = Path(root), Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    splits = [split for split in splits if (root / split).is_dir()]
+    doc_paths = {split: find_tei_documents(root / split) for split in splits}
+    # documents of all splits go through one pool, so workers are not idle while a split file is closed
+    args = ((doc_path, split, layers_mapping) for split in splits for doc_path in doc_paths[split])
+
+    results = []
+
+    def on_error(a: tuple, error: Exception):
+        # convert_document catches its own errors, these are failures of the pool (e.g. a killed worker)
+        result = DocumentResult(a[0], a[1], error=repr(error))
+        on_result(result)
+        results.append(result)
+
+    output_files = {}
+    try:
+        for split in splits:
+            output_files[split] = open(output_dir / output_name.format(split=split), 'w')
+        for result in map_documents(convert_document, args, lambda a: a, workers, None, on_error):
+            on_result(result)
+            if result.ok:
+                output_files[result.split].write(result.conllu)
+            result.conllu = None
+            results.append(result)
+    finally:
+        for f in output_files.values():
+            f.write("\n")  # the end of `iter_corefud` output
+            f.close()
+
+    return results
+
+
+def write_report(results: list[DocumentResult], p: Path):
+    """
+    Per-document tab-separated report: split, document, parse and render times in seconds, error.
+    """
+    with open(p, 'w', newline='') as f:
+        writer = csv.writer(f, delimiter='\t')
+        writer.writerow(['split', 'document', 'parse_time', 'render_time', 'error'])
+        for result in results:
+            writer.writerow([
+                result.split, result.doc_path.name, f'{result.parse_time:.4f}', f'{result.render_time:.4f}',
+                result.error or '',
+            ])
+
+
+def summarize(results: list[DocumentResult], elapsed: float) -> str:
+    failed = [result for result in results if not result.ok]
+    cpu_time = sum(result.parse_time + result.render_time for result in results)
+    lines = [
+        f'{len(results) - len(failed)} documents converted, {len(failed)} failed in {elapsed:.1f}s '
+        f'({cpu_time:.1f}s of parsing and rendering)'
+    ]
+    for split in dict.fromkeys(result.split for result in results):
+        split_results = [result for result in results if result.split == split]
+        lines.append(f'{split}: {sum(result.ok for result in split_results)}/{len(split_results)}')
+    lines.extend(f'failed: {result.doc_path}: {result.error}' for result in failed)
+    return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Convert a split TEI corpus into CorefUD files.')
+    parser.add_argument('root', type=Path, help='directory with a subdirectory of TEI documents per split')
+    parser.add_argument('output_dir', type=Path)
+    parser.add_argument('--splits', nargs='+', default=SPLITS)
+    parser.add_argument('--workers', type=int, default=None, help='number of processes, all cores by default')
+    parser.add_argument('--output-name', default=OUTPUT_NAME, help='output file name with a {split} field')
+    parser.add_argument('--report', type=Path, default=None, help='per-document timings and errors as TSV')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    from coref_ds.corefud import convert_tei  # pickled worker functions refer to it, not to __main__
+    start = time.perf_counter()
+    conversion_results = convert_tei.convert_tei_corpus(
+        args.root, args.output_dir, splits=args.splits, workers=args.workers, output_name=args.output_name,
+    )
+    if args.report is not None:
+        convert_tei.write_report(conversion_results, args.report)
+    print(convert_tei.summarize(conversion_results, time.perf_counter() - start))
@@ -1,36 +1,84 @@
 from pathlib import Path
 from collections import Counter
 from abc import abstractmethod
+from typing import Callable
+import logging
 
 
 import udapi
 from udapi.block.read.conllu import Conllu as ConlluReader
 from udapi.block.write.conllu import Conllu as ConlluWriter
-from coref_ds.corefud.utils import add_mention, clusters_from_doc, node_to_segment, prepare_alignment
+from udapi.core.document import Document
+from coref_ds.align import AlignmentReport, align_documents
+from coref_ds.cache import get_default_cache
+from coref_ds.corefud import conllu_reader
+from coref_ds.corefud.utils import (
+    add_clusters_bulk, add_mention, clusters_from_doc, node_to_segment, prepare_alignment, sentence_indices,
+)
 
 from coref_ds.text import Text
 
+logger = logging.getLogger(__name__)
+
 
 class CorefUDDoc:
+    segment_ids = True  # set `Segment.id` to the udapi node address
+
     def __init__(self, p: Path):
         self.doc_path = p
         self.corpus_name = p.parent.parent.name  # after preprocessing
         self.part = p.parent.name
-        self.udapi_docs = None
+        self._udapi_docs = None  # parsed on first access
+        self._unstored_coref_docs = []  # docs with coreference not yet stored in MISC
         self.first_sentence_ind = 0
         self.first_paragraph_ind = 0
-        self.parse_doc()
+
+    @property
+    def udapi_docs(self):
+        if self._udapi_docs is None:
+            self.parse_doc()
+        return self._udapi_docs
+
+    @udapi_docs.setter
+    def udapi_docs(self, udapi_docs):
+        self._udapi_docs = udapi_docs
 
     @classmethod
     def from_file(cls, p: Path):
         return cls(p)
 
     def parse_doc(self):
-        with open(self.doc_path) as f:
-            udapi_docs = ConlluReader(filehandle=f, split_docs=True).read_documents()
-        self.udapi_docs = list(
-            filter(lambda doc: list(doc.nodes_and_empty), udapi_docs)
-            )
+        self.udapi_docs = list(self.iter_udapi_docs(self.doc_path))
+
+    @staticmethod
+    def iter_udapi_docs(p: Path):
+        """
+        Reads a .conllu file one `# newdoc` block at a time, yields non-empty udapi documents.
+        """
+        with open(p) as f:
+            reader = ConlluReader(filehandle=f, split_docs=True)
+            while not reader.finished:
+                doc = Document()
+                reader.apply_on_document(doc)
+                if next(iter(doc.nodes_and_empty), None) is not None:
+                    yield doc
+
+    @classmethod
+    def iter_texts(cls, p: Path, backend: str = 'udapi'):
+        """
+        Yields a `Text` for every document of a multi-document .conllu file,
+        holding only one parsed document in memory at a time.
+        backend: 'udapi', or 'conllu' to read lines straight into texts without udapi trees (`conllu_reader`)
+        """
+        p = Path(p)
+        if backend == 'conllu':
+            yield from conllu_reader.iter_texts(p)
+            return
+        elif backend != 'udapi':
+            raise ValueError(f'Unknown backend {backend}')
+        corefud_doc = cls(p)
+        for doc in cls.iter_udapi_docs(p):
+            yield corefud_doc.doc_to_text(doc)
 
     @abstractmethod
     def get_sentence_ind(self, address: str) -> int:
@@ -66,41 +114,62 @@ class CorefUDDoc:
             
     @property
     def text(self) -> Text:
-        if len(self.udapi_docs) == 1:
-            doc = self.udapi_docs[0]
-            segment_ind = 0
-            segments_meta = []
-            for sentence in doc.trees:
-                words = list(sentence.descendants)
-                words_addresses = {w.address():w_ind for w_ind, w in enumerate(words)}
-                for w_ind, w in enumerate(words):
-                    last_in_sent = w_ind == len(words) - 1
-                    segments_meta.append(
-                        node_to_segment(w, segment_ind, last_in_sent=last_in_sent, words_addresses=words_addresses)
-                    )
-                    segment_ind += 1
-
-            text_id = Path(doc.meta.get('docname', self.doc_path.name)).stem.split('_')[0]
-            cluster_mapping = clusters_from_doc(doc, segments_meta)
-            text = Text(
-                text_id=text_id,
-                segments=[n.form for n in doc.nodes],
-                segments_meta=segments_meta,
-                clusters=cluster_mapping['clusters'],
-                mentions=cluster_mapping['mentions'],
-            )
-            return text
+        cache = get_default_cache()
+        if cache is None or self._udapi_docs is not None:  # documents may have been modified in memory
+            return self.parse_text()
+        return cache.get_or_parse(
+            f'{type(self).__qualname__}:segment_ids={self.segment_ids}',
+            [self.doc_path],
+            lambda: self.parse_text(list(self.iter_udapi_docs(self.doc_path))),  # not kept, the text is cached
+        )
+
+    def parse_text(self, udapi_docs: list[Document] = None) -> Text:
+        """
+        udapi_docs: `self.udapi_docs` by default
+        """
+        if udapi_docs is None:
+            udapi_docs = self.udapi_docs
+        if len(udapi_docs) == 1:
+            return self.doc_to_text(udapi_docs[0])
         else:
             raise ValueError('More than one document in CorefUDDoc')
 
-    def add_text_clusters_to_doc(self, text, doc, mentions_set=None, ent_ids=None):
+    def doc_to_text(self, doc) -> Text:
+        segment_ind = 0
+        segments_meta = []
+        nodes_index = {}
+        for sentence in doc.trees:
+            words = sentence.descendants
+            sent_id = sentence.address()
+            for w_ind, w in enumerate(words):
+                last_in_sent = w_ind == len(words) - 1
+                segments_meta.append(
+                    node_to_segment(
+                        w, segment_ind, last_in_sent=last_in_sent, sent_id=sent_id, with_id=self.segment_ids
+                    )
+                )
+                nodes_index[id(w)] = segment_ind
+                segment_ind += 1
+
+        text_id = Path(doc.meta.get('docname', self.doc_path.name)).stem.split('_')[0]
+        cluster_mapping = clusters_from_doc(doc, segments_meta, nodes_index)
+        text = Text(
+            text_id=text_id,
+            segments=[n.form for n in doc.nodes],
+            segments_meta=segments_meta,
+            clusters=cluster_mapping['clusters'],
+            mentions=cluster_mapping['mentions'],
+        )
+        return text
+
+    def add_text_clusters_to_doc(self, text, doc, mentions_set=None, ent_ids=None, report: AlignmentReport = None):
         if mentions_set is None:
             mentions_set = set()
         if ent_ids is None:
             ent_ids = [1]
         udapi_words = [word for word in doc.nodes_and_empty]
         udapi_words_str = [word.form for word in udapi_words]
-        aligned_clusters, aligned_heads = prepare_alignment(text, udapi_words_str)
+        aligned_clusters, aligned_heads = prepare_alignment(text, udapi_words_str, report=report)
         for cluster in aligned_clusters:
             ent_id = len(ent_ids)
             entity = doc.create_coref_entity(eid=f'c{ent_id}')
@@ -116,7 +185,22 @@ class CorefUDDoc:
                 )
         udapi.core.coref.store_coref_to_misc(doc)
 
-    def map_clusters(self, texts: list[Text], docname_mapper: callable = None):
+    def map_clusters(
+            self,
+            texts: list[Text],
+            docname_mapper: callable = None,
+            bulk: bool = False,
+            workers: int = 0,
+            progress: Callable[[int, int, str], None] = None,
+            report: AlignmentReport = None,
+    ):
+        """
+        bulk: align all texts in one batch (in workers processes, see `align_documents`), create the mentions
+            with `add_clusters_bulk` and leave storing coreference in MISC to the writer of `to_file`
+            (or `store_coref`), instead of storing it after every text and once again when writing
+        progress: called with the number of texts done, the number of texts and the text id after every text
+        report: collects the mentions which could not be aligned
+        """
         if docname_mapper is None:
             docname_mapper = lambda x: x
         
@@ -124,15 +208,48 @@ class CorefUDDoc:
         udapi_docs_map = {docname_mapper(doc.meta['docname']): doc for doc in self.udapi_docs}
         ent_ids = [1]
 
+        texts_docs = []
         for text in texts:
             doc = udapi_docs_map.get(text.text_id)
             if doc:
-                print(f'Adding clusters for {text.text_id}')
-                self.add_text_clusters_to_doc(text, doc, ent_ids=ent_ids)
+                texts_docs.append((text, doc))
             else:
-                print(f'No doc found for {text.text_id}')
+                logger.warning(f'No doc found for {text.text_id}')
+
+        if bulk:
+            udapi_words = [list(doc.nodes_and_empty) for _, doc in texts_docs]
+            aligned = align_documents(
+                [text.segments for text, _ in texts_docs],
+                [[word.form for word in words] for words in udapi_words],
+                [text.clusters for text, _ in texts_docs],
+                [text.heads for text, _ in texts_docs],
+                workers=workers,
+                report=report,
+            )
+
+        for ind, (text, doc) in enumerate(texts_docs):
+            logger.debug(f'Adding clusters for {text.text_id}')
+            if bulk:
+                add_clusters_bulk(
+                    doc, aligned[ind].clusters, aligned[ind].heads, udapi_words[ind], sentence_indices(doc), ent_ids
+                )
+                self._unstored_coref_docs.append(doc)
+            else:
+                self.add_text_clusters_to_doc(text, doc, ent_ids=ent_ids, report=report)
+            if progress is not None:
+                progress(ind + 1, len(texts_docs), text.text_id)
+        logger.info(f'Added clusters of {len(texts_docs)} texts, {len(ent_ids) - 1} entities')
+
+    def store_coref(self):
+        """
+        Stores the coreference added by `map_clusters(bulk=True)` in MISC.
+        """
+        for doc in self._unstored_coref_docs:
+            udapi.core.coref.store_coref_to_misc(doc)
+        self._unstored_coref_docs = []
 
     def to_file(self, p: Path):
+        self._unstored_coref_docs = []  # the writer stores coreference in MISC of every document
         with open(p, 'w') as f:
             writer = ConlluWriter(filehandle=f)
             for ind, doc in enumerate(self.udapi_docs):
@@ -1,6 +1,8 @@
 from collections import defaultdict
 from pathlib import Path
+from typing import Iterable, Iterator, TextIO
 import json
+import operator
 from dataclasses import dataclass
 from datetime import datetime
 
@@ -11,6 +13,8 @@ from coref_ds.text import Text
 from coref_ds.text import Mention
 from coref_ds.text import Segment
 
+FIRST = operator.itemgetter(0)
+
 with open('pcc_structure_reversed.json', 'r') as json_file:
     pcc_structure_reversed = json.load(json_file)
 
@@ -71,49 +75,48 @@ def get_indices_to_mention_mapping(text: Text):
 
     text.index_to_mention_start = index_to_mention_start
     text.index_to_mention_end = index_to_mention_end
+    text.entity_markup = get_entity_markup(text)
 
     return text
 
 
+def get_entity_markup(text: Text) -> dict[int, str]:
+    """
+    MISC value of every token starting or ending a mention, computed in one sweep over the mentions:
+    closing brackets (sorted by mention start), opening brackets (sorted by mention end), then singletons.
+    Mention ids are assumed to be unique, so singletons are the one-token mentions.
+    """
+    closes, opens, singletons = defaultdict(list), defaultdict(list), defaultdict(list)
+    for seg_ind, mentions in text.index_to_mention_start.items():
+        for m in mentions:
+            introduction = gen_entity_markup_introduction(m, text.text_id)
+            if m.span_end == seg_ind:
+                singletons[seg_ind].append(f"({introduction})")
+            else:
+                opens[seg_ind].append((m.span_end, f"({introduction}"))
+                closes[m.span_end].append((seg_ind, f"{get_entity_id(m, text.text_id)})"))
+
+    entity_markup = {}
+    for seg_ind in closes.keys() | opens.keys() | singletons.keys():
+        markup = ['Entity=']
+        # stable sorts keep the mentions order for equal keys
+        markup.extend(bracket for _, bracket in sorted(closes.get(seg_ind, ()), key=FIRST))
+        markup.extend(bracket for _, bracket in sorted(opens.get(seg_ind, ()), key=FIRST))
+        markup.extend(singletons.get(seg_ind, ()))
+        entity_markup[seg_ind] = ''.join(markup)
+
+    return entity_markup
+
+
 def gen_corefud_for_token(seg: Segment, text: Text, sentence: list[Segment]):
-    entities = []
-    seg_ind = seg.get_token_index()
-
-    mentions_starting_at_seg = text.index_to_mention_start[seg_ind]
-    mentions_ending_at_seg = text.index_to_mention_end[seg_ind]
-    singletons_ids_at_seg = set([m.id for m in mentions_starting_at_seg]) & set([
-        m.id for m in mentions_ending_at_seg])
-    singletons_at_seg = [
-        m for m in mentions_starting_at_seg if m.id in singletons_ids_at_seg]
-
-    mentions_starting_at_seg = list(
-        filter(lambda m: m.id not in singletons_ids_at_seg, mentions_starting_at_seg))
-    mentions_ending_at_seg = list(
-        filter(lambda m: m.id not in singletons_ids_at_seg, mentions_ending_at_seg))
-
-    mentions_starting_at_seg.sort(key=lambda m: m.span_end)
-    mentions_ending_at_seg.sort(key=lambda m: m.span_start)
-
-    for m in mentions_ending_at_seg:
-        entities.append(
-            f"{get_entity_id(m, text.text_id)})"
-        )
-    for m in mentions_starting_at_seg:
-        entities.append(
-            f"({gen_entity_markup_introduction(m, text.text_id)}"
-        )
-    for m in singletons_at_seg:
-        entities.append(
-            f"({gen_entity_markup_introduction(m, text.text_id)})"
-        )
-
-    if entities:
-        return 'Entity=' + ''.join(entities)
-    else:
-        return '_'
+    return text.entity_markup.get(seg.get_token_index(), '_')
 
 
 def text_to_corefud(text: Text) -> list[TokenList]:
+    return list(iter_text_to_corefud(text))
+
+
+def iter_text_to_corefud(text: Text) -> Iterator[TokenList]:
     text = get_indices_to_mention_mapping(text)
     sentences = []
     curr_sentence = None
@@ -133,7 +136,6 @@ def text_to_corefud(text: Text) -> list[TokenList]:
     # for every sentence:
         #  - sentence_id
         # - full sentence text (spaced)
-    conllu_sents = []
     for sent_ind, sentence in enumerate(sentences):
         sent_id = sent_ind + 1
         data = []
@@ -153,30 +155,60 @@ def text_to_corefud(text: Text) -> list[TokenList]:
                 "deps": '_',
                 "misc": misc,
             })
-        conllu_sent = conllu.TokenList(
+        yield conllu.TokenList(
             data, metadata={"sent_id": sent_id, "text": get_sentence_text(sentence)})
-        conllu_sents.append(conllu_sent)
 
-    return conllu_sents
+
+def serialize_sentence(token_list: TokenList) -> str:
+    """
+    Same as `TokenList.serialize` for the flat (str, int or None) token fields written here.
+    """
+    lines = [f"# {key} = {value}" if value else f"# {key}" for key, value in token_list.metadata.items()]
+    lines.extend('\t'.join('_' if value is None else str(value) for value in token.values()) for token in token_list)
+    return '\n'.join(lines) + "\n\n"
 
 
-def texts_to_corefud(texts: list[Text]):
+def iter_document_corefud(text: Text) -> Iterator[str]:
+    """
+    Serialized CorefUD of one text in chunks: the document header, then its sentences.
+    """
     entity_metadata = "global.Entity = eid-etype-head-other"
-    lines = []
 
+    yield f"# newdoc id = {gen_full_text_id(text)}"
+    yield "\n"
+    yield f"# {entity_metadata}"
+    for token_list in iter_text_to_corefud(text):
+        yield serialize_sentence(token_list)
+
+
+def document_to_corefud(text: Text) -> str:
+    """
+    Serialized CorefUD of one text, `iter_corefud` output is these documents joined and followed by a newline.
+    """
+    return ''.join(iter_document_corefud(text))
+
+
+def iter_corefud(texts: Iterable[Text]) -> Iterator[str]:
+    """
+    Serialized CorefUD of texts in chunks (document headers and sentences), one text at a time.
+    """
     for text in texts:
-        text_sents = text_to_corefud(text)
-        lines.extend([
-            f"# newdoc id = {gen_full_text_id(text)}",
-            "\n",
-            f"# {entity_metadata}"
-        ])
-        for token_list in text_sents:
-            lines.append(token_list.serialize())
+        yield from iter_document_corefud(text)
 
-    return ''.join(lines) + "\n"
+    yield "\n"
 
 
-def write_corefud(texts: list[Text], p: Path):
-    with open(p, "w") as f:
-        f.write(texts_to_corefud(texts))
+def texts_to_corefud(texts: Iterable[Text]):
+    return ''.join(iter_corefud(texts))
+
+
+def write_corefud(texts: Iterable[Text], p: Path | TextIO):
+    """
+    Writes texts one sentence at a time, texts can be any iterable, e.g. a corpus loader.
+    p: path or a text file handle
+    """
+    if hasattr(p, 'write'):
+        p.writelines(iter_corefud(texts))
+    else:
+        with open(p, "w") as f:
+            f.writelines(iter_corefud(texts))
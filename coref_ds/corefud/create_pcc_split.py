@@ -2,6 +2,8 @@ from pathlib import Path
 
 from dotenv import dotenv_values
 
+from coref_ds.corefud.doc_index import DocumentIndex
+
 local_config = dotenv_values(".env")
 
 TEXT_HEADER = '# newdoc id = '
@@ -13,31 +15,29 @@ def get_text_id(text: str):
     text_id = text.split('_words')[0].split('/')[-1]
     return text_id
 
-def get_corefud_texts(paths: list[Path]) -> dict:
+def get_corefud_texts(paths: list[Path]) -> dict[str, tuple[DocumentIndex, str]]:
+    """
+    Document index and newdoc id of every text of the CoNLL-U files, keyed by text id.
+    The caller owns the indexes, their memory maps stay open until `close_texts`.
+    """
     texts = {}
 
     for path in paths:
-        with open(path) as f:
-            file_str = f.read()
-
-        path_texts = file_str.split(TEXT_HEADER)
-        path_ids = [get_text_id(p) for p in path_texts]
+        index = DocumentIndex.load(path)
         texts.update(
-            {text_id: text for text_id, text in zip(path_ids, path_texts) if text}
+            {get_text_id(doc_id): (index, doc_id) for doc_id in index}
         )
     return texts
 
+def close_texts(texts: dict[str, tuple[DocumentIndex, str]]):
+    for index in {id(index): index for index, _ in texts.values()}.values():
+        index.close()
+
 def create_split(ids: list[str], texts: dict, output: Path):
-    subset = []
-
-    for text_id in ids:
-        subset.append(texts[text_id])
-    
-    with open(output, 'w') as f:
-        f.write(TEXT_HEADER)
-        f.write(
-            TEXT_HEADER.join(subset)
-        )
+    with open(output, 'wb') as f:
+        for text_id in ids:
+            index, doc_id = texts[text_id]
+            index.write_document(doc_id, f)
         
 if __name__ == '__main__':
     new_split_dir = Path('/mnt/c/Users/karol/OneDrive/Documents/IPI_PAN/koreferencja/Datasets/CorefUD-1.1-corneferencer-split/')
@@ -51,10 +51,13 @@ if __name__ == '__main__':
         ])
     print(sorted(corefud_texts.keys()))
     print(len(list(corefud_texts.keys())))
-    for split_dir in tei_splits_dir.iterdir():
-        text_ids = get_split_text_ids(split_dir)
-        create_split(
-            ids=text_ids,
-            texts=corefud_texts,
-            output=new_split_dir / f'pl_pcc-corefud-{split_dir.name}.conllu'
-        )
\ No newline at end of file
+    try:
+        for split_dir in tei_splits_dir.iterdir():
+            text_ids = get_split_text_ids(split_dir)
+            create_split(
+                ids=text_ids,
+                texts=corefud_texts,
+                output=new_split_dir / f'pl_pcc-corefud-{split_dir.name}.conllu'
+            )
+    finally:
+        close_texts(corefud_texts)
\ No newline at end of file
@@ -0,0 +1,151 @@
+"""
+Byte-offset index of the documents (`# newdoc id = ` blocks) of a CoNLL-U file over a memory-mapped file,
+so that documents can be read or copied to other files without loading the whole file.
+"""
+import json
+import logging
+import mmap
+import os
+from pathlib import Path
+from typing import BinaryIO, Iterator
+
+logger = logging.getLogger(__name__)
+
+NEWDOC = b'# newdoc id = '
+SIDECAR_SUFFIX = '.docidx.json'
+
+
+def sidecar_path(p: Path) -> Path:
+    return p.with_name(p.name + SIDECAR_SUFFIX)
+
+
+def file_signature(p: Path) -> list[int]:
+    stat = os.stat(p)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def find_documents(data) -> dict[str, tuple[int, int]]:
+    """
+    (start, end) byte offsets of every document of data (bytes or mmap), keyed by the newdoc id.
+    A document starts at its `# newdoc id = ` line and ends where the next one starts, bytes before the first
+    newdoc line are not indexed. Later documents with a repeated id replace earlier ones.
+    """
+    starts = [0] if data[:len(NEWDOC)] == NEWDOC else []
+    pos = data.find(b'\n' + NEWDOC)
+    while pos != -1:
+        starts.append(pos + 1)
+        pos = data.find(b'\n' + NEWDOC, pos + 1)
+
+    documents = {}
+    for start, end in zip(starts, starts[1:] + [len(data)]):
+        line_end = data.find(b'\n', start, end)
+        doc_id = data[start + len(NEWDOC):end if line_end == -1 else line_end]
+        documents[doc_id.decode('utf-8').strip()] = (start, end)
+    return documents
+
+
+class DocumentIndex:
+    """
+    Documents of a CoNLL-U file, read from a memory map opened on first access.
+    `DocumentIndex.load` reuses the index stored in a sidecar file next to the CoNLL-U file
+    as long as the file has not changed.
+    """
+    def __init__(self, p: Path, documents: dict[str, tuple[int, int]], signature: list[int]):
+        self.p = Path(p)
+        self.documents = documents
+        self.signature = signature
+        self._file = None
+        self._mmap = None
+
+    @classmethod
+    def build(cls, p: Path) -> 'DocumentIndex':
+        p = Path(p)
+        signature = file_signature(p)
+        with open(p, 'rb') as f:
+            if signature[0] == 0:  # empty files cannot be memory-mapped
+                return cls(p, {}, signature)
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return cls(p, find_documents(mm), signature)
+
+    @classmethod
+    def load(cls, p: Path, save: bool = True) -> 'DocumentIndex':
+        """
+        save: write a rebuilt index to the sidecar file
+        """
+        p = Path(p)
+        try:
+            with open(sidecar_path(p)) as f:
+                stored = json.load(f)
+            if stored['signature'] == file_signature(p):
+                return cls(p, {doc_id: tuple(span) for doc_id, span in stored['documents']}, stored['signature'])
+        except (OSError, ValueError, KeyError):
+            pass
+
+        index = cls.build(p)
+        if save:
+            try:
+                index.save()
+            except OSError as e:
+                logger.warning(f'Could not save the document index of {p}: {e!r}')
+        return index
+
+    def save(self):
+        with open(sidecar_path(self.p), 'w') as f:
+            json.dump({
+                'signature': self.signature,
+                'documents': [[doc_id, list(span)] for doc_id, span in self.documents.items()],
+            }, f)
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.documents)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self.documents
+
+    @property
+    def mmap(self) -> mmap.mmap:
+        if self._mmap is None:
+            self._file = open(self.p, 'rb')
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mmap
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._file.close()
+            self._mmap, self._file = None, None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def span(self, doc_id: str, strip: bool = False) -> tuple[int, int]:
+        """
+        strip: exclude the whitespace (e.g. the empty lines) at the end of the document
+        """
+        start, end = self.documents[doc_id]
+        if strip:
+            mm = self.mmap
+            while end > start and mm[end - 1:end].isspace():
+                end -= 1
+        return start, end
+
+    def read(self, doc_id: str, strip: bool = False) -> bytes:
+        start, end = self.span(doc_id, strip)
+        return self.mmap[start:end]
+
+    def text(self, doc_id: str, strip: bool = False) -> str:
+        return self.read(doc_id, strip).decode('utf-8')
+
+    def write_document(self, doc_id: str, f: BinaryIO, strip: bool = False):
+        """
+        Writes the document to a binary file straight from the memory map, without copying it.
+        """
+        start, end = self.span(doc_id, strip)
+        with memoryview(self.mmap) as view, view[start:end] as document:
+            f.write(document)
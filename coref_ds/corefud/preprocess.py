@@ -3,32 +3,31 @@ from pathlib import Path
 from tqdm import tqdm
 from dotenv import dotenv_values
 
+from coref_ds.corefud.doc_index import DocumentIndex
+
 
 
 def split_into_one_texts(
         p: Path,
         glob_pattern: str = '**/*.conllu',
-        split_phrase = '# newdoc id = ',
         ):
+    """
+    Copies every document of the CoNLL-U files under p into its own file, straight from the memory-mapped files.
+    """
     for ds_path in tqdm(p.glob(glob_pattern)):
         ds_path_split = ds_path.stem.split('-')
         part_name = ds_path_split[-1]  # fr_democrat-corefud-dev.conllu
         ds_name = ds_path_split[0]
 
-        with open(ds_path, 'r') as f:
-            ds = f.read()
-
-        texts = ds.split(split_phrase)
         ds_dir = p.parent / 'data_split' / part_name / ds_name
         ds_dir.mkdir(parents=True, exist_ok=True)
-        for text in tqdm(texts):
-            text = text.strip()
-            if text:
-                text_name = text[:text.find('\n')].replace('/', '_')
-                with open(ds_dir / f'{text_name}{ds_path.suffix}', 'w') as f:
-                    f.write(split_phrase + text)
+        with DocumentIndex.load(ds_path) as index:
+            for doc_id in tqdm(index):
+                text_name = doc_id.replace('/', '_')
+                with open(ds_dir / f'{text_name}{ds_path.suffix}', 'wb') as f:
+                    index.write_document(doc_id, f, strip=True)
 
 
 if __name__ == '__main__':
     local_config = dotenv_values()
-    split_into_one_texts(local_config['COREFUD_PATH'])
\ No newline at end of file
+    split_into_one_texts(Path(local_config['COREFUD_PATH']))
\ No newline at end of file
@@ -5,8 +5,10 @@ from pathlib import Path
 import logging
 
 import udapi
+from udapi.core.coref import CorefMention
 
-from coref_ds.align import align, align_heads, get_alignment
+from coref_ds.align import AlignmentReport, align_documents
+from coref_ds.cache import AlignmentCache
 from coref_ds.text import Segment
 from coref_ds.text import Mention
 
@@ -31,19 +33,20 @@ def corefud_name_mapper(name: str) -> str:
     return name
 
 
-def prepare_alignment(text, udapi_words_str):
-    alignment, alignment_back = get_alignment(text.segments, udapi_words_str)
-    aligned_clusters, indices_mapping = align(
-        udapi_words_str, text.segments, text.clusters, alignment=alignment
+def prepare_alignment(text, udapi_words_str, report: AlignmentReport = None, cache: AlignmentCache = None):
+    """
+    report: collects the mentions which could not be aligned
+    cache: `get_default_alignment_cache()` by default
+    """
+    aligned, = align_documents(
+        [text.segments], [udapi_words_str], [text.clusters], [text.heads], report=report, cache=cache
     )
-    aligned_heads = align_heads(
-        text.heads, indices_mapping, alignment=alignment)
-    return aligned_clusters, aligned_heads
+    return aligned.clusters, aligned.heads
 
 
 def get_sent_id(word):
     if word:
-        return word.address().split('#')[0]
+        return word.root.address()
     else:
         return None
 
@@ -88,8 +91,82 @@ def add_mention(
     mentions_set.add(mention)
 
 
-def node_to_segment(node: udapi.core.node.Node, node_position_in_text: int = None, last_in_sent: bool = False, words_addresses: dict = None) -> str:
-    nps_interps = [",", ".", ";", ":", "!", "?", "„", "”", "(", ")"]
+def sentence_indices(doc) -> list[int]:
+    """
+    Index of the sentence (tree) of every node of `doc.nodes_and_empty`.
+    """
+    indices = []
+    sent_ind = 0
+    for bundle in doc:
+        for tree in bundle:
+            indices.extend([sent_ind] * len(tree.descendants_and_empty))
+            sent_ind += 1
+    return indices
+
+
+def add_clusters_bulk(doc, aligned_clusters, aligned_heads, udapi_words, word_sentences, ent_ids) -> int:
+    """
+    Same as `add_mention` for all mentions of aligned clusters, one entity per cluster.
+    Mentions are created without the checks of `CorefEntity.create_mention` (words of a span are already sorted)
+    and the mentions of every entity are sorted once. Cross-sentence mentions are skipped, empty spans as well.
+    MISC is not updated, see `udapi.core.coref.store_coref_to_misc`.
+
+    word_sentences: `sentence_indices(doc)`
+    returns: number of created mentions
+    """
+    n_words = len(udapi_words)
+    added = set()
+    for cluster in aligned_clusters:
+        ent_id = len(ent_ids)
+        entity = doc.create_coref_entity(eid=f'c{ent_id}')
+        ent_ids.append(ent_id)
+        for mention in cluster:
+            start, end = mention
+            key = start * (n_words + 1) + end
+            if key in added or not 0 <= start < end <= n_words:
+                continue
+            if word_sentences[start] != word_sentences[end - 1]:
+                continue  # cross-sentence mention
+            words = udapi_words[start:end]
+            head_ind = aligned_heads.get(mention)
+            head = udapi_words[head_ind] if head_ind is not None and start <= head_ind < end else words[0]
+            CorefMention(words, head=head, entity=entity)
+            added.add(key)
+        entity._mentions.sort()
+    return len(added)
+
+
+NPS_INTERPS = [",", ".", ";", ":", "!", "?", "„", "”", "(", ")"]
+
+
+class NodeSegment(Segment):
+    """
+    Segment of a CoNLL-U word whose `id` (the node address, e.g. 's1#3') is set as a (sentence id, ord) pair
+    and formatted only when it is first read.
+    """
+
+    @property
+    def id(self) -> str | None:
+        if isinstance(self._id, tuple):
+            self._id = f'{self._id[0]}#{self._id[1]}'
+        return self._id
+
+    @id.setter
+    def id(self, value: str | tuple[str, int] | None):
+        self._id = value
+
+
+def node_to_segment(
+    node: udapi.core.node.Node,
+    node_position_in_text: int = None,
+    last_in_sent: bool = False,
+    sent_id: str | None = None,
+    with_id: bool = True,
+) -> Segment:
+    """
+    sent_id: address of the node root, pass it to skip computing it for every node of a sentence
+    with_id: set `Segment.id` to the node address, formatted on first access (see `NodeSegment`)
+    """
     try:
         prev_node = node.prev_node
     except IndexError:
@@ -101,22 +178,25 @@ def node_to_segment(node: udapi.core.node.Node, node_position_in_text: int = Non
         has_nps = False
     else:
         has_nps = True if (prev_node and prev_node.no_space_after) or (
-            node.form in nps_interps) else False
+            node.form in NPS_INTERPS) else False
 
-    if words_addresses and node.parent:
-        if node.deprel == 'root':
-            dep_head = 0
-        else:
-            dep_head = words_addresses.get(node.parent.address()) + 1
+    if node.parent:
+        # words of a sentence are numbered from 1 by ord, so the parent ord is its position
+        dep_head = 0 if node.deprel == 'root' else node.parent.ord
     else:
         dep_head = '_'
 
-    meta = Segment(
+    if with_id:
+        node_id = (node.root.address() if sent_id is None else sent_id, node.ord)
+    else:
+        node_id = None
+
+    meta = NodeSegment(
         orth=node.form,
         lemma=node.lemma,
         has_nps=has_nps,
         pos=node.upos,
-        id=node.address(),
+        id=node_id,
         deprel=node.deprel,
         dep_head=dep_head,
         index=node_position_in_text,
@@ -125,10 +205,20 @@ def node_to_segment(node: udapi.core.node.Node, node_position_in_text: int = Non
     return meta
 
 
-def clusters_from_doc(doc, segments):
-    address2ind = {
-        node.address(): ind for ind, node in enumerate(doc.nodes)
-    }
+def index_nodes(doc) -> dict[int, int]:
+    """
+    Position in text of every (non-empty) node of a udapi document, keyed by node identity (`id(node)`).
+    Valid as long as the document is alive.
+    """
+    return {id(node): ind for ind, node in enumerate(doc.nodes)}
+
+
+def clusters_from_doc(doc, segments, nodes_index: dict[int, int] = None):
+    """
+    nodes_index: `index_nodes(doc)` if already built
+    """
+    if nodes_index is None:
+        nodes_index = index_nodes(doc)
     mentions = []
     clusters = defaultdict(list)
     for ent in doc.coref_entities:
@@ -136,8 +226,8 @@ def clusters_from_doc(doc, segments):
         for men_ind, men in enumerate(ent.mentions):
             words = list(men.words)
 
-            start_ind = address2ind.get(words[0].address())
-            end_ind = address2ind.get(words[-1].address())
+            start_ind = nodes_index.get(id(words[0]))
+            end_ind = nodes_index.get(id(words[-1]))
             if start_ind is None or end_ind is None:
                 continue
             clusters[ent.eid].append(
@@ -151,7 +241,7 @@ def clusters_from_doc(doc, segments):
                     segments=segments[start_ind:(end_ind+1)],
                     span_start=start_ind,
                     span_end=end_ind,
-                    head=address2ind[men.head.address()],
+                    head=nodes_index[id(men.head)],
                     head_orth=men.head.form,
                     cluster_id=eid,
                 )
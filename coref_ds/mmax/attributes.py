@@ -34,3 +34,11 @@ MARKABLE_ATTRIBUTES = {
     'excluding_ios': 'empty',
     'supporting_other_facet': 'none'
 }
+
+# attributes kept in the slots of every `Markable`, the remaining ones (facets) are stored only if they differ
+# from the defaults
+MARKABLE_SLOTS = ('id', 'span', 'mention_group', 'mention_head')
+FACET_DEFAULTS = {k: v for k, v in MARKABLE_ATTRIBUTES.items() if k not in MARKABLE_SLOTS}
+
+# attributes written by `Markable.to_xml`, the slots are filled in per markable
+MARKABLE_XML_TEMPLATE = {**MARKABLE_ATTRIBUTES, 'supporting_metareference': 'none'}
@@ -0,0 +1,123 @@
+"""
+Conversion of MMAX corpora into `Text`s and of `Text`s into MMAX documents in a process pool.
+PCC-1.5-MMAX has a directory per group of `pcc_structure_reversed.json` (long/, short/, very_short/, ...).
+
+python -m coref_ds.mmax.corpus MMAX_ROOT OUTPUT_DIR [--groups long short] [--workers N]
+
+rewrites the documents of MMAX_ROOT into OUTPUT_DIR/<group>/, run it from the repository root,
+the groups are read from `pcc_structure_reversed.json` there.
+"""
+import argparse
+import json
+import logging
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+
+from coref_ds.mmax.mmax_doc import MmaxDoc
+from coref_ds.text import Text
+from coref_ds.utils import map_documents
+
+logger = logging.getLogger(__name__)
+
+PCC_STRUCTURE = Path('pcc_structure_reversed.json')
+
+
+def load_pcc_structure(p: Path = PCC_STRUCTURE) -> dict[str, str]:
+    """
+    Group (long, short, ...) of every PCC text id.
+    """
+    with open(p) as f:
+        return json.load(f)
+
+
+def find_mmax_documents(root: Path, groups: Iterable[str] = None) -> list[Path]:
+    """
+    .mmax files under root, or under root/<group> for every group of groups, sorted by path.
+    """
+    root = Path(root)
+    dirs = [root] if groups is None else [root / group for group in groups]
+    return sorted(p for d in dirs for p in d.rglob('*.mmax'))
+
+
+def load_mmax_text(doc_path: Path) -> Text:
+    return MmaxDoc.from_file(doc_path).text
+
+
+def write_mmax_text(text: Text, output_dir: Path, group: str = None) -> Path:
+    """
+    Writes text as an MMAX document into output_dir/group (output_dir without group), returns the .mmax path.
+    """
+    doc_dir = Path(output_dir) / group if group else Path(output_dir)
+    doc_dir.mkdir(parents=True, exist_ok=True)
+    MmaxDoc.from_text(text).to_file(doc_dir)
+    return doc_dir / f'{text.text_id}.mmax'
+
+
+def log_error(doc, error: Exception):
+    logger.error(f'Error while converting {doc}: {error!r}')
+
+
+def load_mmax_corpus(
+        root: Path,
+        groups: Iterable[str] = None,
+        workers: int | None = None,
+        max_in_flight: int | None = None,
+        on_error: Callable[[Path, Exception], None] = log_error,
+        doc_paths: list[Path] = None,
+) -> Iterator[Text]:
+    """
+    Parses all MMAX documents under root in a process pool and yields their `Text`s in `find_mmax_documents` order.
+
+    groups: subdirectories of root to load, e.g. ['long', 'short'], all documents under root by default
+    workers: number of processes, `os.cpu_count()` by default; 0 or 1 parses in the current process
+    max_in_flight: documents submitted to the pool and not yet yielded, 4 * workers by default
+    on_error: called with the document path and the exception for documents which failed to load,
+        these documents are skipped
+    doc_paths: explicit .mmax files to load instead of searching root
+    """
+    if doc_paths is None:
+        doc_paths = find_mmax_documents(root, groups)
+    yield from map_documents(
+        load_mmax_text, ((doc_path,) for doc_path in doc_paths), lambda a: a[0], workers, max_in_flight, on_error,
+    )
+
+
+def write_mmax_corpus(
+        texts: Iterable[Text],
+        output_dir: Path,
+        structure: dict[str, str] = None,
+        workers: int | None = None,
+        max_in_flight: int | None = None,
+        on_error: Callable[[str, Exception], None] = log_error,
+) -> list[Path]:
+    """
+    Writes texts as MMAX documents in a process pool, texts are consumed lazily (e.g. from `load_mmax_corpus`).
+
+    structure: group of every text id (see `load_pcc_structure`), texts are written into output_dir/<group>,
+        texts without a group straight into output_dir
+    workers, max_in_flight: see `load_mmax_corpus`
+    on_error: called with the text id and the exception for texts which could not be written
+    returns: .mmax paths of the written texts, in texts order
+    """
+    structure = structure or {}
+    args = ((text, output_dir, structure.get(text.text_id)) for text in texts)
+    return list(map_documents(write_mmax_text, args, lambda a: a[0].text_id, workers, max_in_flight, on_error))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Rewrite an MMAX corpus into a directory per PCC group.')
+    parser.add_argument('root', type=Path)
+    parser.add_argument('output_dir', type=Path)
+    parser.add_argument('--groups', nargs='+', default=None, help='subdirectories of root, all documents by default')
+    parser.add_argument('--workers', type=int, default=None, help='number of processes, all cores by default')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    from coref_ds.mmax import corpus  # pickled worker functions refer to it, not to __main__
+    written = corpus.write_mmax_corpus(
+        corpus.load_mmax_corpus(args.root, groups=args.groups, workers=args.workers),
+        args.output_dir,
+        structure=corpus.load_pcc_structure(),
+        workers=args.workers,
+    )
+    print(f'{len(written)} documents written to {args.output_dir}')
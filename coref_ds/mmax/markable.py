@@ -1,49 +1,77 @@
-from dataclasses import dataclass
 from io import StringIO
+import logging
 
 from lxml import etree
 
-from coref_ds.mmax.attributes import MARKABLE_ATTRIBUTES
-from coref_ds.utils import add_element
+from coref_ds.mmax.attributes import FACET_DEFAULTS, MARKABLE_ATTRIBUTES, MARKABLE_XML_TEMPLATE
+from coref_ds.mmax.spans import parse_span
+
+logger = logging.getLogger(__name__)
+
+
+def _facet_property(name: str) -> property:
+    default = FACET_DEFAULTS[name]
+
+    def get(self):
+        return self.facets.get(name, default) if self.facets else default
+
+    def set(self, value):
+        facets = dict(self.facets or {})  # copies of the markable (copy.copy) share the dict
+        if value == default:
+            facets.pop(name, None)
+        else:
+            facets[name] = value
+        self.facets = facets or None
+
+    return property(get, set)
+
 
-@dataclass
 class Markable:
-    id: str  # markable_10
-    span: str
-    indirect_other_facet: str
-    excluding_ios_facet: str
-    excluding_negation_facet: str
-    indirect_bound: str
-    supporting_metareference: str
-    supporting_comparison_facet: str
-    indirect_aggregation: str
-    indirect_aggregation_facet: str
-    supporting_comparison: str
-    excluding_other_facet: str
-    indirect_compositon: str
-    excluding_contrast: str
-    excluding_other: str
-    indirect_compositon_facet: str
-    indirect_bound_facet: str
-    indirect_other: str
-    mention_group: str
-    excluding_polysemy_facet: str
-    excluding_negation: str
-    supporting_metareference_facet: str
-    mention_head: str
-    mention_type: str
-    near_identity_facet: str
-    supporting_other: str
-    mmax_level: str
-    near_identity: str
-    supporting_predicative: str
-    excluding_polysemy: str
-    supporting_predicative_facet: str
-    excluding_contrast_facet: str
-    excluding_ios: str
-    supporting_other_facet: str
-    span_start: int | None = None
-    span_end: int | None = None
+    """
+    id, span, mention_group and mention_head are kept in slots, the remaining attributes (facets) only when they
+    differ from `FACET_DEFAULTS`: facets is None for markables with default facets only, and the shared default
+    strings are returned for the missing ones.
+    """
+    __slots__ = ('id', 'span', 'mention_group', 'mention_head', 'span_start', 'span_end', 'facets')
+
+    def __init__(
+            self,
+            id: str = MARKABLE_ATTRIBUTES['id'],  # markable_10
+            span: str = MARKABLE_ATTRIBUTES['span'],
+            mention_group: str = MARKABLE_ATTRIBUTES['mention_group'],
+            mention_head: str = MARKABLE_ATTRIBUTES['mention_head'],
+            span_start: int | None = None,
+            span_end: int | None = None,
+            **facets: str,
+    ):
+        unknown = facets.keys() - FACET_DEFAULTS.keys()
+        if unknown:
+            raise TypeError(f'Unknown markable attributes: {", ".join(sorted(unknown))}')
+        self.id = id
+        self.span = span
+        self.mention_group = mention_group
+        self.mention_head = mention_head
+        self.span_start = span_start
+        self.span_end = span_end
+        self.facets = {k: v for k, v in facets.items() if FACET_DEFAULTS[k] != v} or None
+
+    def attributes(self) -> dict[str, str]:
+        """
+        All attributes in the order of `MARKABLE_ATTRIBUTES`, defaults included.
+        """
+        return {k: getattr(self, k) for k in MARKABLE_ATTRIBUTES}
+
+    def __eq__(self, other):
+        if not isinstance(other, Markable):
+            return NotImplemented
+        return all(getattr(self, k) == getattr(other, k) for k in self.__slots__)
+
+    __hash__ = None
+
+    def __repr__(self):
+        fields = ', '.join(f'{k}={getattr(self, k)!r}' for k in self.__slots__[:-1])
+        facets = ''.join(f', {k}={v!r}' for k, v in (self.facets or {}).items())
+        return f'{type(self).__name__}({fields}{facets})'
 
     @staticmethod
     def gen_span_attr(span_start: int, span_end: int):
@@ -53,68 +81,56 @@ class Markable:
 
     @classmethod
     def from_xml(cls, xml_markable: etree._Element):
-        return cls(
-            **{k: xml_markable.attrib[k] if xml_markable.attrib[k] else MARKABLE_ATTRIBUTES[k]
-               for k in MARKABLE_ATTRIBUTES}
-        )
-
-    def get_span(self):
-        start, *end = self.span.split('..') 
-        end = end[0] if end else start # @TODO non-continuous spans
-        try:
-            start, end = (int(el.split('_')[-1]) for el in (start, end))  # 'word_0' -> 0
-        except ValueError as e:
-            print(f'Error while parsing span: {self.span}')
-            return None
-        else:
-            return start, end
+        return cls.from_attributes(xml_markable.attrib)
+
+    @classmethod
+    def from_attributes(cls, attributes) -> 'Markable':
+        """
+        Only the facets which differ from `FACET_DEFAULTS` are stored, missing or empty ones keep the default strings
+        shared by all markables.
+        """
+        get = attributes.get
+        markable = cls.__new__(cls)  # the facets are filtered already
+        markable.id = get('id') or MARKABLE_ATTRIBUTES['id']
+        markable.span = get('span') or MARKABLE_ATTRIBUTES['span']
+        markable.mention_group = get('mention_group') or MARKABLE_ATTRIBUTES['mention_group']
+        markable.mention_head = get('mention_head') or MARKABLE_ATTRIBUTES['mention_head']
+        markable.span_start, markable.span_end = None, None
+        markable.facets = {k: v for k, v in attributes.items() if v and FACET_DEFAULTS.get(k, v) != v} or None
+        return markable
+
+    def get_fragments(self) -> list[tuple[int, int]] | None:
+        """
+        Inclusive (start, end) word indices of every fragment of the span, None if the span is invalid.
+        """
+        return parse_span(self.span)
 
+    def get_span(self) -> tuple[int, int] | None:
+        """
+        (start, end) from the first to the last word of the span, see `get_fragments` for discontinuous spans.
+        """
+        fragments = parse_span(self.span)
+        if fragments is None:
+            logger.warning(f'Error while parsing span: {self.span}')
+            return None
+        return fragments[0][0], fragments[-1][1]
 
     def to_xml(self, mentions_tree: etree._Element):
         if self.span_start and self.span_end:
             span = self.gen_span_attr(self.span_start, self.span_end)
         else:
             span = self.span  # @TODO get span from span string in the object
-        add_element(
-            mentions_tree,
-            'markable',
-            attributes={
-                'id': self.id,
-                'span': span,
-                'indirect_other_facet': 'none',
-                'excluding_ios_facet': 'none',
-                'excluding_negation_facet': 'none',
-                'indirect_bound': 'none',
-                'supporting_metareference': 'none',
-                'supporting_comparison_facet': 'none',
-                'indirect_aggregation': 'empty',
-                'indirect_aggregation_facet': 'none',
-                'supporting_comparison': 'none',
-                'excluding_other_facet': 'none',
-                'indirect_compositon':'empty',
-                'excluding_contrast':'empty',
-                'excluding_other':'empty',
-                'indirect_compositon_facet':'none',
-                'indirect_bound_facet':'none',
-                'indirect_other':'empty',
-                'mention_group': self.mention_group,
-                'excluding_polysemy_facet':'none',
-                'excluding_negation':'empty',
-                'supporting_metareference_facet':'none',
-                'mention_head': self.mention_head if self.mention_head else '',
-                'mention_type':'system',
-                'near_identity_facet':'none',
-                'supporting_other':'empty',
-                'mmax_level':'mention',
-                'near_identity':'empty',
-                'supporting_predicative':'empty',
-                'excluding_polysemy':'empty',
-                'supporting_predicative_facet':'none',
-                'excluding_contrast_facet':'none',
-                'excluding_ios':'empty',
-                'supporting_other_facet':'none'
-            }
-        )
+        attributes = MARKABLE_XML_TEMPLATE.copy()
+        attributes['id'] = str(self.id)
+        attributes['span'] = str(span)
+        attributes['mention_group'] = str(self.mention_group)
+        attributes['mention_head'] = str(self.mention_head) if self.mention_head else ''
+        return etree.SubElement(mentions_tree, 'markable', attributes)
+
+
+for _name in FACET_DEFAULTS:
+    setattr(Markable, _name, _facet_property(_name))
+
 
 def gen_mentions_structure():
     schema = """<?xml version="1.0"?>
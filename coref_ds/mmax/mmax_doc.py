@@ -1,19 +1,24 @@
-from collections import defaultdict
 from dataclasses import dataclass
 from io import StringIO
 from pathlib import Path
+from typing import Iterator
+import logging
 
 from lxml import etree
 from lxml.etree import _Element
 
+from coref_ds.cache import get_default_cache
 from coref_ds.document import CorefDoc
 from coref_ds.mmax.markable import Markable, gen_mentions_structure
+from coref_ds.mmax.spans import parse_spans
 from coref_ds.mmax.word import Word, gen_words_structure
-from coref_ds.text import Text, Segment
-from coref_ds.utils import add_element
+from coref_ds.text import Mention, Text, Segment
+from coref_ds.utils import add_element, find_incremental_subsequences, iterparse_elements
 
+logger = logging.getLogger(__name__)
 
 NSMAP = {'xlmns': 'www.eml.org/NameSpaces/mention'}
+MARKABLE_TAG = f"{{{NSMAP['xlmns']}}}markable"
 
 
 @dataclass
@@ -36,31 +41,66 @@ def gen_mmax_schema(doc_id):
     return xml
 
 
-def add_cluster_mentions(text: Text):
+def add_cluster_mentions(text: Text) -> list[Markable]:
+    """
+    Markables of the clusters of text, numbered in clusters order; singletons get the `empty` mention group.
+    Mention heads are the head orths of `text.indices_to_mentions` if the text has them.
+    """
     mentions = []
-    men_id = 0
     if text is not None:
+        indices_to_mentions = getattr(text, 'indices_to_mentions', {})
         for cluster_id, cluster in enumerate(text.clusters):
-            if len(cluster.mentions) == 1:
+            if len(cluster) == 1:
                 cluster_id = 'empty'
             else:
                 cluster_id = f'set_{str(cluster_id)}'
 
-            for mention in cluster.mentions:
-                men_id += 1
-
-                head = mention.head if getattr(mention, 'head', None) else None
-                m = Markable(
-                    cluster_id=cluster_id,
-                    men_id=f'markable_{men_id}',
-                    span_start=mention.org_inds[0],
-                    span_end=mention.org_inds[1],
-                    head=head,
-                )
-                mentions.append(m)
+            for span_start, span_end in cluster:
+                mention = indices_to_mentions.get((span_start, span_end))
+                mentions.append(Markable(
+                    id=f'markable_{len(mentions) + 1}',
+                    span=Markable.gen_span_attr(span_start, span_end + 1),
+                    mention_group=cluster_id,
+                    mention_head=mention.head_orth or '' if mention is not None else '',
+                ))
     return mentions
 
 
+def markable_to_mention(
+        markable: Markable, fragments: list[tuple[int, int]], words: list[Word], cluster_id: int = None
+) -> Mention:
+    """
+    fragments: inclusive (start, end) word indices of the markable span, more than one for discontinuous spans.
+    A discontinuous markable whose head is none of its words is reduced to its longest continuous part,
+    the one `Mention` would fall back to after logging an exception.
+    """
+    if len(fragments) == 1:
+        start, end = fragments[0]
+        segments = words[start:end + 1]
+    else:
+        segments = [words[ind] for ind in sorted({ind for start, end in fragments for ind in range(start, end + 1)})]
+    head_orth = markable.mention_head or None
+    head = next((segment.index for segment in segments if segment.orth == head_orth), None)
+    if head is None and len(fragments) > 1:
+        submentions = find_incremental_subsequences(segments)
+        if len(submentions) > 1:
+            logger.warning(
+                f'Head {head_orth!r} of discontinuous {markable.id} not in its span, keeping its longest part'
+            )
+            segments = max(reversed(submentions), key=len)  # the last of the longest, as `Mention` does
+    return Mention(
+        id=markable.id,
+        text=' '.join(segment.orth for segment in segments),
+        lemmatized_text=' '.join(segment.lemma for segment in segments),
+        segments=segments,
+        span_start=segments[0].index,
+        span_end=segments[-1].index,
+        head_orth=head_orth,
+        head=head,
+        cluster_id=cluster_id,
+    )
+
+
 def write_mmax_schema(mmax_schema: etree._Element, doc_id: str, doc_dir: Path):
     with open(Path(doc_dir) / f'{doc_id}.mmax', 'wb') as output_file:
         output_file.write(
@@ -71,10 +111,41 @@ def write_mmax_schema(mmax_schema: etree._Element, doc_id: str, doc_dir: Path):
 
 
 class MmaxDoc(CorefDoc):
-    def __init__(self, doc_id: str, words: list[Word], mentions: list[Markable]):
+    def __init__(
+            self, doc_id: str, words: list[Word] = None, mentions: list[Markable] = None, doc_path: Path = None
+    ):
+        """
+        doc_path: .mmax file the words and mentions are parsed from on first access, if they are not given
+        """
         self.doc_id = doc_id
-        self.words = words
-        self.mentions = mentions
+        self.doc_path = doc_path
+        self._words = words
+        self._mentions = mentions
+
+    @property
+    def words(self) -> list[Word]:
+        if self._words is None:
+            self.parse_doc()
+        return self._words
+
+    @words.setter
+    def words(self, words: list[Word]):
+        self._words = words
+
+    @property
+    def mentions(self) -> list[Markable]:
+        if self._mentions is None:
+            self.parse_doc()
+        return self._mentions
+
+    @mentions.setter
+    def mentions(self, mentions: list[Markable]):
+        self._mentions = mentions
+
+    @staticmethod
+    def source_paths(p: Path) -> list[Path]:
+        doc_id = p.stem
+        return [p, p.parent / f'{doc_id}_words.xml', p.parent / f'{doc_id}_mentions.xml']
 
     @staticmethod
     def load_files(p: Path, load_bak_mentions: bool = False):
@@ -94,19 +165,62 @@ class MmaxDoc(CorefDoc):
             bak_mentions=bak_mentions,
         )
 
+    @classmethod
+    def parse_files(cls, mmax_files: MmaxFiles):
+        words = cls.parse_words(mmax_files.words)
+        mentions = cls.parse_mentions(mmax_files.mentions)
+        if mmax_files.bak_mentions:
+            mentions.extend(cls.parse_mentions(mmax_files.bak_mentions))
+        return words, mentions
+
+    def parse_doc(self):
+        doc_id = self.doc_path.stem
+        self._words = list(self.iter_words(self.doc_path.parent / f'{doc_id}_words.xml'))
+        self._mentions = list(self.iter_mentions(self.doc_path.parent / f'{doc_id}_mentions.xml'))
+
+    @staticmethod
+    def iter_words(words_path: Path) -> Iterator[Word]:
+        """
+        Words of a _words.xml file, parsed in one pass without building the whole tree.
+        """
+        for ind, word in enumerate(iterparse_elements(words_path, 'word')):
+            yield Word.from_xml(word, ind)
+
+    @staticmethod
+    def iter_mentions(mentions_path: Path) -> Iterator[Markable]:
+        """
+        Markables of a _mentions.xml file, parsed in one pass without building the whole tree.
+        """
+        for markable in iterparse_elements(mentions_path, MARKABLE_TAG):
+            yield Markable.from_attributes(markable.attrib)
+
     @classmethod
     def from_file(cls, filename: Path, mmax_files: MmaxFiles = None):
+        """
+        Without mmax_files the files are parsed on first access to words or mentions.
+        """
         doc_id = filename.stem
 
         if mmax_files is None:
-            mmax_files = cls.load_files(filename)
+            return cls(doc_id, doc_path=filename)
 
-        words = cls.parse_words(mmax_files.words)
-        mentions = cls.parse_mentions(mmax_files.mentions)
-        if mmax_files.bak_mentions:
-            mentions.extend(cls.parse_mentions(mmax_files.bak_mentions))
+        words, mentions = cls.parse_files(mmax_files)
         return cls(doc_id, words, mentions)
 
+    @classmethod
+    def from_text(cls, text: Text) -> 'MmaxDoc':
+        """
+        Words are made of `text.segments_meta` (or of the bare segments if there are none),
+        mentions of the clusters, see `add_cluster_mentions`.
+        """
+        if text.segments_meta:
+            words = [Word.from_segment(segment) for segment in text.segments_meta]
+        else:
+            words = [
+                Word(orth=orth, lemma=orth, has_nps=False, index=ind, pos='') for ind, orth in enumerate(text.segments)
+            ]
+        return cls(text.text_id, words, add_cluster_mentions(text))
+
     def to_file(self, dir: Path):
         mmax_files = MmaxFiles(
             mmax=gen_mmax_schema(self.doc_id),
@@ -137,8 +251,8 @@ class MmaxDoc(CorefDoc):
     def parse_words(words_tree: etree._Element):
         root = words_tree.getroot()
         words = []
-        for word in root.findall('word'):
-            words.append(Word.from_xml(word))
+        for ind, word in enumerate(root.findall('word')):
+            words.append(Word.from_xml(word, ind))
         return words
 
     @staticmethod
@@ -150,20 +264,48 @@ class MmaxDoc(CorefDoc):
 
     @property
     def text(self):
-        clusters = defaultdict(list)
-        for m in self.mentions:
-            span = m.get_span()
-            if span:
-                cluster_id = m.mention_group if m.mention_group != 'empty' else m.id
-                clusters[cluster_id].append(span)
+        cache = get_default_cache()
+        if cache is None or self.doc_path is None or self._words is not None or self._mentions is not None:
+            return self.parse_text()
+        return cache.get_or_parse(
+            type(self).__qualname__,
+            self.source_paths(self.doc_path),
+            lambda: type(self).from_file(self.doc_path).parse_text(),
+        )
+
+    def parse_text(self) -> Text:
+        """
+        Discontinuous mentions are reduced to their maximal continuous submention with the head (see `Mention`)
+        in the clusters, markables with invalid spans are left out.
+        """
+        words = self.words
+        spans = parse_spans([m.span for m in self.mentions])
+        cluster_inds, clusters, mentions = {}, [], []
+        for ind, m in enumerate(self.mentions):
+            fragments = spans.fragments(ind)
+            if not fragments:
+                continue
+            if any(start > end or end >= len(words) for start, end in fragments):
+                logger.warning(f'Span of {m.id} out of the words of {self.doc_id}: {m.span}')
+                continue
+            cluster_id = m.mention_group if m.mention_group != 'empty' else m.id
+            cluster_ind = cluster_inds.setdefault(cluster_id, len(cluster_inds))
+            if cluster_ind == len(clusters):
+                clusters.append([])
+            mention = markable_to_mention(m, fragments, words, cluster_id=cluster_ind)
+            clusters[cluster_ind].append((mention.span_start, mention.span_end))
+            mentions.append(mention)
 
         segments_meta = []
         for word in self.words:
             segments_meta.append(word)
 
-        return Text(
+        text = Text(
             text_id=self.doc_id,
             segments=[w.orth for w in self.words],
             segments_meta=segments_meta,
-            clusters=list(clusters.values()),
+            clusters=clusters,
+            mentions=mentions,
         )
+        text.indices_to_mentions = {(m.span_start, m.span_end): m for m in mentions}
+        return text
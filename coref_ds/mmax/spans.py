@@ -0,0 +1,85 @@
+"""
+Decoding of the span attributes of markables (`word_3`, `word_1..word_3` and discontinuous `word_1..word_3,word_7`)
+into word indices, for all markables of a document with one compiled regular expression.
+"""
+import logging
+import re
+from array import array
+from dataclasses import dataclass
+from typing import Iterable
+
+logger = logging.getLogger(__name__)
+
+# a fragment is a whole comma-separated part of a span
+FRAGMENT = re.compile(r'(?:^|(?<=,))word_(\d+)(?:\.\.word_(\d+))?(?=,|$)')
+# fragments of newline-joined spans, the newlines delimit markables
+JOINED_FRAGMENT = re.compile(r'(?:^|(?<=,))word_(\d+)(?:\.\.word_(\d+))?(?=,|$)|(\n)', re.MULTILINE)
+
+
+@dataclass
+class MarkableSpans:
+    """
+    Fragments of the spans of markables as inclusive (start, end) word indices: the fragments of markable i are
+    starts[offsets[i]:offsets[i + 1]] and ends[offsets[i]:offsets[i + 1]], markables with invalid spans have none.
+    """
+    offsets: array
+    starts: array
+    ends: array
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def fragments(self, ind: int) -> list[tuple[int, int]]:
+        first, last = self.offsets[ind], self.offsets[ind + 1]
+        return list(zip(self.starts[first:last], self.ends[first:last]))
+
+    def span(self, ind: int) -> tuple[int, int] | None:
+        """
+        (start of the first fragment, end of the last one), None for invalid spans
+        """
+        first, last = self.offsets[ind], self.offsets[ind + 1]
+        return (self.starts[first], self.ends[last - 1]) if last > first else None
+
+
+def parse_span(span: str) -> list[tuple[int, int]] | None:
+    """
+    Inclusive (start, end) word indices of every fragment of span, None if span is invalid.
+    """
+    fragments = FRAGMENT.findall(span)
+    if not fragments or len(fragments) != span.count(',') + 1:
+        return None
+    return [(int(start), int(end or start)) for start, end in fragments]
+
+
+def _parse_spans_one_by_one(spans: list[str]) -> MarkableSpans:
+    offsets, starts, ends = array('q', [0]), array('q'), array('q')
+    for span in spans:
+        fragments = parse_span(span)
+        if fragments is None:
+            logger.warning(f'Invalid markable span: {span!r}')
+        else:
+            for start, end in fragments:
+                starts.append(start)
+                ends.append(end)
+        offsets.append(len(starts))
+    return MarkableSpans(offsets, starts, ends)
+
+
+def parse_spans(spans: Iterable[str]) -> MarkableSpans:
+    """
+    Fragments of all spans, decoded in one scan over the joined spans. Invalid spans are logged and get no fragments,
+    the spans are parsed one by one in that case.
+    """
+    spans = list(spans)
+    offsets, starts, ends = array('q', [0]), array('q'), array('q')
+    for start, end, newline in JOINED_FRAGMENT.findall('\n'.join(spans) + '\n'):
+        if newline:
+            offsets.append(len(starts))
+        else:
+            starts.append(int(start))
+            ends.append(int(end or start))
+
+    # every span is a fragment followed by a fragment per comma unless some fragments did not match
+    if len(offsets) != len(spans) + 1 or len(starts) != len(spans) + sum(span.count(',') for span in spans):
+        return _parse_spans_one_by_one(spans)
+    return MarkableSpans(offsets, starts, ends)
@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from io import StringIO
 
 from lxml import etree
@@ -11,8 +11,9 @@ class Word(Segment):
     msd: str | None = None # "subst:sg:nom:f"
 
     @classmethod
-    def from_xml(cls, xml_token: etree._Element):
+    def from_xml(cls, xml_token: etree._Element, index: int | None = None):
         return cls(
+            index=index,
             orth=xml_token.text,
             lemma=xml_token.attrib['base'],
             pos=xml_token.attrib['ctag'],
@@ -23,17 +24,23 @@ class Word(Segment):
             has_nps=xml_token.get('hasNps') == 'true',
         )
     
+    @classmethod
+    def from_segment(cls, segment: Segment) -> 'Word':
+        if isinstance(segment, cls):
+            return segment
+        return cls(**{f.name: getattr(segment, f.name) for f in fields(Segment)})
+
     def to_xml(self, words_tree, segment_id):
         annotation_dict = {
                 'base': self.lemma,
                 'ctag': self.pos.split(':')[0],
                 'id': f"word_{str(segment_id)}",
-                'msd': self.pos
+                'msd': self.msd or self.pos
             }
-        for name_in, name_out in [
-            ('has_nps', 'has_nps'),
-            ('last_in_sent', 'last_in_sent'),
-            ('last_in_par', 'last_in_par')
+        for name_in, name_out in [  # the attribute names read by `from_xml`
+            ('has_nps', 'hasNps'),
+            ('last_in_sent', 'lastInSent'),
+            ('last_in_par', 'lastInPar')
         ]:
             if getattr(self, name_in):
                 annotation_dict[name_out] = 'true'
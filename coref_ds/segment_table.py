@@ -0,0 +1,186 @@
+"""
+Columnar storage of segments (`Text.segments_meta`).
+
+Repeated values (orth, lemma, pos, number, gender, person, ...) are interned in `Categories` and stored as
+integer codes, flags and token indices are stored in `array`s. `SegmentRow` is a view of one row which behaves
+like a `Segment`, so existing code reading segment attributes keeps working.
+"""
+from array import array
+from collections.abc import Sequence
+from dataclasses import fields
+
+FLAG_FIELDS = ('has_nps', 'last_in_sent', 'last_in_par', 'is_semantic_head')
+INT_FIELDS = ('index',)
+OBJECT_FIELDS = ('id',)  # unique per segment, interning would not save anything
+
+NO_FLAG = -1
+NO_INT = -2 ** 63
+
+
+class Categories:
+    """
+    Interned values with integer codes. Every table has its own by default, pass one `Categories` to the tables
+    of a corpus (e.g. `Text.compact(categories)`) to store every distinct value once for the whole corpus.
+    """
+
+    def __init__(self):
+        self.values = []
+        self.codes = {}
+
+    def encode(self, value) -> int:
+        key = type(value), value  # keep e.g. 1 and True apart
+        code = self.codes.get(key)
+        if code is None:
+            code = self.codes[key] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def decode(self, code: int):
+        return self.values[code]
+
+    def __len__(self):
+        return len(self.values)
+
+
+class SegmentRow:
+    """
+    Segment-like view of a `SegmentTable` row, attributes are read from and written to the table.
+    """
+    __slots__ = ('table', 'position')
+
+    def __init__(self, table: 'SegmentTable', position: int):
+        object.__setattr__(self, 'table', table)
+        object.__setattr__(self, 'position', position)
+
+    def __getattr__(self, name):
+        if name in SegmentRow.__slots__ or name.startswith('__'):
+            raise AttributeError(name)
+        try:
+            return self.table.get_value(self.position, name)
+        except KeyError:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'") from None
+
+    def __setattr__(self, name, value):
+        self.table.set_value(self.position, name, value)
+
+    def get_token_index(self):
+        return self.index
+
+    def is_orth_equal(self, orth):
+        return self.orth == orth
+
+    def to_segment(self):
+        return self.table.segment(self.position)
+
+    def __eq__(self, other):
+        if isinstance(other, SegmentRow):
+            return self.to_segment() == other.to_segment()
+        return self.to_segment() == other
+
+    __hash__ = None  # a mutable view compared by value, like the `Segment` dataclass
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self.to_segment()!r})'
+
+    def __getstate__(self):
+        return self.table, self.position
+
+    def __setstate__(self, state):
+        object.__setattr__(self, 'table', state[0])
+        object.__setattr__(self, 'position', state[1])
+
+
+class SegmentTable(Sequence):
+    """
+    Columns of `segment_class` (a `Segment` dataclass) fields; indexing returns `SegmentRow` views.
+    """
+
+    def __init__(self, segment_class: type, categories: Categories = None):
+        self.segment_class = segment_class
+        self.categories = Categories() if categories is None else categories
+        self.columns = {}
+        for f in fields(segment_class):
+            if f.name in FLAG_FIELDS:
+                self.columns[f.name] = ('flag', array('b'))
+            elif f.name in INT_FIELDS:
+                self.columns[f.name] = ('int', array('q'))
+            elif f.name in OBJECT_FIELDS:
+                self.columns[f.name] = ('object', [])
+            else:
+                self.columns[f.name] = ('category', array('I'))
+        self._len = 0
+
+    @classmethod
+    def from_segments(cls, segments: list, segment_class: type = None, categories: Categories = None):
+        if segment_class is None:
+            segment_class = type(segments[0])
+        table = cls(segment_class, categories)
+        for segment in segments:
+            table.append(segment)
+        return table
+
+    def encode(self, kind: str, value):
+        if kind == 'flag':
+            return NO_FLAG if value is None else int(bool(value))
+        elif kind == 'int':
+            return NO_INT if value is None else value
+        elif kind == 'category':
+            return self.categories.encode(value)
+        return value
+
+    def decode(self, kind: str, value):
+        if kind == 'flag':
+            return None if value == NO_FLAG else bool(value)
+        elif kind == 'int':
+            return None if value == NO_INT else value
+        elif kind == 'category':
+            return self.categories.decode(value)
+        return value
+
+    def append(self, segment):
+        for name, (kind, column) in self.columns.items():
+            column.append(self.encode(kind, getattr(segment, name)))
+        self._len += 1
+
+    def get_value(self, position: int, name: str):
+        kind, column = self.columns[name]
+        return self.decode(kind, column[position])
+
+    def set_value(self, position: int, name: str, value):
+        kind, column = self.columns[name]
+        column[position] = self.encode(kind, value)
+
+    def column(self, name: str) -> list:
+        kind, column = self.columns[name]
+        if kind == 'category':
+            values = self.categories.values
+            return [values[code] for code in column]
+        return [self.decode(kind, value) for value in column]
+
+    def segment(self, position: int):
+        return self.segment_class(**{name: self.get_value(position, name) for name in self.columns})
+
+    def to_segments(self) -> list:
+        return [self.segment(position) for position in range(self._len)]
+
+    def __getitem__(self, ind):
+        if isinstance(ind, slice):
+            return [SegmentRow(self, position) for position in range(*ind.indices(self._len))]
+        if ind < 0:
+            ind += self._len
+        if not 0 <= ind < self._len:
+            raise IndexError('segment index out of range')
+        return SegmentRow(self, ind)
+
+    def __len__(self):
+        return self._len
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Size of the columns (without the categories and the `id` strings).
+        """
+        return sum(
+            column.itemsize * len(column) if isinstance(column, array) else 8 * len(column)
+            for kind, column in self.columns.values()
+        )
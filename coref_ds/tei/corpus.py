@@ -0,0 +1,60 @@
+from pathlib import Path
+from typing import Callable, Iterator
+import logging
+
+from coref_ds.tei.tei_doc import TEIDocument
+from coref_ds.tei.utils import get_file_or_archive
+from coref_ds.text import Text
+from coref_ds.utils import map_documents
+
+logger = logging.getLogger(__name__)
+
+
+def find_tei_documents(root: Path, layer_name: str = 'ann_morphosyntax') -> list[Path]:
+    """
+    Document directories under root (e.g. PCC train/, dev/ and test/), i.e. the ones containing `layer_name` layer.
+    """
+    root = Path(root)
+    dirs = [root] + sorted(p for p in root.rglob('*') if p.is_dir())
+    return [p for p in dirs if get_file_or_archive(p / layer_name) is not None]
+
+
+def load_tei_text(doc_path: Path, layers_mapping: dict = None) -> Text:
+    return TEIDocument(doc_path, layers_mapping=layers_mapping).text
+
+
+def log_error(doc_path: Path, error: Exception):
+    logger.error(f'Error while loading {doc_path}: {error!r}')
+
+
+def load_tei_corpus(
+        root: Path,
+        workers: int | None = None,
+        ordered: bool = True,
+        max_in_flight: int | None = None,
+        layers_mapping: dict = None,
+        on_error: Callable[[Path, Exception], None] = log_error,
+        doc_paths: list[Path] = None,
+) -> Iterator[Text]:
+    """
+    Parses all TEI documents under root in a process pool and yields their `Text`s.
+
+    workers: number of processes, `os.cpu_count()` by default; 0 or 1 parses in the current process
+    ordered: yield texts in `find_tei_documents` order, otherwise as soon as they are parsed
+    max_in_flight: documents submitted to the pool and not yet yielded, 4 * workers by default, so that parsed
+        texts do not pile up behind a slow document
+    on_error: called with the document path and the exception for documents which failed to load,
+        these documents are skipped
+    doc_paths: explicit document directories to load instead of searching root
+    """
+    if doc_paths is None:
+        doc_paths = find_tei_documents(root)
+    yield from map_documents(
+        load_tei_text,
+        ((doc_path, layers_mapping) for doc_path in doc_paths),
+        lambda a: a[0],
+        workers,
+        max_in_flight,
+        on_error,
+        ordered,
+    )
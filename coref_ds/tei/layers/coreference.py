@@ -12,26 +12,24 @@ class CoreferenceLayer(XMLLayer):
                 mention_clusters.append(cor)
         return mention_clusters
 
+    def read_cluster_features(self, cluster):
+        features = {}
+        for f in cluster.iter(f'{{{self.ns_map["tei"]}}}f'):
+            if f.attrib['name'] in ('type', 'dominant'):
+                features[f.attrib['name']] = get_feature_val(f)
+        return features.get('type'), features.get('dominant')
+
     def add_clusters_to_text(self, clusters, text, xml_ns='http://www.w3.org/XML/1998/namespace'):
+        mentions_index = {mention.id: mention for mention in reversed(text.mentions)}  # first mention wins
+        ptr_tag = f'{{{self.ns_map["tei"]}}}ptr'
         for cluster in clusters:
             idx = cluster.attrib[f'{{{xml_ns}}}id']
-
-            coref_type = None
-            dominant = None
-            for f in cluster.xpath(".//tei:f", namespaces=self.ns_map):
-                if f.attrib['name'] == 'type':
-                    coref_type = get_feature_val(f)
-                elif f.attrib['name'] == 'dominant':
-                    dominant = get_feature_val(f)
+            coref_type, dominant = self.read_cluster_features(cluster)
 
             if coref_type == 'ident':
-                for ptr in cluster.xpath(".//tei:ptr", namespaces=self.ns_map):
+                for ptr in cluster.iter(ptr_tag):
                     mnt_id = ptr.attrib['target'].split('#')[-1]
-                    curr_mention = None
-                    for mention in text.mentions:
-                        if mention.id == mnt_id:
-                            curr_mention = mention
-                            break
+                    curr_mention = mentions_index.get(mnt_id)
                     if curr_mention:
                         curr_mention.cluster_id = idx
                         curr_mention.dominant = dominant
@@ -1,5 +1,8 @@
 from abc import ABC, abstractmethod
+from collections.abc import MutableMapping
 from pathlib import Path
+from typing import Callable
+import copy
 import gzip
 import logging
 
@@ -9,14 +12,15 @@ logger = logging.getLogger(__name__)
 
 
 class FileHandler:
-    def __init__(self, path: Path):
+    def __init__(self, path: Path, mode: str = 'wb'):
         self.path = path
+        self.mode = mode
 
     def __enter__(self):
         if self.path.suffix == ".gz":
-            self.file = gzip.open(self.path, 'wb')
+            self.file = gzip.open(self.path, self.mode)
         else:
-            self.file = self.path.open('wb')
+            self.file = self.path.open(self.mode)
         return self.file
 
     def __exit__(self, exc_type, exc_val, exc_tb):
@@ -24,12 +28,28 @@ class FileHandler:
 
 
 class XMLLayer:
-    def __init__(self, file_path, namespace: dict):
+    def __init__(self, file_path, namespace: dict, lazy: bool = False):
+        """
+        lazy: postpone building the tree until `root` is first accessed
+        """
         self.file_path = file_path
         self.parser = etree.XMLParser(remove_blank_text=True)
-        self.root = None
+        self._root = None
+        self.is_loaded = False
         self.ns_map = namespace
-        self._load()
+        if not lazy:
+            self._load()
+
+    @property
+    def root(self):
+        if not self.is_loaded:
+            self._load()
+        return self._root
+
+    @root.setter
+    def root(self, root):
+        self._root = root
+        self.is_loaded = True
 
     def _load(self):
         try:
@@ -49,6 +69,46 @@ class XMLLayer:
     def parse_layer(self):
         pass
 
-    @abstractmethod
-    def filter_by_sample_ids(self, sample_ids):
-        pass
+
+class LazyLayers(MutableMapping):
+    """
+    Layers of a document by name, each layer is created by its factory on first access.
+    """
+
+    def __init__(self, factories: dict[str, Callable[[], XMLLayer]] = None):
+        self._factories = dict(factories or {})
+        self._layers = {}
+
+    def __getitem__(self, layer_name):
+        if layer_name not in self._layers:
+            self._layers[layer_name] = self._factories[layer_name]()
+        return self._layers[layer_name]
+
+    def __setitem__(self, layer_name, layer):
+        self._factories.setdefault(layer_name, None)
+        self._layers[layer_name] = layer
+
+    def __delitem__(self, layer_name):
+        del self._factories[layer_name]
+        self._layers.pop(layer_name, None)
+
+    def __contains__(self, layer_name):
+        return layer_name in self._factories
+
+    def __iter__(self):
+        return iter(self._factories)
+
+    def __len__(self):
+        return len(self._factories)
+
+    @property
+    def materialized(self) -> list[str]:
+        return [layer_name for layer_name in self._factories if layer_name in self._layers]
+
+    def shared(self) -> 'LazyLayers':
+        """
+        New mapping whose layers are shallow copies of these layers (sharing their trees), made on first access.
+        """
+        return LazyLayers({
+            layer_name: lambda layer_name=layer_name: copy.copy(self[layer_name]) for layer_name in self._factories
+        })
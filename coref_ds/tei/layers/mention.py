@@ -9,7 +9,7 @@ from coref_ds.tei.utils import get_feature_val, remove_if_no_children, to_text,
 
 class MentionLayer(XMLLayer):
     @staticmethod
-    def get_mention(mention, mnt_id, segments, segments_ids, paragraph_id, sentence_id, ns_map):
+    def get_mention(mention, mnt_id, segments, segments_index, paragraph_id, sentence_id, ns_map):
         idx = mention.attrib[f'{{{ns_map["xmlns"]}}}id']
 
         mnt_segments = []
@@ -33,10 +33,10 @@ class MentionLayer(XMLLayer):
             text=to_text(mnt_segments, 'orth'),
             lemmatized_text=to_text(mnt_segments, 'lemma'),
             segments=mnt_segments,
-            span_start=segments_ids.index(mnt_segments[0].id),
-            span_end=segments_ids.index(mnt_segments[-1].id),
+            span_start=segments_index[mnt_segments[0].id],
+            span_end=segments_index[mnt_segments[-1].id],
             head_orth=semh.orth,
-            head=segments_ids.index(semh_id),
+            head=segments_index[semh_id],
             cluster_id=None,
         )
 
@@ -57,11 +57,15 @@ class MentionLayer(XMLLayer):
             for comment in comment_nodes:
                 yield comment
 
-    def parse_layer(self, segments, segments_ids):
+    def parse_layer(self, segments, segments_index):
+        """
+        segments: segment id -> Segment
+        segments_index: segment id -> token index, as returned by `MorphosyntaxLayer.parse_layer`
+        """
         mentions = []
         for mnt, mnt_id, par_id in self.mention_nodes():
             mention = MentionLayer.get_mention(
-                mnt, mnt_id, segments, segments_ids, par_id, sentence_id=None, ns_map=self.ns_map
+                mnt, mnt_id, segments, segments_index, par_id, sentence_id=None, ns_map=self.ns_map
             )
             mentions.append(mention)
 
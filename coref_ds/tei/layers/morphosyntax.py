@@ -1,16 +1,24 @@
 from typing import DefaultDict
 
 import regex
-from coref_ds.tei.utils import remove_if_no_children
-from coref_ds.tei.layers.layer import XMLLayer
+from lxml import etree
+
+from coref_ds.tei.layers.layer import FileHandler, XMLLayer
 
 XML_NS = 'http://www.w3.org/XML/1998/namespace'
 
 class MorphosyntaxLayer(XMLLayer):
     """
     Class for loading morphosyntax layer from NKJP TEI format.
+
+    With `streaming=True` the tree is not built up front and `parse_layer` reads the file in a single
+    `iterparse` pass instead. The tree is still loaded on first access to `root` (filtering, writing).
     """
 
+    def __init__(self, file_path, namespace: dict, streaming: bool = False):
+        self.streaming = streaming
+        super().__init__(file_path, namespace, lazy=streaming)
+
     @staticmethod
     def get_gender(msd):
         tags = msd.split(':')
@@ -85,7 +93,7 @@ class MorphosyntaxLayer(XMLLayer):
         msd = ''
         orth = ''
         idx = seg.attrib[f'{{{XML_NS}}}id']
-        for morph_feature in seg.xpath(".//tei:f", namespaces=ns_map):
+        for morph_feature in seg.iter(f'{{{ns_map["tei"]}}}f'):
             if morph_feature.attrib['name'] == 'orth':
                 orth = MorphosyntaxLayer.get_feature_string(morph_feature)
             elif morph_feature.attrib['name'] == 'nps':
@@ -135,30 +143,81 @@ class MorphosyntaxLayer(XMLLayer):
                         'n_paragraphs': n_paragraphs,
                     }
 
+    def iter_segments(self):
+        """
+        Yields segment dicts (as `read_segment`) in one `iterparse` pass over the layer file.
+        Elements are cleared as soon as they are read, so memory does not grow with the document length.
+        A segment is yielded once the next <seg/>, <s/> or the closing </p> tells its last_in_sent/last_in_par.
+        """
+        tei = f'{{{self.ns_map["tei"]}}}'
+        p_tag, s_tag, seg_tag = f'{tei}p', f'{tei}s', f'{tei}seg'
+        p_depth, s_depth = 0, 0
+        pending = None
+
+        with FileHandler(self.file_path, 'rb') as f:
+            for event, el in etree.iterparse(
+                    f, events=('start', 'end'), tag=(p_tag, s_tag, seg_tag), remove_blank_text=True
+            ):
+                if event == 'start':
+                    if el.tag == p_tag:
+                        p_depth += 1
+                    elif el.tag == s_tag and p_depth:
+                        s_depth += 1
+                        if pending:  # last segment of the previous sentence, which was not the last one
+                            yield pending
+                            pending = None
+                    elif el.tag == seg_tag and s_depth and pending:
+                        yield pending
+                        pending = None
+                    continue
+
+                if el.tag == seg_tag and s_depth:
+                    pending = MorphosyntaxLayer.read_segment(el, False, False, self.ns_map)
+                elif el.tag == s_tag and p_depth:
+                    s_depth -= 1
+                    if pending:
+                        pending['last_in_sent'] = True
+                elif el.tag == p_tag:
+                    p_depth -= 1
+                    if pending:
+                        pending['last_in_par'] = True
+                        yield pending
+                        pending = None
+
+                el.clear(keep_tail=True)
+                while el.getprevious() is not None:
+                    del el.getparent()[0]
+
+        if pending:
+            yield pending
+
     def parse_layer(self):
+        """
+        segments_index maps a segment id to its position in segments_ids (token index in the text),
+        so that the other layers do not have to search segments_ids.
+        """
         segments_dict = {}
         segments_ids = []
-        for segment_node in self.segment_nodes:
-            seg, last_in_sent, last_in_paragraph = segment_node['seg'], segment_node['last_in_sent'], segment_node[
-                'last_in_paragraph']
-            segment = MorphosyntaxLayer.read_segment(seg, last_in_sent, last_in_paragraph, self.ns_map)
+        segments_index = {}
+        if self.streaming and not self.is_loaded:
+            segments = self.iter_segments()
+        else:
+            segments = (
+                MorphosyntaxLayer.read_segment(
+                    segment_node['seg'], segment_node['last_in_sent'], segment_node['last_in_paragraph'], self.ns_map
+                ) for segment_node in self.segment_nodes
+            )
+        for segment in segments:
             segments_dict[segment['id']] = segment
+            segments_index.setdefault(segment['id'], len(segments_ids))
             segments_ids.append(segment['id'])
 
         return {
             'segments_dict': segments_dict,
             'segments_ids': segments_ids,
+            'segments_index': segments_index,
         }
 
-    def filter_by_sample_ids(self, sample_ids):
-        for segment_node in self.segment_nodes:
-            seg = segment_node['seg']
-            segment_id = seg.attrib[f'{{{self.ns_map["xmlns"]}}}id']
-            if segment_id not in sample_ids:
-                parent = seg.getparent()
-                parent.remove(segment_node['seg'])
-                remove_if_no_children(parent, levels=2)
-
     @staticmethod
     def get_sample_id(segment):
         """<seg corresp="ann_segmentation.xml#segm_1.1-seg" xml:id="morph_1.1-seg">"""
@@ -179,3 +238,12 @@ class MorphosyntaxLayer(XMLLayer):
             mapping[segment_id].append(morphosyntax_id)
 
         return mapping
+
+
+class StreamingMorphosyntaxLayer(MorphosyntaxLayer):
+    """
+    `MorphosyntaxLayer` in streaming mode, to be used in `TEIDocument` layers mapping.
+    """
+
+    def __init__(self, file_path, namespace: dict):
+        super().__init__(file_path, namespace, streaming=True)
@@ -1,7 +1,6 @@
 from collections import defaultdict
 import regex
 from coref_ds.tei.layers.layer import XMLLayer
-from coref_ds.tei.utils import remove_if_no_children
 
 
 class SegmentationLayer(XMLLayer):
@@ -36,12 +35,3 @@ class SegmentationLayer(XMLLayer):
             mapping[sample_id].append(segment_id)
 
         return mapping
-
-    def filter_by_sample_ids(self, sample_ids):
-        segments = self.parse_layer()['segments']
-        for segment in segments:
-            sample_id = self.get_sample_id(segment)
-            if sample_id not in sample_ids:
-                parent = segment.getparent()
-                parent.remove(segment)
-                remove_if_no_children(parent, levels=2)
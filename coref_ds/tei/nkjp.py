@@ -1,5 +1,4 @@
 from coref_ds.tei.layers.layer import XMLLayer
-from coref_ds.tei.utils import remove_if_no_children
 
 
 class NKJPStructureLayer(XMLLayer):
@@ -55,13 +54,3 @@ class NKJPStructureLayer(XMLLayer):
             )
 
         return parsed_samples
-
-    def filter_by_sample_ids(self, sample_ids):
-        structure = self.parse_layer()
-
-        for div, div_samples in zip(structure['divs'], structure['div_samples']):
-            for sample in div_samples:
-                sample_id = self.parse_sample_metadata(sample)['sample_id']
-                if sample_id not in sample_ids:
-                    div.remove(sample)
-            remove_if_no_children(div)
@@ -5,12 +5,14 @@
 # ---------------------------------------------------------------------------------------------------------------------
 
 
+import copy
 import gzip
 import shutil
 import os
 import logging
 from pathlib import Path
 from collections import defaultdict
+from functools import partial
 from typing import Callable
 from abc import ABC, abstractmethod
 
@@ -20,13 +22,14 @@ from lxml import etree
 from lxml.etree import _Comment as Comment
 import yaml
 
+from coref_ds.cache import get_default_cache
 from coref_ds.tei.layers.coreference import CoreferenceLayer
-from coref_ds.tei.layers.layer import XMLLayer
+from coref_ds.tei.layers.layer import LazyLayers, XMLLayer
 from coref_ds.tei.layers.mention import MentionLayer
 from coref_ds.tei.layers.morphosyntax import MorphosyntaxLayer
 from coref_ds.tei.layers.segmentation import SegmentationLayer
 from coref_ds.tei.nkjp import NKJPStructureLayer
-from coref_ds.tei.utils import get_file_or_archive, word_to_ignore
+from coref_ds.tei.utils import get_file_or_archive, partition_tree, word_to_ignore
 
 from coref_ds.text import Segment, Text
 
@@ -74,28 +77,37 @@ class TEIDocument:
     def from_file(cls, p: Path):
         return cls(p)
 
-    def load_layers(self):
+    def load_layers(self) -> LazyLayers:
+        """
+        Layers present in the document directory, each one is parsed on its first access.
+        """
         layers = {}
+        self.layers_paths = {}
         for layer_name, (layer_class, layer_path) in self.layers_mapping.items():
             p = get_file_or_archive(self.doc_path / layer_path)
             layer_class = layer_class if layer_class else XMLLayer
             if p is not None:
-                layers[layer_name] = layer_class(p, self.ns_map)
+                layers[layer_name] = partial(layer_class, p, self.ns_map)
+                self.layers_paths[layer_name] = p
 
-        return layers
+        return LazyLayers(layers)
+
+    @property
+    def loaded_layers(self) -> list[str]:
+        return self.layers.materialized
 
     def parse_tei_text(self, add_single_mentions_to_cluster=False):
         try:
             morph_dict = self.layers['morphosyntax'].parse_layer()
         except KeyError:
             raise ValueError(f'Morphosyntax layer is not present in the document {self.doc_path.name}')
-        segments_ids, segments_dict = morph_dict['segments_ids'], morph_dict['segments_dict']
+        segments_dict, segments_index = morph_dict['segments_dict'], morph_dict['segments_index']
         segments = [segment['orth'] for k, segment in segments_dict.items()]
         segments_dicts = [segment for k, segment in segments_dict.items()]
         segments_meta = {
             segment['id']: Segment(
                 id=segment['id'],
-                index=segments_ids.index(segment['id']),
+                index=segments_index[segment['id']],
                 orth=segment['orth'],
                 lemma=segment['base'],
                 has_nps=segment['has_nps'],
@@ -108,7 +120,7 @@ class TEIDocument:
             ) for segment in segments_dicts
         }
         if self.layers.get('mentions'):
-            mentions = self.layers['mentions'].parse_layer(segments_meta, segments_ids)
+            mentions = self.layers['mentions'].parse_layer(segments_meta, segments_index)
 
         text = Text(
             text_id=self.doc_path.name,
@@ -145,7 +157,23 @@ class TEIDocument:
 
     @property
     def text(self, add_single_mentions_to_cluster=True):
-        return self.parse_tei_text(add_single_mentions_to_cluster)
+        cache = get_default_cache()
+        if cache is None or self.layers.materialized:  # layers may have been modified in memory
+            return self.parse_tei_text(add_single_mentions_to_cluster)
+
+        def parse():
+            doc = type(self)(self.doc_path, self.layers_mapping, ns_map=self.ns_map)
+            return doc.parse_tei_text(add_single_mentions_to_cluster)
+
+        layer_classes = ','.join(
+            f'{layer_name}={getattr(layer_class, "__qualname__", layer_class)}'
+            for layer_name, (layer_class, _) in self.layers_mapping.items()
+        )
+        return cache.get_or_parse(
+            f'{type(self).__qualname__}:{layer_classes}:{add_single_mentions_to_cluster}',
+            self.layers_paths.values(),
+            parse,
+        )
 
 
     def to_file(self, filedir: Path):
@@ -161,7 +189,7 @@ class TEIDocument:
             return False
 
     def split(self, cum_call: Callable = None):
-        def append_to(el):
+        def append_to(el, sample_ind):
             rt.append(el)
 
         if not cum_call:
@@ -248,43 +276,91 @@ def write_body(tei, text):
 
 class LayersSplitter:
     def __init__(self, tei_doc: TEIDocument):
-        self.segmentation_mapping = None
         self.tei_doc = tei_doc
 
     def get_continuous_samples(self, cum_call: Callable):
         continuous_parts = list(self.tei_doc.layers['text_structure'].continuous_excerpts)
-        for sample_idx, sample_group in enumerate(continuous_parts):
-            subdoc = TEIDocument(self.tei_doc.doc_path)
-            sample_ids = set(
-                sample['sample_id'] for sample in sample_group
-            )
-            self.filter_by_sample_ids(subdoc, sample_ids)
-            # this is much slower (quadratically) for long texts because
-            # it is repeated each time for all samples in the text (for each sample)
-            # however, it is xml format agnostic (at least in a way)
-            debug = subdoc.layers['text_structure'].parse_layer()
+        for sample_idx, subdoc in enumerate(self.split_layers(continuous_parts)):
             cum_call(subdoc, sample_idx)
 
-    def filter_by_sample_ids(self, subdoc: TEIDocument, sample_ids: set[str]):
-        custom_filtered_layers = ('text_structure', 'segmentation', 'morphosyntax')
+    def split_layers(self, continuous_parts: list[list[dict]]) -> list[TEIDocument]:
+        """
+        Builds sub-documents for all continuous parts together: every layer is read once
+        and its units (samples, segments, mentions, cluster pointers) are partitioned by the part they belong to.
+        Layers without a custom partitioning are shared by all the sub-documents (and loaded only if accessed).
+        """
+        layers = self.tei_doc.layers
+        n_groups = len(continuous_parts)
+        sample_groups = {
+            sample['sample_id']: group for group, samples in enumerate(continuous_parts) for sample in samples
+        }
+        xml_id = f'{{{self.tei_doc.ns_map["xmlns"]}}}id'
+        layers_units = {}
+
+        structure = layers['text_structure']
+        layers_units['text_structure'] = {
+            sample: sample_groups.get(structure.parse_sample_metadata(sample)['sample_id'])
+            for div_samples in structure.parse_layer()['div_samples'] for sample in div_samples
+        }
 
-        subdoc.layers['text_structure'].filter_by_sample_ids(sample_ids)
-        segmentation_mapping = subdoc.layers['segmentation'].segmentation_mapping
-        segmentation_mapped_ids = set(
-            segment_id for sample_id in sample_ids for segment_id in segmentation_mapping[sample_id]
-        )
-        subdoc.layers['segmentation'].filter_by_sample_ids(sample_ids)
-        morphosyntax_mapping = subdoc.layers['morphosyntax'].morphosyntax_mapping
-        morphosyntax_mapped_ids = set(
-            morph_id for el in segmentation_mapped_ids for morph_id in morphosyntax_mapping[el]
-        )
-        subdoc.layers['morphosyntax'].filter_by_sample_ids(morphosyntax_mapped_ids)
+        segmentation = layers['segmentation']
+        segmentation_groups = {}
+        layers_units['segmentation'] = {}
+        for segment in segmentation.parse_layer()['segments']:
+            group = sample_groups.get(segmentation.get_sample_id(segment))
+            segmentation_groups[segment.attrib[xml_id]] = group
+            layers_units['segmentation'][segment] = group
+
+        morphosyntax = layers['morphosyntax']
+        morphosyntax_groups = {}
+        layers_units['morphosyntax'] = {}
+        for segment_node in morphosyntax.segment_nodes:
+            segment = segment_node['seg']
+            group = segmentation_groups.get(morphosyntax.get_sample_id(segment))
+            morphosyntax_groups[segment.attrib[xml_id]] = group
+            layers_units['morphosyntax'][segment] = group
+
+        mention_groups = {}
+        if layers.get('mentions'):
+            ptr_tag, f_tag = f'{{{self.tei_doc.ns_map["tei"]}}}ptr', f'{{{self.tei_doc.ns_map["tei"]}}}f'
+            layers_units['mentions'] = {}
+            for mention, mnt_id, par_id in layers['mentions'].mention_nodes():
+                # mentions without segment pointers consist of their semantic head, see `MentionLayer.get_mention`
+                target = next((ptr.attrib['target'] for ptr in mention.iter(ptr_tag)), None) or next(
+                    (f.attrib.get('fVal') for f in mention.iter(f_tag) if f.attrib.get('name') == 'semh'), None
+                )
+                group = morphosyntax_groups.get(target.split('#')[-1]) if target else None
+                if group is None:
+                    logger.warning(
+                        f'Mention {mention.attrib.get(xml_id)} of {self.tei_doc.doc_path} points to no segment '
+                        f'of a continuous part, left out of the sub-documents'
+                    )
+                mention_groups[mention.attrib[xml_id]] = group
+                layers_units['mentions'][mention] = group
+
+        if layers.get('coreference'):
+            ptr_tag = f'{{{self.tei_doc.ns_map["tei"]}}}ptr'
+            layers_units['coreference'] = {
+                ptr: mention_groups.get(ptr.attrib['target'].split('#')[-1])
+                for cluster in layers['coreference'].parse_layer() for ptr in cluster.iter(ptr_tag)
+            }
 
-        for layer_name, layer in subdoc.layers.items():
-            if layer_name in custom_filtered_layers:
-                continue
-            elif hasattr(layer, 'filter_by_sample_ids'):
-                layer.filter_by_sample_ids(sample_ids)
+        partitions = {
+            layer_name: partition_tree(layers[layer_name].root, units, n_groups)
+            for layer_name, units in layers_units.items()
+        }
+        subdocs = []
+        for group in range(n_groups):
+            subdoc = copy.copy(self.tei_doc)
+            subdoc.layers = layers.shared()
+            for layer_name, partition in partitions.items():
+                sublayer = copy.copy(layers[layer_name])
+                sublayer.root = partition[group]
+                subdoc.layers[layer_name] = sublayer
+            subdoc.splitter = LayersSplitter(subdoc)
+            subdocs.append(subdoc)
+
+        return subdocs
 
 
 def create_set_comment(mentions):
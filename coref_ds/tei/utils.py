@@ -1,5 +1,8 @@
+from collections import defaultdict
 from pathlib import Path
+import copy
 
+from lxml import etree
 from lxml.etree import _Comment as Comment
 
 def get_feature_val(f):
@@ -82,4 +85,65 @@ def get_sentence_end(segments, segments_ids, word_idx):
         if segments[segments_ids[word_idx]]['last_in_sent']:
             return word_idx
         word_idx += 1
-    return len(segments) - 1
\ No newline at end of file
+    return len(segments) - 1
+
+def partition_tree(root, unit_groups: dict, n_groups: int) -> list:
+    """
+    Splits a layer tree into `n_groups` trees in linear time.
+    unit_groups maps unit elements (e.g. <seg/>, <ab/>) to a group index; every group tree keeps only its units.
+    Containers holding units of a single other group are dropped (as `remove_if_no_children` does after filtering),
+    containers shared by several groups and elements without units are kept in every tree,
+    a comment goes along with its next sibling.
+    """
+    all_groups = frozenset(range(n_groups))
+    element_groups = {}
+    for unit, group in unit_groups.items():
+        el = unit.getparent()
+        while el is not None:
+            groups = element_groups.setdefault(el, set())
+            if group in groups:
+                break
+            groups.add(group)
+            el = el.getparent()
+
+    def child_groups(child):
+        if child in unit_groups:
+            return {unit_groups[child]}
+        groups = element_groups.get(child)
+        if groups is None or len(groups) > 1:
+            return all_groups
+        return groups
+
+    # children of the elements shared by several groups, partitioned once
+    group_children = {}
+    for el, groups in element_groups.items():
+        if len(groups) < 2:
+            continue
+        children = defaultdict(list)
+        next_groups = all_groups
+        for child in reversed(el):
+            if isinstance(child, Comment):
+                groups = next_groups
+            else:
+                groups = next_groups = child_groups(child)
+            for group in groups:
+                children[group].append(child)
+        group_children[el] = children
+
+    def copy_element(el, group, parent=None):
+        if el not in group_children:
+            copied = copy.deepcopy(el)
+            if parent is not None:
+                parent.append(copied)
+            return copied
+
+        if parent is None:
+            copied = etree.Element(el.tag, el.attrib, nsmap=el.nsmap)
+        else:
+            copied = etree.SubElement(parent, el.tag, el.attrib, nsmap=el.nsmap)
+        copied.text, copied.tail = el.text, el.tail
+        for child in reversed(group_children[el][group]):
+            copy_element(child, group, copied)
+        return copied
+
+    return [copy_element(root, group) for group in range(n_groups)]
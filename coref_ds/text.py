@@ -4,7 +4,8 @@ import copy
 import re
 import logging
 
-from coref_ds.utils import any_segment_is_head, find_incremental_subsequences
+from coref_ds.segment_table import Categories, SegmentTable
+from coref_ds.utils import any_segment_is_head, find_incremental_subsequences, slots_variant
 
 
 @dataclass
@@ -99,6 +100,21 @@ class Mention:
             ]
 
 
+def shift_mention(mention: Mention, offset: int) -> Mention:
+    """
+    Shallow copy of mention with span and head moved by offset.
+    """
+    shifted = copy.copy(mention)
+    shifted.span_start += offset
+    shifted.span_end += offset
+    if shifted.head is not None:
+        shifted.head += offset
+    return shifted
+
+
+SPLIT_NAMES = {'last_in_sent': 's', 'last_in_par': 'p'}
+
+
 @dataclass
 class Text:
     text_id: str
@@ -106,6 +122,7 @@ class Text:
     clusters: list[list[tuple[int, int]]] = field(default_factory=list)
     segments_meta: list[Segment] = field(default_factory=list)
     mentions: list[Mention] | None = None
+    offset: int = 0  # index of the first segment in the text this one was cut from
 
     @property
     def clusters_str(self):
@@ -141,32 +158,154 @@ class Text:
 
     @staticmethod
     def get_subtexts(text, split_key='last_in_sent'):
-        subtexts = []
-        curr_subtext = copy.deepcopy(text)
-        curr_segments = []
-        curr_segments_meta = []
-        curr_start_ind = 0
-
-        name_dict = {'last_in_sent': 's', 'last_in_par': 'p'}
-
-        for ind, segment in enumerate(text.segments):
-            curr_segments.append(segment)
-            curr_segments_meta.append(text.segments_meta[ind])
-
-            if getattr(text.segments_meta[ind], split_key, None):
-                curr_subtext.segments = curr_segments
-                curr_subtext.segments_meta = curr_segments_meta
-                curr_subtext.text_id += f"_{
-                    name_dict[split_key]}_{len(subtexts)}"
-                Text.trim_indexes_after_split(
-                    curr_subtext, curr_start_ind, ind)
-                subtexts.append(curr_subtext)
-                curr_subtext = copy.deepcopy(text)
-                curr_segments = []
-                curr_segments_meta = []
-                curr_start_ind = ind + 1
-
-        return subtexts
+        return list(Text.iter_subtexts(text, split_key))
+
+    @staticmethod
+    def iter_subtexts(text, split_key='last_in_sent'):
+        """
+        Yields subtexts ending at segments with `split_key` set (sentences or paragraphs), see `Text.subtext`.
+        Clusters and mentions are assigned to subtexts in a single pass over the text.
+        """
+        bounds = text.unit_bounds(split_key)
+
+        unit_of = [None] * len(text.segments)
+        for unit_ind, (start, end) in enumerate(bounds):
+            unit_of[start: end] = [unit_ind] * (end - start)
+
+        units_clusters = [defaultdict(list) for _ in bounds]
+        for cluster_ind, cluster in enumerate(text.clusters):
+            for span_start, span_end in cluster:
+                unit_ind = unit_of[span_start]
+                if unit_ind is not None and unit_ind == unit_of[span_end]:
+                    units_clusters[unit_ind][cluster_ind].append((span_start, span_end))
+
+        units_mentions = [[] for _ in bounds]
+        for mention in text.mentions or []:
+            unit_ind = unit_of[mention.span_start]
+            if unit_ind is not None and unit_ind == unit_of[mention.span_end]:
+                units_mentions[unit_ind].append(mention)
+
+        for unit_ind, (start, end) in enumerate(bounds):
+            yield text.subtext(
+                start, end,
+                text_id=f'{text.text_id}_{SPLIT_NAMES[split_key]}_{unit_ind}',
+                clusters=units_clusters[unit_ind].values(),
+                mentions=units_mentions[unit_ind] if text.mentions is not None else None,
+            )
+
+    def unit_bounds(self, split_key='last_in_sent') -> list[tuple[int, int]]:
+        """
+        [start, end) segment ranges of units (sentences or paragraphs) ending at segments with `split_key` set.
+        Segments after the last such segment are not included.
+        """
+        bounds = []
+        start = 0
+        for ind, segment in enumerate(self.segments_meta):
+            if getattr(segment, split_key, None):
+                bounds.append((start, ind + 1))
+                start = ind + 1
+        return bounds
+
+    def iter_windows(self, max_tokens: int, overlap: int = 0, stride: int = None, split_key='last_in_sent'):
+        """
+        Yields windows of whole sentences with at most max_tokens segments, see `Text.subtext`.
+        Sentences longer than max_tokens are cut into max_tokens pieces.
+        Window segment i is segment `window.offset + i` of this text.
+
+        overlap: a window repeats up to overlap trailing segments of the previous one (whole sentences)
+        stride: a window starts at the first sentence at least stride segments after the previous window start,
+            or right after the previous window if it ends earlier, so no sentence is skipped; overrides overlap
+        split_key: 'last_in_par' aligns windows to paragraphs
+        """
+        if max_tokens < 1:
+            raise ValueError(f'max_tokens must be positive, got {max_tokens}')
+        bounds = self.unit_bounds(split_key)
+        tail_start = bounds[-1][1] if bounds else 0
+        if tail_start < len(self.segments):
+            bounds.append((tail_start, len(self.segments)))
+        units = [
+            (piece_start, min(piece_start + max_tokens, end))
+            for start, end in bounds for piece_start in range(start, end, max_tokens)
+        ]
+
+        spans_by_start = defaultdict(list)
+        for cluster_ind, cluster in enumerate(self.clusters):
+            for span_ind, span in enumerate(cluster):
+                spans_by_start[span[0]].append((cluster_ind, span_ind, span))
+        mentions_by_start = defaultdict(list)
+        for mention_ind, mention in enumerate(self.mentions or []):
+            mentions_by_start[mention.span_start].append((mention_ind, mention))
+
+        start_unit, end_unit = 0, 0
+        window_ind = 0
+        while start_unit < len(units):
+            window_start = units[start_unit][0]
+            end_unit = max(end_unit, start_unit + 1)
+            while end_unit < len(units) and units[end_unit][1] - window_start <= max_tokens:
+                end_unit += 1
+            window_end = units[end_unit - 1][1]
+
+            window_spans = sorted(
+                span_item for ind in range(window_start, window_end) for span_item in spans_by_start.get(ind, ())
+                if span_item[2][1] < window_end
+            )
+            clusters = defaultdict(list)
+            for cluster_ind, _, span in window_spans:
+                clusters[cluster_ind].append(span)
+            mentions = None
+            if self.mentions is not None:
+                mentions = [
+                    mention for _, mention in sorted(
+                        (item for ind in range(window_start, window_end) for item in mentions_by_start.get(ind, ())
+                         if item[1].span_end < window_end),
+                        key=lambda item: item[0],
+                    )
+                ]
+            yield self.subtext(
+                window_start, window_end, text_id=f'{self.text_id}_w_{window_ind}',
+                clusters=clusters.values(), mentions=mentions,
+            )
+            window_ind += 1
+
+            if end_unit == len(units):
+                break
+            next_unit = start_unit + 1
+            if stride is not None:
+                while next_unit < end_unit and units[next_unit][0] < window_start + stride:
+                    next_unit += 1
+            else:
+                while next_unit < end_unit and window_end - units[next_unit][0] > overlap:
+                    next_unit += 1
+            start_unit = next_unit
+
+    def subtext(self, start: int, end: int, text_id: str = None, clusters=None, mentions=None):
+        """
+        Text of segments [start, end) sharing segments metadata with this text, without copying it.
+        Clusters and mentions are shifted to subtext coordinates, mentions are shallow copies
+        (their segments keep global `index`).
+        clusters, mentions: the ones inside [start, end) if already known, found otherwise
+        """
+        if clusters is None:
+            clusters = [
+                [span for span in cluster if start <= span[0] and span[1] < end] for cluster in self.clusters
+            ]
+        if mentions is None and self.mentions is not None:
+            mentions = [mention for mention in self.mentions if start <= mention.span_start and mention.span_end < end]
+
+        subtext = copy.copy(self)
+        subtext.text_id = self.text_id if text_id is None else text_id
+        subtext.offset = self.offset + start
+        subtext.segments = self.segments[start: end]
+        subtext.segments_meta = self.segments_meta[start: end]
+        subtext.clusters = [
+            [(span_start - start, span_end - start) for span_start, span_end in cluster]
+            for cluster in clusters if cluster
+        ]
+        if mentions is not None:
+            subtext.mentions = [shift_mention(mention, -start) for mention in mentions]
+        if hasattr(self, 'indices_to_mentions') and subtext.mentions is not None:
+            subtext.indices_to_mentions = {(m.span_start, m.span_end): m for m in subtext.mentions}
+        return subtext
 
     @staticmethod
     def trim_indexes_after_split(text, text_start_ind, text_end_ind):
@@ -240,3 +379,32 @@ class Text:
 
         self.clusters = tuple(new_clusters_dict.values())
         return merged_mentions
+
+    def compact(self, categories: Categories = None):
+        """
+        Moves segments_meta into a columnar `SegmentTable`, mentions then refer to its row views.
+        categories: shared with the tables of the other texts of a corpus, the table's own by default
+        """
+        if isinstance(self.segments_meta, SegmentTable) or not self.segments_meta:
+            return self
+        table = SegmentTable.from_segments(self.segments_meta, categories=categories)
+        positions = {id(segment): position for position, segment in enumerate(self.segments_meta)}
+
+        def to_rows(segments):
+            return [table[positions[id(segment)]] if id(segment) in positions else segment for segment in segments]
+
+        for mention in self.mentions or []:
+            mention.segments = to_rows(mention.segments)
+            if not mention.is_continuous:
+                mention.full_segments = to_rows(mention.full_segments)
+                mention.submentions = [to_rows(submention) for submention in mention.submentions]
+                mention.maximal_continuous_mention = to_rows(mention.maximal_continuous_mention)
+        self.segments_meta = table
+        return self
+
+
+# memory-lean variants without per-instance __dict__
+SlotsSegment = slots_variant(Segment)
+SlotsMention = slots_variant(
+    Mention, extra_slots=('submentions', 'maximal_continuous_mention', 'full_segments', 'dominant', 'mention_id')
+)
@@ -1,3 +1,10 @@
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+import os
+
 from lxml import etree
 
 
@@ -9,6 +16,102 @@ def add_element(where: etree._Element, tag: str, text: str = None, attributes =
             el.set(str(k), str(v))
     return el
 
+def iterparse_elements(p: Path, tag: str) -> Iterator[etree._Element]:
+    """
+    Elements with tag of an XML file in one pass, every element is cleared (with the already yielded preceding
+    siblings) when the next one is requested, so only one of them is kept in memory.
+    """
+    for _, el in etree.iterparse(str(p), events=('end',), tag=tag):
+        yield el
+        el.clear(keep_tail=True)
+        while el.getprevious() is not None:
+            del el.getparent()[0]
+
+
+def ordered_futures(
+        executor: Executor,
+        fn: Callable,
+        args: Iterable[tuple],
+        max_in_flight: int,
+) -> Iterator[tuple[tuple, Future]]:
+    """
+    (a, future of fn(*a)) for every a of args in args order, at most max_in_flight calls are submitted to the executor
+    and not yet yielded, so that finished results do not pile up in memory.
+    """
+    pending: deque[tuple[tuple, Future]] = deque()
+    for a in args:
+        pending.append((a, executor.submit(fn, *a)))
+        if len(pending) >= max_in_flight:
+            yield pending.popleft()
+    while pending:
+        yield pending.popleft()
+
+
+def completed_futures(
+        executor: Executor,
+        fn: Callable,
+        args: Iterable[tuple],
+        max_in_flight: int,
+) -> Iterator[tuple[tuple, Future]]:
+    """
+    (a, future of fn(*a)) for every a of args as soon as the call is done, so that a slow call does not hold back
+    the ones after it. A new call is submitted whenever one is yielded, at most max_in_flight are in flight.
+    """
+    args = iter(args)
+    pending: dict[Future, tuple] = {}
+    for a in args:
+        pending[executor.submit(fn, *a)] = a
+        if len(pending) >= max_in_flight:
+            break
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            yield pending.pop(future), future
+            a = next(args, None)
+            if a is not None:
+                pending[executor.submit(fn, *a)] = a
+
+
+def map_documents(
+        fn: Callable,
+        args: Iterable[tuple],
+        doc: Callable[[tuple], object],
+        workers: int | None,
+        max_in_flight: int | None,
+        on_error: Callable,
+        ordered: bool = True,
+) -> Iterator:
+    """
+    fn(*a) for every a of args, computed in a process pool with at most max_in_flight calls in flight
+    (see `ordered_futures`). Failed calls are reported with on_error(doc(a), error) and skipped.
+
+    workers: number of processes, `os.cpu_count()` by default; 0 or 1 calls fn in the current process
+    max_in_flight: 4 * workers by default
+    ordered: yield in args order, otherwise in completion order (see `completed_futures`)
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers <= 1:
+        for a in args:
+            try:
+                yield fn(*a)
+            except Exception as e:
+                on_error(doc(a), e)
+        return
+
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        futures = ordered_futures if ordered else completed_futures
+        for a, future in futures(executor, fn, args, max_in_flight or 4 * workers):
+            try:
+                yield future.result()
+            except Exception as e:
+                on_error(doc(a), e)
+    finally:
+        executor.shutdown(cancel_futures=True)  # the caller may stop iterating early
+
+
 def count_mentions(doc):
     all_mentions = set()
     for men in doc.text.mentions:
@@ -42,3 +145,15 @@ def any_segment_is_head(segments, head_orth: str, head_index: int):
         
     return False
 
+
+def slots_variant(cls, extra_slots: tuple[str, ...] = ()):
+    """
+    Copy of dataclass `cls` with __slots__ instead of per-instance __dict__.
+    extra_slots: attributes set outside of the dataclass fields
+    """
+    generated = ('__dict__', '__weakref__', '__dataclass_fields__', '__dataclass_params__', '__match_args__')
+    namespace = {k: v for k, v in vars(cls).items() if k not in generated}
+    slotted = dataclass(slots=True)(type(f'Slots{cls.__name__}', cls.__bases__, namespace))
+    if extra_slots:
+        slotted = type(slotted.__name__, (slotted,), {'__slots__': extra_slots, '__module__': cls.__module__})
+    return slotted
@@ -0,0 +1,41 @@
+"""
+Synthetic KPWr-like CCL documents for tests and benchmarks.
+"""
+from pathlib import Path
+
+from lxml import etree
+
+from tests.synthetic_mmax import WORDS
+
+
+def write_ccl_document(p: Path, n_sentences: int = 3, n_chunks: int = 1) -> Path:
+    """
+    n_chunks paragraphs (`chunk`) of n_sentences sentences of `WORDS`, with `ns` before the punctuation and
+    a second, not disambiguated `lex` for every first word. Also writes an empty relations file (`.rel.xml`)
+    next to it, like in KPWr. Returns p.
+    """
+    p = Path(p)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    root = etree.Element('chunkList')
+    for chunk_ind in range(n_chunks):
+        chunk = etree.SubElement(root, 'chunk', id=f'ch{chunk_ind + 1}', type='p')
+        for sent_ind in range(n_sentences):
+            sentence = etree.SubElement(chunk, 'sentence', id=f's{sent_ind + 1}')
+            for ind, (orth, base, ctag, msd) in enumerate(WORDS):
+                if orth in ',.':
+                    etree.SubElement(sentence, 'ns')
+                tok = etree.SubElement(sentence, 'tok')
+                etree.SubElement(tok, 'orth').text = orth
+                lex = etree.SubElement(tok, 'lex', disamb='1')
+                etree.SubElement(lex, 'base').text = base
+                etree.SubElement(lex, 'ctag').text = msd
+                if ind == 0:
+                    lex = etree.SubElement(tok, 'lex')
+                    etree.SubElement(lex, 'base').text = base.lower()
+                    etree.SubElement(lex, 'ctag').text = ctag
+    with open(p, 'wb') as f:
+        f.write(etree.tostring(
+            root, pretty_print=True, xml_declaration=True, encoding='utf-8', doctype='<!DOCTYPE chunkList SYSTEM "ccl.dtd">'
+        ))
+    p.with_name(f'{p.stem}.rel.xml').write_text('<relations/>\n')
+    return p
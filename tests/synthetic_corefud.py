@@ -0,0 +1,35 @@
+"""
+Synthetic multi-document CorefUD files for tests and benchmarks.
+"""
+from pathlib import Path
+
+SENTENCE = """# sent_id = {doc_id}-{sent_ind}-1
+# text = Ala ma kota, który śpi.
+1	Ala	Ala	PROPN	_	_	2	nsubj	_	Entity=(e{ent_1}--1)
+2	ma	mieć	VERB	_	_	0	root	_	_
+3	kota	kot	NOUN	_	_	2	obj	_	Entity=(e{ent_2}--1|SpaceAfter=No
+4	,	,	PUNCT	_	_	6	punct	_	_
+5	który	który	DET	_	_	6	nsubj	_	Entity=(e{ent_2}--1)
+6	śpi	spać	VERB	_	_	3	acl	_	Entity=e{ent_2})|SpaceAfter=No
+7	.	.	PUNCT	_	_	2	punct	_	_
+
+# sent_id = {doc_id}-{sent_ind}-2
+# text = Ala śpi.
+1	Ala	Ala	PROPN	_	_	2	nsubj	_	Entity=(e{ent_1}--1)
+2	śpi	spać	VERB	_	_	0	root	_	SpaceAfter=No
+3	.	.	PUNCT	_	_	2	punct	_	_
+
+"""
+
+
+def write_corefud_file(p: Path, doc_ids: list[str], n_sentences: int = 1) -> Path:
+    """
+    Every document has n_sentences pairs of sentences, each pair with an 'Ala' entity
+    and a 'kota' entity with a nested 'który' mention.
+    """
+    with open(p, 'w') as f:
+        for doc_id in doc_ids:
+            f.write(f'# newdoc id = {doc_id}\n# global.Entity = eid-etype-head-other\n')
+            for sent_ind in range(n_sentences):
+                f.write(SENTENCE.format(doc_id=doc_id, sent_ind=sent_ind, ent_1=2 * sent_ind + 1, ent_2=2 * sent_ind + 2))
+    return p
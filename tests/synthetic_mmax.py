@@ -0,0 +1,71 @@
+"""
+Synthetic PCC-like MMAX documents (.mmax, _words.xml and _mentions.xml) for tests and benchmarks.
+"""
+from pathlib import Path
+
+from lxml import etree
+
+from coref_ds.mmax.attributes import MARKABLE_ATTRIBUTES
+
+MENTION_NS = 'www.eml.org/NameSpaces/mention'
+
+WORDS = [
+    ('Ala', 'Ala', 'subst', 'subst:sg:nom:f'),
+    ('ma', 'mieć', 'fin', 'fin:sg:ter:imperf'),
+    ('kota', 'kot', 'subst', 'subst:sg:acc:m2'),
+    (',', ',', 'interp', 'interp'),
+    ('który', 'który', 'adj', 'adj:sg:nom:m2:pos'),
+    ('śpi', 'spać', 'fin', 'fin:sg:ter:imperf'),
+    ('.', '.', 'interp', 'interp'),
+]
+
+
+def _write(root, p: Path, doctype: str = None):
+    with open(p, 'wb') as f:
+        f.write(etree.tostring(root, pretty_print=True, xml_declaration=True, encoding='utf-8', doctype=doctype))
+
+
+def write_mmax_document(doc_dir: Path, doc_id: str, n_sentences: int = 3, discontinuous: bool = False) -> Path:
+    """
+    Every sentence (`WORDS`) gets an `Ala` singleton and a `kota ... który` cluster; every third `kota`
+    has a near-identity link, the attributes of the other markables are defaults or empty strings.
+    discontinuous: every other sentence gets a discontinuous `ma kota ... śpi` singleton as well
+    Returns the .mmax path.
+    """
+    doc_dir = Path(doc_dir)
+    doc_dir.mkdir(parents=True, exist_ok=True)
+
+    words = etree.Element('words')
+    markables = etree.Element('markables', nsmap={None: MENTION_NS})
+    markable_ind = 0
+
+    def add_markable(span: str, group: str, head: str, **attributes):
+        nonlocal markable_ind
+        markable_ind += 1
+        attrib = dict(MARKABLE_ATTRIBUTES, id=f'markable_{markable_ind}', span=span, mention_group=group,
+                      mention_head=head, excluding_ios='', near_identity='')
+        attrib.update(attributes)
+        etree.SubElement(markables, f'{{{MENTION_NS}}}markable', attrib)
+
+    for sent_ind in range(n_sentences):
+        first = sent_ind * len(WORDS)
+        for ind, (orth, base, ctag, msd) in enumerate(WORDS):
+            word = etree.SubElement(words, 'word', base=base, ctag=ctag, id=f'word_{first + ind}', msd=msd)
+            word.text = orth
+            if orth in ',.':
+                word.set('hasNps', 'true')
+            if ind == len(WORDS) - 1:
+                word.set('lastInSent', 'true')
+        add_markable(f'word_{first}', 'empty', 'Ala')
+        near_identity = {'near_identity': 'set_0', 'near_identity_facet': 'role'} if sent_ind % 3 == 0 else {}
+        add_markable(f'word_{first + 2}', f'set_{sent_ind}', 'kota', **near_identity)
+        add_markable(f'word_{first + 4}..word_{first + 5}', f'set_{sent_ind}', 'który')
+        if discontinuous and sent_ind % 2 == 0:
+            add_markable(f'word_{first + 1}..word_{first + 2},word_{first + 5}', 'empty', 'śpi')
+
+    _write(words, doc_dir / f'{doc_id}_words.xml', '<!DOCTYPE words SYSTEM "words.dtd">')
+    _write(markables, doc_dir / f'{doc_id}_mentions.xml', '<!DOCTYPE markables SYSTEM "markables.dtd">')
+    mmax = etree.Element('mmax_project')
+    etree.SubElement(mmax, 'words').text = f'{doc_id}_words.xml'
+    _write(mmax, doc_dir / f'{doc_id}.mmax')
+    return doc_dir / f'{doc_id}.mmax'
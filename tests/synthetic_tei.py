@@ -0,0 +1,124 @@
+"""
+Synthetic NKJP/PCC-like TEI documents for tests that cannot rely on the corpus data from `.env`.
+"""
+from pathlib import Path
+
+from lxml import etree
+
+TEI_NS = 'http://www.tei-c.org/ns/1.0'
+XML_ID = '{http://www.w3.org/XML/1998/namespace}id'
+
+ORTHS = [
+    ('Ala', 'Ala', 'subst', 'sg:nom:f'),
+    ('ma', 'mieć', 'fin', 'sg:ter:imperf'),
+    ('kota', 'kot', 'subst', 'sg:acc:m2'),
+    (',', ',', 'interp', ''),
+    ('który', 'który', 'adj', 'sg:nom:m2:pos'),
+    ('śpi', 'spać', 'fin', 'sg:ter:imperf'),
+    ('.', '.', 'interp', ''),
+]
+
+
+def _tei_root():
+    root = etree.Element(f'{{{TEI_NS}}}teiCorpus', nsmap={None: TEI_NS})
+    tei = etree.SubElement(root, f'{{{TEI_NS}}}TEI')
+    text = etree.SubElement(tei, f'{{{TEI_NS}}}text')
+    body = etree.SubElement(text, f'{{{TEI_NS}}}body')
+    return root, body
+
+
+def _el(parent, tag, attributes=None, text=None):
+    el = etree.SubElement(parent, f'{{{TEI_NS}}}{tag}')
+    for k, v in (attributes or {}).items():
+        el.set(k, v)
+    el.text = text
+    return el
+
+
+def _write(root, path: Path):
+    with open(path, 'wb') as f:
+        f.write(etree.tostring(root, pretty_print=True, xml_declaration=True, encoding='UTF-8'))
+
+
+def write_tei_document(
+        doc_dir: Path,
+        n_samples: int = 2,
+        n_paragraphs: int = 2,
+        n_sentences: int = 3,
+        samples_per_div: int = 1,
+        mentions_per_sentence: int = 2,
+):
+    """
+    Writes a document with `n_samples` text samples (<ab/>), each holding `n_paragraphs` paragraphs of
+    `n_sentences` copies of the `ORTHS` sentence. Every sentence gets a two-element cluster
+    (`Ala` ... `który`) and, with `mentions_per_sentence` > 2, a singleton (`kota`).
+    """
+    doc_dir = Path(doc_dir)
+    doc_dir.mkdir(parents=True, exist_ok=True)
+
+    text_root, text_body = _tei_root()
+    segm_root, segm_body = _tei_root()
+    morph_root, morph_body = _tei_root()
+    ment_root, ment_body = _tei_root()
+    coref_root, coref_body = _tei_root()
+    ment_p = _el(ment_body, 'p', {XML_ID: 'mentions_p'})
+    coref_p = _el(coref_body, 'p', {XML_ID: 'coreference_p'})
+
+    div = None
+    par_ind, sent_ind, seg_ind, mention_ind, cluster_ind = 0, 0, 0, 0, 0
+    for sample_ind in range(n_samples):
+        if sample_ind % samples_per_div == 0:
+            div = _el(text_body, 'div', {XML_ID: f'txt_{sample_ind + 1}-div'})
+        sample_id = f'txt_{sample_ind + 1}.1-ab'
+        _el(div, 'ab', {'n': f'p1in{sample_ind + 1}of:Synthetic:{sample_ind}', XML_ID: sample_id}, 'tekst')
+
+        for _ in range(n_paragraphs):
+            par_ind += 1
+            segm_p = _el(segm_body, 'p', {XML_ID: f'segm_{par_ind}-p'})
+            morph_p = _el(morph_body, 'p', {XML_ID: f'morph_{par_ind}-p'})
+            for _ in range(n_sentences):
+                sent_ind += 1
+                segm_s = _el(segm_p, 's', {XML_ID: f'segm_{sent_ind}-s'})
+                morph_s = _el(morph_p, 's', {XML_ID: f'morph_{sent_ind}-s'})
+                sentence_ids = []
+                for orth, base, ctag, msd in ORTHS:
+                    seg_ind += 1
+                    segm_id, morph_id = f'segm_{seg_ind}-seg', f'morph_{seg_ind}-seg'
+                    _el(segm_s, 'seg', {'corresp': f'text.xml#string-range({sample_id},0,{len(orth)})', XML_ID: segm_id})
+                    seg = _el(morph_s, 'seg', {'corresp': f'ann_segmentation.xml#{segm_id}', XML_ID: morph_id})
+                    fs = _el(seg, 'fs', {'type': 'morph'})
+                    _el(_el(fs, 'f', {'name': 'orth'}), 'string', text=orth)
+                    if ctag == 'interp':
+                        _el(_el(fs, 'f', {'name': 'nps'}), 'binary', {'value': 'true'})
+                    disamb = _el(_el(fs, 'f', {'name': 'disamb'}), 'fs', {'type': 'tool_report'})
+                    interpretation = ':'.join(filter(None, (base, ctag, msd)))
+                    _el(_el(disamb, 'f', {'name': 'interpretation'}), 'string', text=interpretation)
+                    sentence_ids.append(morph_id)
+
+                mention_spans = [(0, 0), (4, 4), (2, 2)][:mentions_per_sentence]
+                cluster_mentions = []
+                for start, end in mention_spans:
+                    mention_ind += 1
+                    mention_id = f'mention_{mention_ind}'
+                    seg = _el(ment_p, 'seg', {XML_ID: mention_id})
+                    fs = _el(seg, 'fs', {'type': 'mention'})
+                    _el(fs, 'f', {'name': 'semh', 'fVal': f'ann_morphosyntax.xml#{sentence_ids[start]}'})
+                    for ind in range(start, end + 1):
+                        _el(seg, 'ptr', {'target': f'ann_morphosyntax.xml#{sentence_ids[ind]}'})
+                    cluster_mentions.append(mention_id)
+
+                if len(cluster_mentions) >= 2:
+                    cluster_ind += 1
+                    seg = _el(coref_p, 'seg', {XML_ID: f'coreference_{cluster_ind}'})
+                    fs = _el(seg, 'fs', {'type': 'coreference'})
+                    _el(fs, 'f', {'name': 'type', 'fVal': 'ident'})
+                    _el(fs, 'f', {'name': 'dominant', 'fVal': 'Ala'})
+                    for mention_id in cluster_mentions[:2]:
+                        _el(seg, 'ptr', {'target': f'ann_mentions.xml#{mention_id}'})
+
+    _write(text_root, doc_dir / 'text.xml')
+    _write(segm_root, doc_dir / 'ann_segmentation.xml')
+    _write(morph_root, doc_dir / 'ann_morphosyntax.xml')
+    _write(ment_root, doc_dir / 'ann_mentions.xml')
+    _write(coref_root, doc_dir / 'ann_coreference.xml')
+    return doc_dir
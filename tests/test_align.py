@@ -0,0 +1,78 @@
+import unittest
+import random
+
+from coref_ds.align import (
+    AlignmentReport, OffsetAlignment, align, align_documents, align_heads, align_mention, get_alignment,
+)
+
+
+def random_document(rng: random.Random):
+    """
+    Annotated tokens with zero anaphora and original tokens with merged and missing tokens.
+    """
+    words = [rng.choice(['Ala', 'ma', 'kota', ',', 'który', 'śpi', '.']) for _ in range(rng.randint(5, 40))]
+    annotated = [rng.choice([word, 'Ø']) if rng.random() < 0.1 else word for word in words]
+    original = []
+    for word in words:
+        if rng.random() < 0.1:
+            continue
+        if original and rng.random() < 0.1:
+            original[-1] += word
+        else:
+            original.append(word)
+    clusters = []
+    for _ in range(rng.randint(1, 5)):
+        cluster = []
+        for _ in range(rng.randint(1, 3)):
+            start = rng.randrange(len(annotated))
+            cluster.append((start, min(len(annotated) - 1, start + rng.randint(0, 3))))
+        clusters.append(cluster)
+    heads = {span: rng.randint(span[0], span[1]) for cluster in clusters for span in cluster}
+    return annotated, original, clusters, heads
+
+
+class TestAlign(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(0)
+        self.documents = [random_document(rng) for _ in range(50)]
+
+    def expected(self, annotated, original, clusters, heads):
+        a2b, _ = get_alignment(annotated, original)
+        mapping = {span: align_mention(span, a2b, annotated) for cluster in clusters for span in cluster}
+        aligned_clusters = [[mapping[span] for span in cluster if mapping[span]] for cluster in clusters]
+        return aligned_clusters, mapping, align_heads(heads, mapping, a2b)
+
+    def test_align_documents(self):
+        annotated, original, clusters, heads = zip(*self.documents)
+        for workers in (1, 2):
+            report = AlignmentReport()
+            aligned = align_documents(annotated, original, clusters, heads, workers=workers, report=report)
+            n_misaligned = 0
+            for document, (doc_annotated, doc_original, doc_clusters, doc_heads) in zip(aligned, self.documents):
+                aligned_clusters, mapping, aligned_heads = self.expected(
+                    doc_annotated, doc_original, doc_clusters, doc_heads
+                )
+                self.assertEqual(document.clusters, aligned_clusters)
+                self.assertEqual(document.mapping, mapping)
+                self.assertEqual(document.heads, aligned_heads)
+                n_misaligned += sum(span is None for cluster in doc_clusters for span in map(mapping.get, cluster))
+
+            self.assertGreater(n_misaligned, 0)
+            self.assertEqual(len(report.misalignments), n_misaligned)
+            self.assertEqual(report.n_documents, len(self.documents))
+            for misalignment in report.misalignments:
+                self.assertIsNone(aligned[misalignment.doc].mapping[misalignment.span])
+
+    def test_align(self):
+        annotated, original, clusters, heads = self.documents[0]
+        aligned_clusters, mapping, _ = self.expected(annotated, original, clusters, heads)
+        a2b, _ = get_alignment(annotated, original)
+        for alignment in (None, a2b, OffsetAlignment(a2b, annotated)):
+            self.assertEqual(align(original, annotated, clusters, alignment=alignment), (aligned_clusters, mapping))
+        self.assertEqual(align(original, annotated, clusters[0]), ([aligned_clusters[0]], {
+            span: mapping[span] for span in clusters[0]
+        }))
+
+    def test_zero_anaphora(self):
+        alignment = OffsetAlignment.from_tokens(['Ø', 'Ala', 'ma', 'Ø', 'kota', 'Ø'], ['Ala', 'ma', 'kota'])
+        self.assertEqual(alignment.map_spans([(0, 2), (0, 0), (3, 5), (1, 4)]), [(0, 2), None, (2, 3), (0, 3)])
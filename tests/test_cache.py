@@ -0,0 +1,159 @@
+import os
+import unittest
+import tempfile
+from unittest import mock
+from pathlib import Path
+
+import spacy_alignments
+
+from coref_ds.align import align
+from coref_ds.cache import EVICT_TO, AlignmentCache, TextCache, set_default_alignment_cache, set_default_cache
+from coref_ds.corefud.corefud_doc import CorefUDDoc
+from coref_ds.tei.tei_doc import TEIDocument
+from coref_ds.text import Text
+
+from tests.synthetic_corefud import write_corefud_file
+from tests.synthetic_tei import write_tei_document
+
+
+class TestTextCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.doc_dir = write_tei_document(Path(self.tmp_dir.name) / 'doc', n_samples=2)
+        self.cache = TextCache(Path(self.tmp_dir.name) / 'cache')
+        set_default_cache(self.cache)
+
+    def tearDown(self):
+        set_default_cache(None)
+        self.tmp_dir.cleanup()
+
+    def test_tei_text(self):
+        text = TEIDocument(self.doc_dir).text
+        self.assertEqual(len(self.cache.entries()), 1)
+
+        tei_doc = TEIDocument(self.doc_dir)
+        cached_text = tei_doc.text
+        self.assertEqual(tei_doc.loaded_layers, [])
+        self.assertEqual(cached_text.segments_meta, text.segments_meta)
+        self.assertEqual(cached_text.clusters, text.clusters)
+        self.assertEqual([m.id for m in cached_text.mentions], [m.id for m in text.mentions])
+        self.assertIs(cached_text.mentions[0].segments[0], cached_text.segments_meta[0])
+
+        tei_doc.layers['mentions'].remove_mentions()  # modified in memory, not from the cache
+        self.assertEqual(len(tei_doc.text.clusters), 0)
+
+        stat = os.stat(self.doc_dir / 'ann_mentions.xml')
+        os.utime(self.doc_dir / 'ann_mentions.xml', ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        TEIDocument(self.doc_dir).text
+        self.assertEqual(len(self.cache.entries()), 2)
+
+    def test_eviction(self):
+        TEIDocument(self.doc_dir).text
+        entry_size = self.cache.size
+        other_doc_dir = write_tei_document(Path(self.tmp_dir.name) / 'other_doc', n_samples=2)
+        self.cache.max_size = entry_size + entry_size // 2
+        TEIDocument(other_doc_dir).text
+        self.assertEqual(len(self.cache.entries()), 1)
+        self.assertEqual(TEIDocument(other_doc_dir).text.text_id, 'other_doc')
+
+        self.cache.clear()
+        self.assertEqual(self.cache.size, 0)
+
+    def test_corefud_options(self):
+        doc_path = write_corefud_file(Path(self.tmp_dir.name) / 'doc.conllu', ['doc1'])
+        self.assertIsNotNone(CorefUDDoc(doc_path).text.segments_meta[0].id)
+
+        corefud_doc = CorefUDDoc(doc_path)
+        corefud_doc.segment_ids = False
+        self.assertIsNone(corefud_doc.text.segments_meta[0].id)
+        self.assertIsNone(corefud_doc._udapi_docs)
+        self.assertEqual(len(self.cache.entries()), 2)
+
+
+class TestAlignmentCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache = AlignmentCache(Path(self.tmp_dir.name) / 'cache')
+        self.annotated = ['Ø', 'Ala', 'ma', 'kota', ',', 'który', 'śpi', '.']
+        self.original = ['Ala', 'ma', 'kota,', 'który', 'śpi.']
+
+    def tearDown(self):
+        set_default_alignment_cache(None)
+        self.tmp_dir.cleanup()
+
+    def test_get_or_align(self):
+        calls = []
+
+        def get_alignments(a, b):
+            calls.append((a, b))
+            return spacy_alignments.get_alignments(a, b)
+
+        expected = spacy_alignments.get_alignments(self.annotated, self.original)
+        self.assertEqual(self.cache.get_or_align(self.annotated, self.original, get_alignments), expected)
+        self.assertEqual(self.cache.get_or_align(self.annotated, self.original, get_alignments), expected)
+        self.assertEqual(len(calls), 1)
+
+        self.assertNotEqual(self.cache.key(['ab', 'c'], ['x']), self.cache.key(['a', 'bc'], ['x']))
+        self.assertNotEqual(self.cache.key(self.annotated, self.original), self.cache.key(self.original, self.annotated))
+
+    def test_align(self):
+        set_default_alignment_cache(self.cache)
+        clusters = [[(1, 1), (5, 5)], [(0, 3), (6, 7)]]
+        expected = align(self.original, self.annotated, clusters)
+        self.assertEqual(len(self.cache.entries()), 1)
+        self.assertEqual(align(self.original, self.annotated, clusters), expected)
+        self.assertEqual(len(self.cache.entries()), 1)
+
+    def test_eviction(self):
+        self.cache.get_or_align(self.annotated, self.original, spacy_alignments.get_alignments)
+        entry_size = self.cache.size
+        self.cache.max_size = entry_size + entry_size // 2
+        self.cache.get_or_align(self.original, self.annotated, spacy_alignments.get_alignments)
+        self.assertEqual(len(self.cache.entries()), 1)
+        self.assertIsNotNone(self.cache.get(self.cache.key(self.original, self.annotated)))
+
+
+class TestDiskCacheSize(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache = AlignmentCache(Path(self.tmp_dir.name) / 'cache')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_running_size(self):
+        scans = []
+        scandir = os.scandir
+
+        def counting_scandir(*args):
+            scans.append(args)
+            return scandir(*args)
+
+        with mock.patch('coref_ds.cache.os.scandir', counting_scandir):
+            for ind in range(20):
+                self.cache.put(self.cache.key([str(ind)], ['x']), [[0]], [[0]])
+            self.assertEqual(len(scans), 1)
+            size = self.cache.dir_size
+
+            self.cache.max_size = size // 2
+            self.cache.put(self.cache.key(['20'], ['x']), [[0]], [[0]])
+            self.assertEqual(len(scans), 2)
+        self.assertLessEqual(self.cache.dir_size, self.cache.max_size * EVICT_TO)
+        self.assertEqual(self.cache.dir_size, self.cache.size)
+
+    def test_shared_budget(self):
+        text_cache = TextCache(self.cache.cache_dir)
+        text_cache.put(text_cache.key('parser', []), Text('doc', ['Ala', 'ma', 'kota']))
+        text_size = text_cache.size
+        self.cache.put(self.cache.key(['0'], ['x']), [[0]], [[0]])
+        self.assertEqual(text_cache.dir_size, text_size + self.cache.size)
+
+        # the text entry is the least recently used one
+        self.cache.max_size = text_cache.dir_size - 1
+        os.utime(text_cache.entries()[0].path, (0, 0))
+        self.cache.put(self.cache.key(['1'], ['x']), [[0]], [[0]])
+        self.assertEqual(text_cache.entries(), [])
+        self.assertEqual(len(self.cache.entries()), 2)
+
+        text_cache.clear()
+        self.assertEqual(len(self.cache.entries()), 2)
@@ -0,0 +1,55 @@
+import unittest
+import tempfile
+from pathlib import Path
+
+from lxml import etree
+
+from coref_ds.ccl.ccl_doc import CclDoc, CclSegment
+from coref_ds.ccl.corpus import find_ccl_documents, load_ccl_corpus
+
+from tests.synthetic_ccl import write_ccl_document
+from tests.synthetic_mmax import WORDS
+
+
+class TestCclStream(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp_dir.name) / 'kpwr'
+        self.paths = [
+            write_ccl_document(self.root / f'0010050{doc_ind}.xml', n_sentences=doc_ind + 1, n_chunks=2)
+            for doc_ind in range(4)
+        ]
+        self.broken = self.root / '00100509.xml'
+        self.broken.write_text('<chunkList>')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_segment(self):
+        segment = CclSegment('kota', 'subst:sg:acc:m2', 'kot', False, True, index=2)
+        self.assertEqual((segment.index, segment.last_in_sent, segment.pos), (2, True, 'subst:sg:acc:m2'))
+
+    def test_from_file(self):
+        doc = CclDoc.from_file(self.paths[1])
+        self.assertEqual(len(doc.segments), 2 * 2 * len(WORDS))
+        self.assertEqual([s.index for s in doc.segments], list(range(len(doc.segments))))
+        self.assertEqual([s.orth for s in doc.segments[:len(WORDS)]], [orth for orth, *_ in WORDS])
+        self.assertEqual(doc.segments[0].lemma, 'Ala')  # of the first lex
+        self.assertEqual(doc.segments[2].pos, 'subst:sg:acc:m2')
+        self.assertEqual(sum(s.last_in_sent for s in doc.segments), 4)
+        self.assertTrue(doc.segments[len(WORDS) - 1].last_in_sent)
+
+        segments, _ = CclDoc._parse_ccl(etree.parse(str(self.paths[1])), self.paths[1])
+        self.assertEqual(segments, doc.segments)
+
+    def test_corpus(self):
+        self.assertEqual(find_ccl_documents(self.root), self.paths + [self.broken])
+        expected = [CclDoc.from_file(p).text for p in self.paths]
+        for workers in (1, 2):
+            errors = []
+            texts = list(load_ccl_corpus(
+                self.root, workers=workers, max_in_flight=2, on_error=lambda p, e: errors.append(p)
+            ))
+            self.assertEqual([t.text_id for t in texts], [t.text_id for t in expected])
+            self.assertEqual([t.segments for t in texts], [t.segments for t in expected])
+            self.assertEqual(errors, [self.broken])
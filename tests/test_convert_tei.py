@@ -0,0 +1,48 @@
+import unittest
+import tempfile
+from pathlib import Path
+
+from coref_ds.corefud import corefud_writer
+from coref_ds.corefud.convert_tei import convert_tei_corpus, write_report
+from coref_ds.tei.corpus import load_tei_corpus
+
+from tests.synthetic_tei import write_tei_document
+
+
+class TestConvertTEI(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp_dir.name) / 'tei'
+        text_ids = iter(corefud_writer.pcc_structure_reversed)
+        for split_name, n_docs in (('train', 3), ('dev', 1), ('test', 2)):
+            for doc_ind in range(n_docs):
+                write_tei_document(self.root / split_name / next(text_ids), n_samples=doc_ind + 1)
+        broken_dir = self.root / 'train' / next(text_ids)
+        broken_dir.mkdir()
+        (broken_dir / 'ann_morphosyntax.xml').write_text('<teiCorpus>')
+        self.broken_dir = broken_dir
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_convert(self):
+        for workers in (1, 2):
+            output_dir = Path(self.tmp_dir.name) / f'out{workers}'
+            reported = []
+            results = convert_tei_corpus(self.root, output_dir, workers=workers, on_result=reported.append)
+
+            self.assertEqual(reported, results)
+            self.assertEqual([r.doc_path for r in results if not r.ok], [self.broken_dir])
+            self.assertEqual(len(results), 7)
+            for split_name in ('train', 'dev', 'test'):
+                expected = corefud_writer.texts_to_corefud(
+                    load_tei_corpus(self.root / split_name, workers=1, on_error=lambda *_: None)
+                )
+                output = (output_dir / f'pl_pcc-corefud-{split_name}.conllu').read_text()
+                self.assertEqual(output, expected)
+
+            report = output_dir / 'report.tsv'
+            write_report(results, report)
+            lines = report.read_text().splitlines()
+            self.assertEqual(len(lines), 8)
+            self.assertEqual(sum(line.endswith('\t') for line in lines), 6)
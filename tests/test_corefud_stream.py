@@ -0,0 +1,112 @@
+import pickle
+import re
+import unittest
+import tempfile
+from pathlib import Path
+
+from coref_ds.corefud.corefud_doc import CorefUDDoc
+
+from tests.synthetic_corefud import write_corefud_file
+
+
+class TestCorefUDStream(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.doc_ids = ['doc1', 'doc2', 'doc3']
+        self.doc_path = write_corefud_file(Path(self.tmp_dir.name) / 'docs.conllu', self.doc_ids)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_iter_texts(self):
+        texts = list(CorefUDDoc.iter_texts(self.doc_path))
+        self.assertEqual([text.text_id for text in texts], self.doc_ids)
+        for backend in ('udapi', 'conllu'):
+            self.assertEqual(list(CorefUDDoc.iter_texts(str(self.doc_path), backend=backend)), texts)
+
+        corefud_doc = CorefUDDoc(self.doc_path)
+        self.assertEqual(len(corefud_doc.udapi_docs), len(self.doc_ids))
+        for udapi_doc, text in zip(corefud_doc.udapi_docs, texts):
+            self.assertEqual(corefud_doc.doc_to_text(udapi_doc), text)
+
+        text = texts[1]
+        segment = next(CorefUDDoc.iter_texts(self.doc_path)).segments_meta[0]
+        self.assertIsInstance(segment._id, tuple)  # the address is formatted on first access
+        self.assertEqual(segment.id, 'doc1-0-1#1')
+        self.assertEqual(pickle.loads(pickle.dumps(segment)), segment)
+        self.assertEqual(len(text.segments), 10)
+        self.assertEqual(text.clusters, ([(0, 0), (7, 7)], [(2, 5), (4, 4)]))
+        self.assertTrue(text.segments_meta[6].last_in_sent)
+
+    def test_conllu_backend(self):
+        doc_path = Path(self.tmp_dir.name) / 'hard.conllu'
+        doc_path.write_text(HARD_DOC)
+        # sentences without sent_id at the start of the file, and after a sent_id in the later documents
+        mixed_path = write_corefud_file(Path(self.tmp_dir.name) / 'mixed.conllu', ['d0', 'd1', 'd2'], n_sentences=2)
+        sent_ids = iter(range(12))
+        mixed_path.write_text(''.join(
+            line for line in mixed_path.read_text().splitlines(True)
+            if not line.startswith('# sent_id') or next(sent_ids) in (4, 6, 8, 10)
+        ))
+        for p in (mixed_path, self.doc_path, doc_path):
+            udapi_texts = list(CorefUDDoc.iter_texts(p))
+            texts = list(CorefUDDoc.iter_texts(p, backend='conllu'))
+            self.assertEqual(texts, udapi_texts)
+            for text, udapi_text in zip(texts, udapi_texts):
+                self.assertEqual(text.mentions, udapi_text.mentions)
+
+        text = texts[0]
+        self.assertEqual(text.text_id, 'hard')
+        self.assertEqual(text.segments[5:8], ['śpi', 'ą', '.'])
+        self.assertEqual(text.clusters, ([(0, 2), (4, 5), (8, 8)], [(0, 0)], [(2, 2)], [(9, 10)]))
+        self.assertEqual(text.mentions[1].text, 'którzy śpi')
+        self.assertEqual(texts[1].text_id, 'hard')
+
+    def test_repeated_address(self):
+        # udapi gives a sentence without sent_id the previous sentence id, so node addresses repeat
+        doc_path = Path(self.tmp_dir.name) / 'hard.conllu'
+        doc_path.write_text(HARD_DOC.replace('# sent_id = h-2\n', ''))
+        text = next(CorefUDDoc.iter_texts(doc_path))
+        self.assertEqual(text.clusters, ([(0, 2), (4, 5), (8, 8)], [(0, 0)], [(2, 2)], [(9, 10)]))
+        self.assertEqual(text.segments_meta[8].id, 'h-1#1')
+
+    def test_numbered_sentences(self):
+        # without sent_id comments udapi numbers the sentences of every document
+        doc_path = Path(self.tmp_dir.name) / 'hard.conllu'
+        doc_path.write_text(re.sub(r'# sent_id = .*\n', '', HARD_DOC))
+        udapi_texts = list(CorefUDDoc.iter_texts(doc_path))
+        texts = list(CorefUDDoc.iter_texts(doc_path, backend='conllu'))
+        self.assertEqual([s.id for s in texts[0].segments_meta[7:9]], ['1#8', '2#1'])
+        for text, udapi_text in zip(texts, udapi_texts):
+            self.assertEqual([s.id for s in text.segments_meta], [s.id for s in udapi_text.segments_meta])
+
+
+# multi-word token, empty node, nested and discontinuous mentions, a document without id
+HARD_DOC = """# newdoc id = corpus/hard_words.xml
+# global.Entity = eid-etype-head-other
+# sent_id = h-1
+# text = Jan i Maria, którzy przyszli, śpią.
+1	Jan	Jan	PROPN	_	_	6	nsubj	_	Entity=(e1-person-3(e2-person-1)
+2	i	i	CCONJ	_	_	3	cc	_	_
+3	Maria	Maria	PROPN	_	_	1	conj	_	Entity=(e3-person-1)e1)|SpaceAfter=No
+4	,	,	PUNCT	_	_	5	punct	_	_
+5	którzy	który	PRON	_	_	1	acl	_	Entity=(e1[1/2]-person-1)
+5.1	_	_	_	_	_	_	_	5:nsubj	Entity=(e4-person-1)
+6-7	śpią	_	_	_	_	_	_	_	SpaceAfter=No
+6	śpi	spać	VERB	_	_	0	root	_	Entity=(e1[2/2]-person-1)
+7	ą	ą	AUX	_	_	6	aux	_	_
+8	.	.	PUNCT	_	_	6	punct	_	_
+
+# sent_id = h-2
+# text = Oni śpią długo.
+1	Oni	on	PRON	_	_	2	nsubj	_	Entity=(e1-person-1)
+2	śpią	spać	VERB	_	_	0	root	_	Entity=(e5-event-2
+3	długo	długo	ADV	_	_	2	advmod	_	Entity=e5)|SpaceAfter=No
+4	.	.	PUNCT	_	_	2	punct	_	_
+
+# newdoc
+# sent_id = x-1
+1	Ola	Ola	PROPN	_	_	0	root	_	Entity=(e7--1)
+2	śpi	_	_	_	_	1	dep	_	Entity=(e8--1)
+
+"""
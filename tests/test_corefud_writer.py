@@ -0,0 +1,79 @@
+import unittest
+import copy
+import io
+import tempfile
+from pathlib import Path
+
+from coref_ds.corefud import corefud_writer
+from coref_ds.corefud.corefud_doc import CorefUDDoc
+from coref_ds.tei.tei_doc import TEIDocument
+from coref_ds.text import Mention
+
+from tests.synthetic_tei import write_tei_document
+
+
+class TestCorefUDWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.texts = []
+        for text_id in list(corefud_writer.pcc_structure_reversed)[:3]:
+            text = TEIDocument(write_tei_document(Path(self.tmp_dir.name) / text_id, mentions_per_sentence=3)).text
+            text.text_id = text_id
+            self.texts.append(text)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_streaming_writer(self):
+        expected = corefud_writer.texts_to_corefud(copy.deepcopy(self.texts))
+        self.assertEqual(expected.count('# newdoc id = '), 3)
+
+        consumed = []
+
+        def texts():
+            for text in copy.deepcopy(self.texts):
+                consumed.append(text.text_id)
+                yield text
+
+        f = io.StringIO()
+        corefud_writer.write_corefud(texts(), f)
+        self.assertEqual(f.getvalue(), expected)
+        self.assertEqual(consumed, [text.text_id for text in self.texts])
+
+        p = Path(self.tmp_dir.name) / 'texts.conllu'
+        corefud_writer.write_corefud(iter(copy.deepcopy(self.texts)), p)
+        self.assertEqual(p.read_text(), expected)
+
+    def test_entity_markup(self):
+        text = self.texts[0]
+        segments = text.segments_meta[0:3]
+        text.mentions.append(Mention(
+            id='mention_nested', text='Ala ma kota', lemmatized_text='Ala mieć kot', segments=segments,
+            span_start=0, span_end=2, head_orth='Ala', head=0,
+        ))
+        text.clusters = list(text.clusters) + [[(0, 2)]]
+        corefud_writer.get_indices_to_mention_mapping(text)
+
+        eid = f'e{text.text_id}'
+        n_clusters = len(text.clusters)
+        self.assertEqual(
+            text.entity_markup[0],
+            f'Entity=({eid}{n_clusters - 1}1--1-id:markable_nested,mention_head:Ala'
+            f'({eid}01--1-id:markable_1,mention_head:Ala)',
+        )
+        self.assertEqual(
+            text.entity_markup[2],
+            f'Entity={eid}{n_clusters - 1}1)({eid}11--1-id:markable_3,mention_head:kota)',
+        )
+        self.assertNotIn(1, text.entity_markup)
+
+    def test_read_backends(self):
+        # the writer leaves HEAD empty ('_')
+        p = Path(self.tmp_dir.name) / 'texts.conllu'
+        corefud_writer.write_corefud(iter(copy.deepcopy(self.texts)), p)
+        with self.assertLogs(level='WARNING'):  # udapi warns about every empty HEAD
+            udapi_texts = list(CorefUDDoc.iter_texts(p))
+        texts = list(CorefUDDoc.iter_texts(p, backend='conllu'))
+        self.assertEqual(len(texts), len(self.texts))
+        self.assertEqual(texts, udapi_texts)
+        self.assertEqual([text.mentions for text in texts], [text.mentions for text in udapi_texts])
@@ -0,0 +1,65 @@
+import unittest
+import os
+import tempfile
+from pathlib import Path
+
+from coref_ds.corefud.create_pcc_split import TEXT_HEADER, create_split, get_corefud_texts
+from coref_ds.corefud.doc_index import DocumentIndex, sidecar_path
+
+from tests.synthetic_corefud import write_corefud_file
+
+
+def newdoc_id(text_id: str) -> str:
+    return f'input_data/PCC-1.5-MMAX/long/{text_id}_words.xml'
+
+
+class TestDocumentIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp_dir.name)
+        self.text_ids = ['100', '200', '300', '400']
+        self.p = write_corefud_file(self.root / 'train.conllu', [newdoc_id(t) for t in self.text_ids], n_sentences=2)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_documents(self):
+        file_str = self.p.read_text()
+        expected = [TEXT_HEADER + text for text in file_str.split(TEXT_HEADER) if text]
+
+        with DocumentIndex.load(self.p) as index:
+            self.assertEqual(list(index), [newdoc_id(t) for t in self.text_ids])
+            self.assertEqual([index.text(doc_id) for doc_id in index], expected)
+            self.assertEqual(index.text(newdoc_id('300'), strip=True), expected[2].strip())
+            self.assertIn(newdoc_id('100'), index)
+
+    def test_sidecar(self):
+        index = DocumentIndex.load(self.p)
+        self.assertTrue(sidecar_path(self.p).exists())
+        self.assertEqual(DocumentIndex.load(self.p).documents, index.documents)
+
+        write_corefud_file(self.p, [newdoc_id('500')])
+        stat = os.stat(self.p)
+        os.utime(self.p, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+        with DocumentIndex.load(self.p) as index:
+            self.assertEqual(list(index), [newdoc_id('500')])
+            self.assertEqual(index.text(newdoc_id('500')), self.p.read_text())
+
+    def test_create_split(self):
+        other = write_corefud_file(self.root / 'dev.conllu', [newdoc_id('900')])
+        texts = get_corefud_texts([self.p, other])
+        self.assertEqual(sorted(texts), ['100', '200', '300', '400', '900'])
+
+        ids = ['900', '300', '100']
+        output = self.root / 'split.conllu'
+        create_split(ids, texts, output)
+        old_texts = {}
+        for text in (self.p.read_text() + other.read_text()).split(TEXT_HEADER):
+            if text:
+                old_texts[text.split('_words')[0].split('/')[-1]] = text
+        self.assertEqual(output.read_text(), TEXT_HEADER + TEXT_HEADER.join(old_texts[t] for t in ids))
+
+    def test_empty_file(self):
+        p = self.root / 'empty.conllu'
+        p.touch()
+        self.assertEqual(len(DocumentIndex.load(p)), 0)
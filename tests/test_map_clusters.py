@@ -0,0 +1,57 @@
+import unittest
+import copy
+import tempfile
+from pathlib import Path
+
+from coref_ds.align import AlignmentReport
+from coref_ds.corefud import corefud_writer
+from coref_ds.corefud.corefud_doc import CorefUDDoc
+from coref_ds.corefud.utils import corefud_name_mapper
+from coref_ds.tei.tei_doc import TEIDocument
+
+from tests.synthetic_tei import write_tei_document
+
+
+class TestMapClusters(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.texts = []
+        for text_id in list(corefud_writer.pcc_structure_reversed)[:3]:
+            text = TEIDocument(write_tei_document(Path(self.tmp_dir.name) / text_id, mentions_per_sentence=3)).text
+            text.text_id = text_id
+            self.texts.append(text)
+        self.p = Path(self.tmp_dir.name) / 'texts.conllu'
+        corefud_writer.write_corefud(copy.deepcopy(self.texts), self.p)
+
+        # a cross-sentence mention, a duplicated one and one which cannot be aligned
+        text = self.texts[0]
+        text.segments[20] = 'Ø'
+        for span in ((5, 8), (0, 0), (20, 20)):
+            text.clusters.append([span])
+            text.indices_to_mentions.setdefault(span, copy.copy(text.mentions[0]))
+        self.texts.append(copy.deepcopy(text))
+        self.texts[-1].text_id = 'missing'
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def map_clusters(self, **kwargs) -> str:
+        doc = CorefUDDoc(self.p)
+        doc.map_clusters(copy.deepcopy(self.texts), docname_mapper=corefud_name_mapper, **kwargs)
+        output = Path(self.tmp_dir.name) / 'mapped.conllu'
+        doc.to_file(output)
+        return output.read_text()
+
+    def test_bulk(self):
+        expected = self.map_clusters()
+        self.assertIn('Entity=', expected)
+
+        progress = []
+        report = AlignmentReport()
+        with self.assertLogs('coref_ds.corefud.corefud_doc', level='WARNING'):
+            output = self.map_clusters(bulk=True, progress=lambda *args: progress.append(args), report=report)
+        self.assertEqual(output, expected)
+        self.assertEqual(progress, [(ind + 1, 3, text.text_id) for ind, text in enumerate(self.texts[:3])])
+        self.assertEqual([m.span for m in report.misalignments], [(20, 20)])
+
+        self.assertEqual(self.map_clusters(bulk=True, workers=2), expected)
@@ -0,0 +1,54 @@
+import unittest
+import tempfile
+from pathlib import Path
+
+from coref_ds.mmax.corpus import find_mmax_documents, load_mmax_corpus, load_pcc_structure, write_mmax_corpus
+from coref_ds.mmax.mmax_doc import MmaxDoc
+
+from tests.synthetic_mmax import write_mmax_document
+
+
+class TestMmaxCorpus(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp_dir.name) / 'mmax'
+        self.structure = load_pcc_structure()
+        text_ids = iter(self.structure)
+        for group, n_docs in (('long', 2), ('short', 3)):
+            for doc_ind in range(n_docs):
+                write_mmax_document(self.root / group, next(text_ids), n_sentences=doc_ind + 2)
+        self.broken = self.root / 'short' / 'broken.mmax'
+        self.broken.write_text('<mmax_project>')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_load(self):
+        doc_paths = find_mmax_documents(self.root)
+        self.assertEqual(len(doc_paths), 6)
+        self.assertEqual(find_mmax_documents(self.root, ['long']), doc_paths[:2])
+
+        expected = [MmaxDoc.from_file(p).text for p in doc_paths if p != self.broken]
+        for workers in (1, 2):
+            errors = []
+            texts = list(load_mmax_corpus(
+                self.root, workers=workers, max_in_flight=2, on_error=lambda p, e: errors.append(p)
+            ))
+            self.assertEqual([t.text_id for t in texts], [t.text_id for t in expected])
+            self.assertEqual([t.clusters for t in texts], [t.clusters for t in expected])
+            self.assertEqual(errors, [self.broken])
+
+    def test_write(self):
+        texts = list(load_mmax_corpus(self.root, workers=1, on_error=lambda *_: None))
+        output_dir = Path(self.tmp_dir.name) / 'out'
+        for workers in (1, 2):
+            written = write_mmax_corpus(texts, output_dir / str(workers), structure=self.structure, workers=workers)
+            self.assertEqual(
+                [p.relative_to(output_dir / str(workers)) for p in written],
+                [Path(self.structure[t.text_id]) / f'{t.text_id}.mmax' for t in texts],
+            )
+            for text, p in zip(texts, written):
+                rewritten = MmaxDoc.from_file(p).text
+                self.assertEqual(rewritten.segments, text.segments)
+                self.assertEqual(rewritten.clusters, text.clusters)
+                self.assertEqual(rewritten.segments_meta, text.segments_meta)
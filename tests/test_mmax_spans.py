@@ -0,0 +1,33 @@
+import unittest
+import random
+
+from coref_ds.mmax.spans import parse_span, parse_spans
+
+
+class TestMmaxSpans(unittest.TestCase):
+    def test_parse_span(self):
+        self.assertEqual(parse_span('word_3'), [(3, 3)])
+        self.assertEqual(parse_span('word_1..word_3'), [(1, 3)])
+        self.assertEqual(parse_span('word_1..word_3,word_7,word_9..word_10'), [(1, 3), (7, 7), (9, 10)])
+        for span in ('', 'word_', 'markable_3', 'word_1..', 'word_1,,word_2', 'word_1..word_3,', 'xword_1'):
+            self.assertIsNone(parse_span(span), span)
+
+    def test_parse_spans(self):
+        rng = random.Random(0)
+        spans = []
+        for _ in range(500):
+            fragments = []
+            for _ in range(rng.choice([1, 1, 1, 2, 3])):
+                start = rng.randrange(1000)
+                fragments.append(f'word_{start}' if rng.random() < 0.5 else f'word_{start}..word_{start + 2}')
+            spans.append(','.join(fragments))
+
+        for with_invalid in (False, True):
+            if with_invalid:
+                spans[10], spans[20] = 'word_1..', ''
+            parsed = parse_spans(spans)
+            self.assertEqual(len(parsed), len(spans))
+            for ind, span in enumerate(spans):
+                fragments = parse_span(span)
+                self.assertEqual(parsed.fragments(ind), fragments or [])
+                self.assertEqual(parsed.span(ind), (fragments[0][0], fragments[-1][1]) if fragments else None)
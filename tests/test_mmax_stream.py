@@ -0,0 +1,88 @@
+import contextlib
+import copy
+import io
+import unittest
+import tempfile
+from pathlib import Path
+
+from coref_ds.mmax.attributes import MARKABLE_ATTRIBUTES, MARKABLE_XML_TEMPLATE
+from coref_ds.mmax.markable import Markable, gen_mentions_structure
+from coref_ds.mmax.mmax_doc import MmaxDoc
+
+from tests.synthetic_mmax import write_mmax_document
+
+
+class TestMmaxStream(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.p = write_mmax_document(Path(self.tmp_dir.name), 'doc', n_sentences=4)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_stream(self):
+        words, mentions = MmaxDoc.parse_files(MmaxDoc.load_files(self.p))
+        doc = MmaxDoc.from_file(self.p)
+        self.assertEqual(doc.words, words)
+        self.assertEqual(doc.mentions, mentions)
+        self.assertEqual(len(doc.mentions), 12)
+        self.assertEqual(doc.mentions[1].near_identity, 'set_0')
+        self.assertEqual(doc.mentions[4].near_identity, 'empty')
+        self.assertEqual(doc.text.clusters[1], [(2, 2), (4, 5)])
+
+    def test_shared_defaults(self):
+        doc = MmaxDoc.from_file(self.p)
+        for mention in doc.mentions:
+            self.assertIs(mention.excluding_ios, MARKABLE_ATTRIBUTES['excluding_ios'])
+            self.assertIs(mention.supporting_other_facet, MARKABLE_ATTRIBUTES['supporting_other_facet'])
+
+    def test_sparse_facets(self):
+        doc = MmaxDoc.from_file(self.p)
+        self.assertIsNone(doc.mentions[0].facets)
+        self.assertEqual(doc.mentions[1].facets, {'near_identity_facet': 'role', 'near_identity': 'set_0'})
+
+        mention = Markable(id='markable_1', span='word_0', near_identity='set_1')
+        self.assertEqual(
+            mention.attributes(),
+            {**MARKABLE_ATTRIBUTES, 'id': 'markable_1', 'span': 'word_0', 'near_identity': 'set_1'},
+        )
+        mention.near_identity = MARKABLE_ATTRIBUTES['near_identity']
+        self.assertIsNone(mention.facets)
+        self.assertEqual(mention, Markable(id='markable_1', span='word_0'))
+        with self.assertRaises(TypeError):
+            Markable(cluster_id='set_1')
+
+        copied = copy.copy(doc.mentions[1])
+        copied.near_identity = 'set_9'
+        self.assertEqual(doc.mentions[1].near_identity, 'set_0')
+
+    def test_to_xml(self):
+        tree = gen_mentions_structure().getroot()
+        Markable(id='markable_1', span_start=2, span_end=4, mention_group='set_1', near_identity='set_0').to_xml(tree)
+        self.assertEqual(
+            dict(tree[0].attrib),
+            {**MARKABLE_XML_TEMPLATE, 'id': 'markable_1', 'span': 'word_2..word_3', 'mention_group': 'set_1'},
+        )
+
+    def test_discontinuous(self):
+        p = write_mmax_document(Path(self.tmp_dir.name) / 'discontinuous', 'doc', n_sentences=4, discontinuous=True)
+        doc = MmaxDoc.from_file(p)
+        self.assertEqual(doc.mentions[3].get_fragments(), [(1, 2), (5, 5)])
+        self.assertEqual(doc.mentions[3].get_span(), (1, 5))
+
+        text = doc.text
+        self.assertEqual(len(text.mentions), 14)
+        mention = text.mentions[3]
+        self.assertFalse(mention.is_continuous)
+        self.assertEqual([[s.index for s in submention] for submention in mention.submentions], [[1, 2], [5]])
+        self.assertEqual((mention.span_start, mention.span_end), (5, 5))
+        self.assertIn([(5, 5)], text.clusters)
+        self.assertIs(text.indices_to_mentions[(5, 5)], mention)
+
+        doc.mentions[3].mention_head = ''
+        with self.assertLogs('coref_ds.mmax.mmax_doc', level='WARNING'), \
+                contextlib.redirect_stdout(io.StringIO()) as stdout:
+            mention = doc.parse_text().mentions[3]
+        self.assertEqual(stdout.getvalue(), '')
+        self.assertTrue(mention.is_continuous)
+        self.assertEqual((mention.span_start, mention.span_end), (1, 2))
@@ -0,0 +1,79 @@
+import unittest
+import pickle
+import tempfile
+from dataclasses import asdict
+from pathlib import Path
+
+from coref_ds.segment_table import Categories, SegmentTable
+from coref_ds.tei.tei_doc import TEIDocument
+from coref_ds.text import Mention, SlotsMention, SlotsSegment
+
+from tests.synthetic_tei import write_tei_document
+
+
+class TestSegmentTable(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        doc_dir = write_tei_document(Path(self.tmp_dir.name) / 'doc', mentions_per_sentence=3)
+        self.text = TEIDocument(doc_dir).text
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_rows(self):
+        segments = self.text.segments_meta
+        categories = Categories()
+        table = SegmentTable.from_segments(segments, categories=categories)
+
+        self.assertEqual(len(table), len(segments))
+        self.assertEqual(table.to_segments(), segments)
+        self.assertEqual(table.column('orth'), [segment.orth for segment in segments])
+        self.assertEqual(table[-1].last_in_par, True)
+        self.assertEqual(table[0].get_token_index(), 0)
+        self.assertLess(len(categories), len(segments))
+        other_table = SegmentTable.from_segments(segments)
+        self.assertIsNot(other_table.categories, SegmentTable.from_segments(segments).categories)
+
+        self.assertEqual(table[1], other_table[1])
+        with self.assertRaises(TypeError):
+            hash(table[1])
+
+        table[0].orth = 'Ola'
+        self.assertEqual(table.segment(0).orth, 'Ola')
+
+    def test_compact(self):
+        segments = list(self.text.segments_meta)
+        clusters = self.text.clusters
+        self.text.compact()
+
+        self.assertIsInstance(self.text.segments_meta, SegmentTable)
+        self.assertEqual(list(self.text.segments_meta), segments)
+        self.assertEqual(self.text.clusters, clusters)
+        self.assertEqual(self.text.segments, [segment.orth for segment in segments])
+        self.assertIs(self.text.mentions[0].segments[0].table, self.text.segments_meta)
+
+        unpickled = pickle.loads(pickle.dumps(self.text))
+        self.assertEqual(unpickled.segments_meta.to_segments(), segments)
+        self.assertIs(unpickled.mentions[0].segments[0].table, unpickled.segments_meta)
+
+    def test_slots_segment(self):
+        segment = self.text.segments_meta[0]
+        slots_segment = SlotsSegment(**asdict(segment))
+        self.assertFalse(hasattr(slots_segment, '__dict__'))
+        self.assertEqual(asdict(slots_segment), asdict(segment))
+        self.assertEqual(slots_segment.get_token_index(), segment.get_token_index())
+
+    def test_slots_mention(self):
+        segments = self.text.segments_meta
+        kwargs = dict(
+            id='m', text='', segments=[segments[0], segments[1], segments[3]], span_start=0, span_end=3,
+            head_orth=segments[3].orth, head=3,
+        )
+        mention, slots_mention = Mention(**kwargs), SlotsMention(**kwargs)  # discontinuous, extra slots are set
+        slots_mention.dominant = mention.dominant = 'm'
+        self.assertFalse(hasattr(slots_mention, '__dict__'))
+        self.assertFalse(slots_mention.is_continuous)
+        self.assertEqual(slots_mention.submentions, mention.submentions)
+        self.assertEqual(slots_mention.full_segments, mention.full_segments)
+        self.assertEqual(slots_mention.get_mention_span(), mention.get_mention_span())
+        self.assertEqual(slots_mention.get_mention_span(True), mention.get_mention_span(True))
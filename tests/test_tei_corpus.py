@@ -0,0 +1,59 @@
+import unittest
+import tempfile
+import time
+from pathlib import Path
+
+from coref_ds.tei.corpus import find_tei_documents, load_tei_corpus
+from coref_ds.utils import map_documents
+
+from tests.synthetic_tei import write_tei_document
+
+
+class TestTEICorpus(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp_dir.name)
+        for split_name, n_docs in (('train', 3), ('dev', 1), ('test', 1)):
+            for doc_ind in range(n_docs):
+                write_tei_document(self.root / split_name / f'{split_name}{doc_ind}', n_samples=doc_ind + 1)
+        broken_dir = self.root / 'test' / 'broken'
+        broken_dir.mkdir()
+        (broken_dir / 'ann_morphosyntax.xml').write_text('<teiCorpus>')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_find_documents(self):
+        doc_paths = find_tei_documents(self.root)
+        self.assertEqual([p.name for p in doc_paths], ['dev0', 'broken', 'test0', 'train0', 'train1', 'train2'])
+
+    def test_load_corpus(self):
+        errors = []
+        on_error = lambda doc_path, error: errors.append(doc_path.name)
+        sequential = list(load_tei_corpus(self.root, workers=1, on_error=on_error))
+        ordered = list(load_tei_corpus(self.root, workers=2, on_error=on_error))
+        bounded = list(load_tei_corpus(self.root, workers=2, max_in_flight=1, on_error=on_error))
+        unordered = list(load_tei_corpus(self.root, workers=2, ordered=False, max_in_flight=2, on_error=on_error))
+
+        self.assertEqual(errors, ['broken'] * 4)
+        self.assertEqual([t.text_id for t in sequential], ['dev0', 'test0', 'train0', 'train1', 'train2'])
+        self.assertEqual([t.text_id for t in ordered], [t.text_id for t in sequential])
+        self.assertEqual([t.clusters for t in ordered], [t.clusters for t in sequential])
+        self.assertEqual([t.text_id for t in bounded], [t.text_id for t in sequential])
+        self.assertEqual(sorted(t.text_id for t in unordered), sorted(t.text_id for t in sequential))
+
+
+def sleep(seconds: float) -> float:
+    time.sleep(seconds)
+    return seconds
+
+
+class TestMapDocuments(unittest.TestCase):
+    def test_orders(self):
+        args = [(1.,), (0.,), (0.,), (0.,)]
+        on_error = lambda doc, error: self.fail(error)
+        ordered = list(map_documents(sleep, args, lambda a: a, 2, 2, on_error))
+        unordered = list(map_documents(sleep, args, lambda a: a, 2, 2, on_error, ordered=False))
+        self.assertEqual(ordered, [1., 0., 0., 0.])
+        # the fast calls are submitted and yielded while the slow one is running
+        self.assertEqual(unordered, [0., 0., 0., 1.])
@@ -0,0 +1,89 @@
+import unittest
+import tempfile
+from pathlib import Path
+
+from lxml import etree
+
+from coref_ds.tei.layers.morphosyntax import MorphosyntaxLayer, StreamingMorphosyntaxLayer
+from coref_ds.tei.tei_doc import NSMAP, TEIDocument, write_samples
+
+from tests.synthetic_tei import write_tei_document
+
+
+class TestTEILayers(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.doc_dir = write_tei_document(Path(self.tmp_dir.name) / 'doc', n_samples=3, n_sentences=4)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_streaming_morphosyntax(self):
+        morph_path = self.doc_dir / 'ann_morphosyntax.xml'
+        morph_dict = MorphosyntaxLayer(morph_path, NSMAP).parse_layer()
+        streaming_layer = StreamingMorphosyntaxLayer(morph_path, NSMAP)
+        streaming_morph_dict = streaming_layer.parse_layer()
+
+        self.assertFalse(streaming_layer.is_loaded)
+        self.assertEqual(morph_dict['segments_ids'], streaming_morph_dict['segments_ids'])
+        self.assertEqual(morph_dict['segments_dict'], streaming_morph_dict['segments_dict'])
+        self.assertEqual(sum(seg['last_in_par'] for seg in streaming_morph_dict['segments_dict'].values()), 6)
+
+    def test_many_clusters(self):
+        doc_dir = write_tei_document(
+            Path(self.tmp_dir.name) / 'long_doc', n_samples=10, n_paragraphs=10, n_sentences=25, mentions_per_sentence=3
+        )
+        text = TEIDocument(doc_dir).text
+        sentence_len = 7
+        n_sentences = 10 * 10 * 25
+
+        self.assertEqual(len(text.clusters), 2 * n_sentences)  # identity clusters and singletons
+        clusters = [cluster for cluster in text.clusters if len(cluster) == 2]
+        self.assertEqual(len(clusters), n_sentences)
+        for sent_ind, cluster in enumerate(clusters):
+            sent_start = sent_ind * sentence_len
+            self.assertEqual(cluster, [(sent_start, sent_start), (sent_start + 4, sent_start + 4)])
+
+        clustered = [mention for mention in text.mentions if mention.cluster_id]
+        self.assertEqual(len(clustered), 2 * n_sentences)
+        self.assertEqual(clustered[0].cluster_id, 'coreference_1')
+        self.assertTrue(all(mention.dominant == 'Ala' for mention in clustered))
+
+    def test_split(self):
+        doc_dir = write_tei_document(
+            Path(self.tmp_dir.name) / 'multi_div_doc', n_samples=6, samples_per_div=2, mentions_per_sentence=3
+        )
+        # a mention without segment pointers consists of its semantic head
+        mentions_path = doc_dir / 'ann_mentions.xml'
+        mentions_tree = etree.parse(mentions_path)
+        last_mention = mentions_tree.xpath('//tei:seg', namespaces=NSMAP)[-1]
+        for ptr in last_mention.xpath('tei:ptr', namespaces=NSMAP):
+            last_mention.remove(ptr)
+        mentions_tree.write(mentions_path)
+
+        tei_doc = TEIDocument(doc_dir)
+        text = tei_doc.text
+        subdocs = tei_doc.split()
+        self.assertEqual(len(subdocs), 3)
+
+        subtexts = [subdoc.text for subdoc in subdocs]
+        self.assertEqual(sum(len(subtext.segments) for subtext in subtexts), len(text.segments))
+        self.assertEqual(sum(len(subtext.mentions) for subtext in subtexts), len(text.mentions))
+        self.assertEqual(sum(len(subtext.clusters) for subtext in subtexts), len(text.clusters))
+        for subtext in subtexts:
+            self.assertEqual(subtext.clusters, text.clusters[:len(subtext.clusters)])
+        self.assertEqual(subtexts[-1].mentions[-1].id, text.mentions[-1].id)
+
+        write_samples(tei_doc, Path(self.tmp_dir.name) / 'samples')
+        written_text = TEIDocument(Path(self.tmp_dir.name) / 'samples' / 'multi_div_doc_1').text
+        self.assertEqual(written_text.segments, subtexts[1].segments)
+        self.assertEqual(written_text.clusters, subtexts[1].clusters)
+
+    def test_lazy_layers(self):
+        tei_doc = TEIDocument(self.doc_dir)
+        self.assertEqual(tei_doc.loaded_layers, [])
+        self.assertIn('segmentation', tei_doc.layers)
+        self.assertNotIn('groups', tei_doc.layers)
+        text = tei_doc.text
+        self.assertEqual(tei_doc.loaded_layers, ['coreference', 'mentions', 'morphosyntax'])
+        self.assertEqual(len(text.segments), 3 * 2 * 4 * 7)
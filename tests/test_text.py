@@ -0,0 +1,67 @@
+import unittest
+import tempfile
+from pathlib import Path
+
+from coref_ds.tei.tei_doc import TEIDocument
+from coref_ds.text import Text
+
+from tests.synthetic_tei import write_tei_document
+
+
+class TestText(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        doc_dir = write_tei_document(Path(self.tmp_dir.name) / 'doc', n_sentences=4, mentions_per_sentence=3)
+        self.text = TEIDocument(doc_dir).text
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_subtexts(self):
+        subtexts = Text.get_subtexts(self.text)
+        self.assertEqual(len(subtexts), 2 * 2 * 4)
+        self.assertEqual(sum(len(subtext.segments) for subtext in subtexts), len(self.text.segments))
+        self.assertEqual(sum(len(subtext.mentions) for subtext in subtexts), len(self.text.mentions))
+
+        subtext = subtexts[5]
+        self.assertEqual(subtext.text_id, f'{self.text.text_id}_s_5')
+        self.assertIs(subtext.segments_meta[0], self.text.segments_meta[5 * 7])
+        self.assertEqual(subtext.clusters, [[(0, 0), (4, 4)], [(2, 2)]])
+        self.assertEqual(subtext.clusters_str, ((['Ala'], ['który']), (['kota'],)))
+        self.assertEqual([(m.span_start, m.span_end) for m in subtext.mentions], [(0, 0), (4, 4), (2, 2)])
+        self.assertEqual(self.text.mentions[5 * 3].span_start, 5 * 7)
+
+        paragraphs = list(Text.iter_subtexts(self.text, 'last_in_par'))
+        self.assertEqual(len(paragraphs), 2 * 2)
+        self.assertEqual(paragraphs[1].text_id, f'{self.text.text_id}_p_1')
+        self.assertEqual(len(paragraphs[1].clusters), 2 * 4)
+
+    def test_subtext_bounds(self):
+        self.text.clusters = [[(5, 6), (6, 7)]]  # the last segment of a sentence belongs to it
+        subtexts = Text.get_subtexts(self.text)
+        self.assertEqual(subtexts[0].clusters, [[(5, 6)]])
+        self.assertEqual(subtexts[1].clusters, [])
+
+    def test_windows(self):
+        windows = list(self.text.iter_windows(max_tokens=20, overlap=7))
+        self.assertEqual([window.offset for window in windows], list(range(0, len(self.text.segments) - 7, 7)))
+        self.assertTrue(all(len(window.segments) == 14 for window in windows))
+        for window in windows:
+            for cluster in window.clusters:
+                for start, end in cluster:
+                    self.assertEqual(
+                        window.segments[start: end + 1],
+                        self.text.segments[window.offset + start: window.offset + end + 1],
+                    )
+        self.assertEqual(windows[1].clusters, [[(0, 0), (4, 4)], [(2, 2)], [(7, 7), (11, 11)], [(9, 9)]])
+        self.assertEqual(len(windows[1].mentions), 6)
+
+        windows = list(self.text.iter_windows(max_tokens=21, stride=14))
+        self.assertEqual([window.offset for window in windows], list(range(0, len(self.text.segments) - 7, 14)))
+        self.assertEqual(len(windows[-1].segments), 14)
+
+        windows = list(self.text.iter_windows(max_tokens=10, stride=30))  # windows of one 7-segment sentence
+        self.assertEqual([window.offset for window in windows], list(range(0, len(self.text.segments), 7)))
+
+        windows = list(self.text.iter_windows(max_tokens=5))
+        self.assertEqual([len(window.segments) for window in windows[:2]], [5, 2])